@@ -0,0 +1,268 @@
+"""Benchmarks of the hot paths of the game, over the bundled puzzle dataset.
+
+Run from the root of the repository. Save a baseline on the machine that checks deployments first:
+
+    python -m benchmarks.hot_paths --output benchmarks/baseline.json
+
+then compare later runs against it:
+
+    python -m benchmarks.hot_paths --output results.json --baseline benchmarks/baseline.json
+
+Every benchmark reports operations per second (the best of several repeats), the peak memory of a batch and the
+memory blocks allocated per operation, counted while the results of the batch are still held.
+With a baseline, the run fails when any benchmark is slower than the baseline by more than the threshold.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from sudoku import Game, make_move, sudoku_is_solved, undo_move
+from utils import ui
+from utils.dataset import iter_puzzles
+from utils.sudoku_utils import build_grid, translate_move
+
+DATASET = Path(__file__).parent.parent / 'puzzle-dataset' / 'pre-solved-sudokus.txt'
+
+# a benchmark is set up once, and returns a function that runs one batch of operations and returns what each
+# operation made, so that the memory it took can be counted before it is dropped
+Batch = Callable[[], List[Any]]
+Benchmark = Callable[[], Batch]
+
+
+class Result(NamedTuple):
+    ops_per_sec: float
+    peak_bytes: int  # the most memory held at once while running a batch
+    blocks_per_op: float  # memory blocks allocated by a batch and held by its results, per operation
+
+
+def _puzzles() -> List[tuple]:
+    return list(iter_puzzles(DATASET))
+
+
+def bench_build_grid() -> Batch:
+    quizzes = [quiz for quiz, _ in _puzzles()]
+
+    def run() -> List[Any]:
+        return [build_grid(quiz) for quiz in quizzes]
+
+    run.ops = len(quizzes)  # type: ignore[attr-defined]
+    return run
+
+
+def bench_translate_move() -> Batch:
+    moves = [f'{number}{row}{col}' for number in range(1, 10) for row in 'AbCdEfGhI' for col in range(1, 10)]
+    moves += [f'{number}{col}{row}' for number in range(1, 10) for row in 'aBcDeFgHi' for col in range(1, 10)]
+
+    def run() -> List[Any]:
+        return [translate_move(move) for move in moves]
+
+    run.ops = len(moves)  # type: ignore[attr-defined]
+    return run
+
+
+def bench_make_and_undo_move() -> Batch:
+    grid = build_grid(_puzzles()[0][0])
+    history: list = []
+    empty = [(row, col) for row in range(9) for col in range(9) if grid[row][col] == ' ']
+
+    def run() -> List[Any]:
+        moves = []
+        for loc in empty:
+            make_move(loc, 5, grid, history=history)
+            moves.append(history[-1])
+        for _ in empty:
+            undo_move(grid, history=history)
+        return moves
+
+    run.ops = 2 * len(empty)  # type: ignore[attr-defined]
+    return run
+
+
+def bench_game_move_and_undo() -> Batch:
+    game = Game.from_line(_puzzles()[0])
+    empty = sorted(game.unfilled_cells)
+
+    def run() -> List[Any]:
+        boards = []
+        for loc in empty:
+            game.move(loc, 5)
+            boards.append(game.history.snapshot())
+        for _ in empty:
+            game.undo()
+        return boards
+
+    run.ops = 2 * len(empty)  # type: ignore[attr-defined]
+    return run
+
+
+def bench_sudoku_is_solved() -> Batch:
+    solutions = [build_grid(solution) for _, solution in _puzzles()[:100]]
+
+    def run() -> List[Any]:
+        return [sudoku_is_solved(solution) for solution in solutions]
+
+    run.ops = len(solutions)  # type: ignore[attr-defined]
+    return run
+
+
+def bench_get_sudoku_grid() -> Batch:
+    # more distinct grids than the render cache holds, so every call renders
+    grids = [build_grid(quiz) for quiz, _ in _puzzles()]
+
+    def run() -> List[Any]:
+        return [ui.get_sudoku_grid(grid) for grid in grids]
+
+    run.ops = len(grids)  # type: ignore[attr-defined]
+    return run
+
+
+def bench_grid_buffer() -> Batch:
+    # one move and its undo per frame, as the game loop redraws the grid
+    grid = build_grid(_puzzles()[0][0])
+    buffer = ui.GridBuffer(grid)
+    empty = [(row, col) for row in range(9) for col in range(9) if grid[row][col] == ' ']
+
+    def run() -> List[Any]:
+        frames = []
+        for row, col in empty:
+            grid[row][col] = '5'
+            buffer.update(grid)
+            frames.append(buffer.render())
+            grid[row][col] = ' '
+            buffer.update(grid)
+            frames.append(buffer.render())
+        return frames
+
+    run.ops = 2 * len(empty)  # type: ignore[attr-defined]
+    return run
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    'build_grid': bench_build_grid,
+    'translate_move': bench_translate_move,
+    'make_move/undo_move': bench_make_and_undo_move,
+    'Game.move/Game.undo': bench_game_move_and_undo,
+    'sudoku_is_solved': bench_sudoku_is_solved,
+    'ui.get_sudoku_grid': bench_get_sudoku_grid,
+    'ui.GridBuffer': bench_grid_buffer,
+}
+
+
+def measure(benchmark: Benchmark, repeats: int = 5, min_seconds: float = 0.05) -> Result:
+    """Runs the `benchmark` and returns its best speed over `repeats` timings, and its memory use."""
+    run = benchmark()
+    ops = run.ops  # type: ignore[attr-defined]
+    run()  # warm up
+
+    # run enough batches per timing to get a measurable duration
+    batches = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(batches):
+            run()
+        if time.perf_counter() - start >= min_seconds:
+            break
+        batches *= 2
+
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(batches):
+            run()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    # the blocks are counted while the batch's results are held, so the ones that the operations made are counted
+    # rather than freed, and the collector is kept from freeing anything else in between
+    gc.collect()
+    gc.disable()
+    try:
+        before = sys.getallocatedblocks()
+        results = run()
+        allocated = sys.getallocatedblocks() - before
+        del results
+    finally:
+        gc.enable()
+
+    return Result(ops * batches / best, peak, allocated / ops)
+
+
+def run_benchmarks(names: Optional[List[str]] = None, repeats: int = 5) -> Dict[str, Result]:
+    return {name: measure(BENCHMARKS[name], repeats) for name in (names or list(BENCHMARKS))}
+
+
+def find_regressions(results: Dict[str, Result], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Returns a description of every benchmark that is slower than its `baseline` by more than `threshold`
+    (a fraction of the baseline speed).
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]['ops_per_sec']
+        if result.ops_per_sec < expected * (1 - threshold):
+            regressions.append(
+                f'{name}: {result.ops_per_sec:,.0f} ops/sec is {1 - result.ops_per_sec / expected:.0%} '
+                f'below the baseline of {expected:,.0f} ops/sec'
+            )
+    return regressions
+
+
+def to_json(results: Dict[str, Result]) -> dict:
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': {name: result._asdict() for name, result in results.items()},
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare against the results in this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.2, help='the slowdown that fails the run (default 0.2)')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('benchmarks', nargs='*', help=f"the benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    results = run_benchmarks(args.benchmarks, args.repeats)
+    for name, result in results.items():
+        print(
+            f'{name:<22} {result.ops_per_sec:>14,.0f} ops/sec'
+            f'{result.peak_bytes:>12,} B peak{result.blocks_per_op:>10.2f} blocks/op'
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(to_json(results), indent=2) + '\n')
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())['results']
+        regressions = find_regressions(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""Serves games of Sudoku to many players at once, over a line-based protocol.
+
+Every connection is an independent game. The client sends one command per line:
+
+    <move>   places a number, e.g. `9a3` (the same format as the interactive game)
+    u        undoes the last move
+    r        makes the last undone move again
+    h        reveals one correct number
+    show     shows the grid again
+    new      starts a new game
+    q        ends the session
+
+and the server answers every command with one line:
+
+    OK <grid>      the command was applied
+    WON <grid>     the command was applied, and the grid is solved
+    ERR <message>  the command was rejected, and the grid is unchanged
+    BYE            the session is over
+
+where <grid> is the 81 cells of the grid, row by row, with 0 for an unfilled cell.
+A new connection is greeted with the grid of its first game, or with an ERR line and closed if no game could be
+set up for it. A `new` game that can't be set up is an ERR, and the current game carries on.
+"""
+
+import asyncio
+import random
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+from sudoku import GAME_KEY_ACTIONS, Game
+from utils.puzzle_store import PuzzleStore, open_store
+from utils.sudoku_utils import SudokuError, translate_move
+
+# how many connections may wait to be accepted, so that thousands of clients can connect at once
+LISTEN_BACKLOG = 4096
+
+
+def encode_grid(grid: List[List[str]]) -> str:
+    """Returns the 81-digit representation of the `grid`, with 0 for every unfilled cell."""
+    return ''.join(cell if cell != ' ' else '0' for row in grid for cell in row)
+
+
+def reply(game: Game) -> str:
+    """Returns the reply that shows the grid of the `game`."""
+    status = 'WON' if game.is_solved() else 'OK'
+    return f'{status} {encode_grid(game.grid)}'
+
+
+def error_reply(error: SudokuError) -> str:
+    """Returns the reply that reports the `error`, on one line."""
+    return f"ERR {error.error_message.replace(chr(10), ' ')}"
+
+
+def handle_command(game: Game, command: str) -> str:
+    """Applies a command (other than `new` and `q`) to the `game`, and returns the reply to send."""
+    try:
+        if command != 'show':
+            action = GAME_KEY_ACTIONS.get(command)
+            if action is not None:
+                action(game)
+            else:
+                loc, number = translate_move(command)
+                game.move(loc, number)
+    except SudokuError as e:
+        return error_reply(e)
+
+    return reply(game)
+
+
+class SudokuServer:
+    """An asyncio server that runs one `Game` per connection."""
+
+    def __init__(self, dataset: Union[str, Path]) -> None:
+        self._store: PuzzleStore = open_store(dataset)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.sessions = 0  # the number of sessions currently connected
+
+    def new_game(self) -> Game:
+        return Game.from_line(self._store.random_puzzle())
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> Tuple[str, int]:
+        """Starts listening, and returns the address the server is listening on.
+        The default port of 0 picks any free port.
+        """
+        self._server = await asyncio.start_server(self._handle_client, host, port, backlog=LISTEN_BACKLOG)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self) -> None:
+        assert self._server is not None, 'the server has not been started'
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._store.close()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.sessions += 1
+        try:
+            try:
+                game = self.new_game()
+            except SudokuError as e:
+                writer.write(f'{error_reply(e)}\n'.encode())
+                await writer.drain()
+                return
+            writer.write(f'{reply(game)}\n'.encode())
+            while True:
+                line = await reader.readline()
+                if not line:  # the client went away
+                    break
+
+                command = line.decode(errors='replace').strip().lower()
+                if command == 'q':
+                    writer.write(b'BYE\n')
+                    break
+                if command == 'new':
+                    try:
+                        game = self.new_game()
+                        answer = reply(game)
+                    except SudokuError as e:
+                        answer = error_reply(e)
+                else:
+                    answer = handle_command(game, command)
+
+                writer.write(f'{answer}\n'.encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions -= 1
+            writer.close()
+
+
+async def serve(dataset: Union[str, Path], host: str = '127.0.0.1', port: int = 8765) -> None:
+    """Serves games until the process is stopped."""
+    server = SudokuServer(dataset)
+    address = await server.start(host, port)
+    print(f'Serving Sudoku on {address[0]}:{address[1]}')
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+class LoadReport(NamedTuple):
+    """The outcome of a load generation run."""
+
+    clients: int
+    commands: int
+    seconds: float
+    p50_ms: float
+    p99_ms: float
+
+    @property
+    def commands_per_second(self) -> float:
+        return self.commands / self.seconds if self.seconds else 0.0
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Returns the value below which `fraction` of the (already sorted) `sorted_values` fall."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+async def _play(host: str, port: int, commands: int, latencies: List[float], rng: random.Random) -> None:
+    """Plays one session of random moves, undos, redos and hints, recording the latency of every command."""
+    reader, writer = await asyncio.open_connection(host, port)
+    grid = (await reader.readline()).decode().split()[1]
+
+    for _ in range(commands):
+        empty_cells = [index for index, cell in enumerate(grid) if cell == '0']
+        roll = rng.random()
+        if not empty_cells:
+            command = 'new'
+        elif roll < 0.1:
+            command = 'u'
+        elif roll < 0.15:
+            command = 'r'
+        elif roll < 0.25:
+            command = 'h'
+        else:
+            cell = rng.choice(empty_cells)
+            command = f"{rng.randint(1, 9)}{'ABCDEFGHI'[cell // 9]}{cell % 9 + 1}"
+
+        start = time.perf_counter()
+        writer.write(f'{command}\n'.encode())
+        reply = (await reader.readline()).decode()
+        latencies.append(time.perf_counter() - start)
+
+        status, _, rest = reply.strip().partition(' ')
+        if status in ('OK', 'WON'):
+            grid = rest
+
+    writer.write(b'q\n')
+    await reader.readline()
+    writer.close()
+
+
+async def generate_load(
+    host: str, port: int, clients: int = 100, commands: int = 100, seed: Optional[int] = None
+) -> LoadReport:
+    """Runs `clients` concurrent sessions of `commands` commands each against the server at `host`:`port`."""
+    rng = random.Random(seed)
+    latencies: List[float] = []
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(_play(host, port, commands, latencies, random.Random(rng.random())) for _ in range(clients))
+    )
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return LoadReport(
+        clients, len(latencies), seconds, percentile(latencies, 0.5) * 1000, percentile(latencies, 0.99) * 1000
+    )
+
+
+async def generate_local_load(dataset: Union[str, Path], clients: int, commands: int) -> LoadReport:
+    """Starts a server in this process on a free local port, and runs the load generator against it."""
+    server = SudokuServer(dataset)
+    host, port = await server.start()
+    try:
+        return await generate_load(host, port, clients, commands)
+    finally:
+        await server.close()
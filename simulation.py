@@ -0,0 +1,274 @@
+"""Replays scripted moves against many games at once, without the UI, to soak-test the game logic.
+
+A script is a puzzle and the commands typed into it, in the same format as the interactive game: moves such as
+`9a3`, `u` to undo, `r` to redo and `h` for a hint. Scripts are either generated at random or read from a script
+file:
+
+    puzzle <quiz>,<solution>
+    <command>
+    <command>
+    puzzle <quiz>,<solution>
+    ...
+
+Every command goes through `translate_move` and the `Game` methods, just as it does when it is typed in. Once a
+game's script is done (and every `check_every` commands, if asked), the game is checked against invariants that
+must always hold, and the violations are reported along with the throughput.
+"""
+
+import random
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple, Union
+
+from sudoku import GAME_KEY_ACTIONS, Game
+from utils.board import Board
+from utils.dataset import chunked
+from utils.parallel import map_chunks
+from utils.puzzle_store import open_store
+from utils.sudoku_utils import SudokuError, build_puzzle_solution_pair, get_unfilled_cells, translate_move
+
+# the (quiz, solution) line of a puzzle, and the commands to play on it
+Script = Tuple[Tuple[str, str], List[str]]
+
+ROW_LETTERS = 'ABCDEFGHI'
+# what each game key other than the hint key is counted as
+ACTION_COUNTS = {'u': 'undos', 'r': 'redos'}
+# the most violations a report keeps; the rest are only counted
+MAX_REPORTED_VIOLATIONS = 100
+
+
+class SimulationReport(NamedTuple):
+    """The outcome of a simulation run."""
+
+    games: int
+    commands: int
+    moves: int  # the moves that were accepted
+    undos: int
+    redos: int
+    hints: int
+    rejected: int  # the commands that were rejected with a SudokuError
+    solved: int  # the games whose grid was solved at the end of their script
+    violations: List[str]  # the first invariant violations found
+    violation_count: int
+    seconds: float
+
+    @property
+    def commands_per_second(self) -> float:
+        return self.commands / self.seconds if self.seconds else 0.0
+
+
+def random_script(line: Tuple[str, str], length: int, rng: random.Random) -> Script:
+    """Returns a script of `length` random commands for the puzzle `line`.
+
+    Most commands place a number: the right number half of the time, and a random one otherwise, at a random cell
+    that may already be filled. The rest are undos, redos, hints and a few commands that aren't valid at all.
+    """
+    solution = line[1]
+    commands: List[str] = []
+    for _ in range(length):
+        roll = rng.random()
+        cell = rng.randrange(81)
+        if roll < 0.4:
+            number = solution[cell] if solution else str(rng.randint(1, 9))
+        elif roll < 0.8:
+            number = str(rng.randint(1, 9))
+        elif roll < 0.87:
+            commands.append('u')
+            continue
+        elif roll < 0.9:
+            commands.append('r')
+            continue
+        elif roll < 0.98:
+            commands.append('h')
+            continue
+        else:
+            commands.append(rng.choice(('0a1', 'j12', '12', 'xyz')))
+            continue
+        # both orders of the coordinates are accepted
+        if rng.random() < 0.5:
+            commands.append(f'{number}{ROW_LETTERS[cell // 9].lower()}{cell % 9 + 1}')
+        else:
+            commands.append(f'{number}{cell % 9 + 1}{ROW_LETTERS[cell // 9]}')
+    return (line, commands)
+
+
+def read_scripts(source: TextIO) -> Iterator[Script]:
+    """Yields the scripts of a script file, one at a time."""
+    line: Optional[Tuple[str, str]] = None
+    commands: List[str] = []
+    for text in source:
+        text = text.strip()
+        if not text or text.startswith('#'):
+            continue
+        if text.startswith('puzzle '):
+            if line is not None:
+                yield (line, commands)
+            quiz, _, solution = text[len('puzzle ') :].partition(',')
+            line, commands = (quiz, solution), []
+        elif line is None:
+            raise SudokuError('A script file must start with a puzzle line.')
+        else:
+            commands.append(text)
+    if line is not None:
+        yield (line, commands)
+
+
+def write_scripts(scripts: Iterable[Script], output: TextIO) -> None:
+    """Writes the `scripts` in the format that `read_scripts` reads."""
+    for (quiz, solution), commands in scripts:
+        output.write(f'puzzle {quiz},{solution}\n')
+        output.writelines(f'{command}\n' for command in commands)
+
+
+def record_scripts(scripts: Iterable[Script], output: TextIO) -> Iterator[Script]:
+    """Yields the `scripts` one at a time, writing each one to `output` (see `write_scripts`) as it goes by."""
+    for script in scripts:
+        write_scripts([script], output)
+        yield script
+
+
+def check_invariants(game: Game, quiz: List[List[str]]) -> List[str]:
+    """Returns a description of every invariant that the `game` of the `quiz` breaks."""
+    violations = []
+
+    fresh = Board(game.grid)
+    if (game.board.rows, game.board.cols, game.board.boxes) != (fresh.rows, fresh.cols, fresh.boxes):
+        violations.append('the board masks are out of step with the grid')
+    if game.board.is_solved() != fresh.is_solved():
+        violations.append('the board disagrees with the grid about whether it is solved')
+    if game.unfilled_cells != get_unfilled_cells(game.grid):
+        violations.append('the unfilled cells are out of step with the grid')
+
+    moved_cells = {divmod(packed >> 4, 9) for packed in game.moves}
+    filled_cells = {
+        (row, col) for row in range(9) for col in range(9) if game.grid[row][col] != ' ' and quiz[row][col] == ' '
+    }
+    if len(moved_cells) != len(game.moves) or moved_cells != filled_cells:
+        violations.append('the move log does not match the cells filled in')
+    if any(game.grid[row][col] != quiz[row][col] for row in range(9) for col in range(9) if quiz[row][col] != ' '):
+        violations.append('a given number was changed')
+
+    history = game.history
+    if history.board.to_grid() != game.grid:
+        violations.append('the board of the history is out of step with the grid')
+    if history.current.moves() != [(divmod(packed >> 4, 9), packed & 0xF) for packed in game.moves]:
+        violations.append('the branch of the history does not match the move log')
+
+    return violations
+
+
+def replay(script: Script, check_every: int = 0) -> Tuple[Counter, List[str]]:
+    """Plays the `script`, and returns the counts of what happened and the invariant violations found.
+
+    The invariants are checked once the script is done, and after every `check_every` commands if it isn't 0.
+    Finally the game goes back to the start of its history and returns to where it was, which must bring back
+    the quiz and then the final grid, and every move is undone, which must bring back the quiz again.
+    """
+    line, commands = script
+    game = Game.from_line(line)
+    quiz = [row[:] for row in game.grid]
+    counts: Counter = Counter(games=1)
+    violations: List[str] = []
+
+    for index, command in enumerate(commands, start=1):
+        counts['commands'] += 1
+        try:
+            action = GAME_KEY_ACTIONS.get(command)
+            if action is not None:
+                hint = action(game)
+                if hint is not None:
+                    counts['hints'] += 1
+                    if str(hint.number) != game.solution[hint.loc[0]][hint.loc[1]]:
+                        violations.append(f'command {index}: the hint {hint} is wrong')
+                else:
+                    counts[ACTION_COUNTS[command]] += 1
+            else:
+                loc, number = translate_move(command)
+                game.move(loc, number)
+                counts['moves'] += 1
+        except SudokuError:
+            counts['rejected'] += 1
+
+        if check_every and index % check_every == 0:
+            violations += [f'command {index}: {violation}' for violation in check_invariants(game, quiz)]
+
+    violations += [f'at the end: {violation}' for violation in check_invariants(game, quiz)]
+    counts['solved'] += game.is_solved()
+
+    end, final_grid = game.history.snapshot(), [row[:] for row in game.grid]
+    game.go_to(game.history.root)
+    if game.grid != quiz:
+        violations.append('going back to the start of the history did not bring back the quiz')
+    game.go_to(end)
+    if game.grid != final_grid:
+        violations.append('going back to the end of the history did not bring back the final grid')
+
+    while game.moves:
+        game.undo()
+    if game.grid != quiz:
+        violations.append('undoing every move did not bring back the quiz')
+
+    return counts, [f'puzzle {line[0]}: {violation}' for violation in violations]
+
+
+def replay_scripts(job: Tuple[List[Script], int]) -> Tuple[Counter, List[str], int]:
+    """Replays a batch of scripts, and returns the total counts, the first violations and the violation count."""
+    scripts, check_every = job
+    totals: Counter = Counter()
+    violations: List[str] = []
+    violation_count = 0
+    for script in scripts:
+        counts, found = replay(script, check_every)
+        totals.update(counts)
+        violation_count += len(found)
+        violations += found[: MAX_REPORTED_VIOLATIONS - len(violations)]
+    return totals, violations, violation_count
+
+
+def random_scripts(
+    dataset: Union[str, Path], games: int, length: int, seed: Optional[int] = None
+) -> Iterator[Script]:
+    """Yields `games` random scripts of `length` commands, on puzzles picked at random from the dataset.
+    Picked puzzles that have no solution are skipped.
+    """
+    rng = random.Random(seed)
+    with open_store(dataset) as store:
+        for _ in range(games):
+            line = store.random_puzzle(rng)
+            try:
+                build_puzzle_solution_pair(line)
+            except SudokuError:
+                continue
+            yield random_script(line, length, rng)
+
+
+def simulate(
+    scripts: Iterable[Script], workers: Optional[int] = None, check_every: int = 0, batch_size: int = 100
+) -> SimulationReport:
+    """Replays the `scripts` on `workers` processes (one per CPU by default), in batches of `batch_size` games."""
+    totals: Counter = Counter()
+    violations: List[str] = []
+    violation_count = 0
+
+    start = time.perf_counter()
+    jobs = ((batch, check_every) for batch in chunked(scripts, batch_size))
+    for counts, found, count in map_chunks(replay_scripts, jobs, workers):
+        totals.update(counts)
+        violation_count += count
+        violations += found[: MAX_REPORTED_VIOLATIONS - len(violations)]
+    seconds = time.perf_counter() - start
+
+    return SimulationReport(
+        games=totals['games'],
+        commands=totals['commands'],
+        moves=totals['moves'],
+        undos=totals['undos'],
+        redos=totals['redos'],
+        hints=totals['hints'],
+        rejected=totals['rejected'],
+        solved=totals['solved'],
+        violations=violations,
+        violation_count=violation_count,
+        seconds=seconds,
+    )
@@ -1,18 +1,166 @@
-"""Simulates a game of Sudoku"""
+"""Simulates a game of Sudoku
+
+Only what a game needs is imported up front. The terminal UI (and `rich`) is imported when an interactive game
+starts, and the modules of the batch commands when that command runs, so that importing this module, or running a
+batch command, starts quickly.
+"""
 # from colorama import Fore, Back
-import csv
-import random
-import utils.ui as ui
-from rich import print as rprint
+from array import array
 from utils.sudoku_utils import build_puzzle_solution_pair, translate_move, SudokuError, get_unfilled_cells
+from utils.puzzle_store import open_store
+from utils.board import Board
+from utils.geometry import geometry_of
+from utils.solver import solve
+from utils.rating import DIFFICULTIES, open_rating_index
+from utils.hints import Hint, HintEngine
+from utils.encoding import Buffer, decode_snapshot, encode_snapshot
+from utils.history import History, Node, PersistentBoard
+from utils.instrumentation import enable_tracing, tracer
 import sys
-from typing import List, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple, Union
 from pathlib import Path
 
+if TYPE_CHECKING:
+    import argparse
+
+# the moves made so far, for games that don't keep their own history
 board_state: List[Tuple[Tuple[int, int], int]] = []
 
+PRESOLVED_PUZZLES = Path('puzzle-dataset', 'pre-solved-sudokus.txt')
+
+
+class Game:
+    """The state of one game of Sudoku: the grid being filled in, its solution, the moves made so far,
+    and the cells that are still unfilled.
 
-def main():
+    Moves are kept on a compact array, each one packed as `cell index << 4 | number`. Every board the game has
+    been through is also kept in its `history`, so moves can be redone, and play can go back to a checkpoint
+    or to any other branch of moves tried.
+    """
+
+    __slots__ = ('grid', 'solution', 'moves', 'unfilled_cells', 'board', 'hints', 'history')
+
+    def __init__(self, grid: List[List[str]], solution: Optional[List[List[str]]] = None) -> None:
+        self.grid = grid
+        self.solution = solution if solution is not None else solve(grid).solution
+        self.moves = array('H')
+        self.unfilled_cells = get_unfilled_cells(grid)
+        self.board = Board(grid)
+        self.hints = HintEngine(grid, self.board, self.unfilled_cells, self.solution)
+        self.history = History(PersistentBoard.from_grid(grid))
+
+    @classmethod
+    def from_line(cls, line: Tuple[str, str]) -> 'Game':
+        """Returns a new game of the quiz and solution in the dataset `line`."""
+        return cls(*build_puzzle_solution_pair(line))
+
+    @classmethod
+    def from_bytes(cls, buffer: Buffer, offset: int = 0) -> 'Game':
+        """Returns the game saved by `to_bytes` into the `buffer` at `offset`. Its moves can still be undone.
+        Raises SudokuError if the snapshot is cut short or corrupt.
+        """
+        snapshot = decode_snapshot(buffer, offset)
+        quiz = snapshot.grid
+        for packed in snapshot.moves:
+            row, col = divmod(packed >> 4, 9)
+            # every move fills a cell of the saved grid with its number, and no cell is filled twice
+            if quiz[row][col] != str(packed & 0xF):
+                raise SudokuError('This saved game is corrupt.')
+            quiz[row][col] = ' '
+        game = cls(quiz, snapshot.solution)
+        for packed in snapshot.moves:
+            game.move(divmod(packed >> 4, 9), packed & 0xF)
+        return game
+
+    def to_bytes(self) -> bytes:
+        """Returns a compact snapshot of the game (90 bytes, plus 2 per move) to save it with."""
+        return encode_snapshot(self.grid, self.solution, self.moves)
+
+    def move(self, loc: Tuple[int, int], number: int) -> None:
+        """Places the `number` at `loc` location in the grid."""
+        row, col = loc
+        if self.grid[row][col] != ' ':
+            raise SudokuError("There's a number already in that position!!")
+
+        self._place(loc, number)
+        self.history.play(loc, number)
+
+    def _place(self, loc: Tuple[int, int], number: int) -> None:
+        row, col = loc
+        self.grid[row][col] = str(number)
+        self.board.add(loc, number)
+        self.moves.append((row * 9 + col) << 4 | number)
+        self.unfilled_cells.discard(loc)
+        self.hints.placed(loc)
+
+    def _take_back(self) -> None:
+        packed = self.moves.pop()
+        row, col = divmod(packed >> 4, 9)
+        self.grid[row][col] = ' '
+        self.board.remove((row, col), packed & 0xF)
+        self.unfilled_cells.add((row, col))
+        self.hints.removed((row, col))
+
+    def undo(self) -> None:
+        """Undoes the last move."""
+        if not self.moves:
+            raise SudokuError("You haven't made a move yet!")
+
+        self._take_back()
+        self.history.undo()
+
+    def redo(self) -> None:
+        """Makes the last undone move again."""
+        node = self.history.redo()
+        self._place(*node.move)  # type: ignore[misc]
+
+    def checkpoint(self, name: str) -> None:
+        """Names the current board, to go back to it with `go_to`."""
+        self.history.checkpoint(name)
+
+    def go_to(self, target: Union[str, Node]) -> None:
+        """Goes back to the checkpoint of that name, or to a node of the history, by taking back the moves
+        since the branch they share and making the moves of the target's branch.
+        """
+        undone, replayed = self.history.goto(target)
+        for _ in undone:
+            self._take_back()
+        for node in replayed:
+            self._place(*node.move)  # type: ignore[misc]
+
+    def hint(self) -> Hint:
+        """Reveals one correct number in an unfilled cell, and returns the hint that explains it."""
+        if not self.unfilled_cells:
+            raise SudokuError('There are no unfilled cells left!')
+
+        hint = self.hints.next_hint()
+        if hint is None:
+            raise SudokuError('This puzzle has no solution.')
+        self.move(hint.loc, hint.number)
+        return hint
+
+    def is_solved(self) -> bool:
+        return self.board.is_solved()
+
+
+# the game keys, and what they do
+GAME_KEY_ACTIONS: Dict[str, Callable[[Game], Optional[Hint]]] = {
+    'u': Game.undo,
+    'h': Game.hint,
+    'r': Game.redo,
+}
+
+
+def main(difficulty: Optional[str] = None):
+    import utils.ui as ui
+    from rich import print as rprint
+    from utils.prefetch import Prefetcher, ThinkTimeWorker
+    from utils.renderer import TerminalRenderer
+
+    # each turn is traced phase by phase when SUDOKU_TRACE names a trace file
+    enable_tracing()
+    # the game is loaded while the player reads the instructions, and the next one while they play
+    games = Prefetcher(lambda: Game.from_line(get_quiz_and_solution_line(str(PRESOLVED_PUZZLES), difficulty)))
     ui.show_game_instructions()
     # print(Fore.CYAN)
     # print(Back.BLUE)
@@ -24,26 +172,28 @@ def main():
         sys.exit('Goodbye!')
     ui.clear_screen()
 
-    presolved_puzzles = Path('puzzle-dataset', 'pre-solved-sudokus.txt')
-    line = get_quiz_and_solution_line(str(presolved_puzzles))
-    grid, solution = build_puzzle_solution_pair(line)
-    unfilled_cells = get_unfilled_cells(grid)
+    try:
+        game = games.take()
+    except SudokuError as e:
+        sys.exit(e.error_message)
+    except OSError as e:
+        sys.exit(f'The puzzle dataset could not be read: {e}')
+    # the next hint is worked out while the player thinks about their move
+    worker = ThinkTimeWorker(game)
 
-    rprint(ui.split_left_right(ui.get_sudoku_grid(grid), ui.explain_coordinate_system()))
+    rprint(ui.split_left_right(ui.get_sudoku_grid(game.grid), ui.explain_coordinate_system()))
 
     try:
         if prompt_to_continue() == 'q':
             sys.exit('Goodbye!')
-        ui.clear_screen()
     except (KeyboardInterrupt, EOFError):
         sys.exit('Goodbye!')
 
-    rprint(ui.split_up_down(ui.get_sudoku_and_keys(grid), ui.get_info()))
-
-    game_key_func = {
-        'u': 'undo_move(grid)',
-        'h': 'get_a_hint(grid, solution, unfilled_cells)',
-    }
+    # only the lines that change between moves are redrawn from here on
+    renderer = TerminalRenderer()
+    # and only the cells that change are rewritten in the text of the grid
+    grid_buffer = ui.GridBuffer(game.grid)
+    renderer.draw(ui.split_up_down(ui.get_sudoku_and_keys(game.grid, grid_buffer), ui.get_info()))
 
     while True:
         try:
@@ -51,21 +201,47 @@ def main():
         except (KeyboardInterrupt, EOFError):
             sys.exit('Goodbye!')
 
-        if prompt in (tuple(ui.GAME_KEYS.values())):  # a game key was entered
-            eval(game_key_func[f'{prompt}'])
-        else:
-            if prompt == 'q':
-                sys.exit('Goodbye!')
+        if prompt == 'q':
+            sys.exit('Goodbye!')
+        tracer.next_turn()
+        info = ''
+        with worker.updating():
             try:
-                location, number = translate_move(prompt)
-                make_move(location, number, grid)
+                if prompt == ui.GAME_KEYS['new game']:
+                    tracer.count(prompt)
+                    with tracer.span('new_game'):
+                        game = worker.game = games.take()
+                    info = 'A new game has started.'
+                elif prompt in GAME_KEY_ACTIONS:  # a game key was entered
+                    tracer.count(prompt)
+                    with tracer.span('action'):
+                        hint = GAME_KEY_ACTIONS[prompt](game)
+                    if hint is not None:
+                        info = f'Hint: {hint}'
+                else:
+                    with tracer.span('translate_move'):
+                        location, number = translate_move(prompt)
+                    with tracer.span('move'):
+                        game.move(location, number)
+                    tracer.count('moves')
             except SudokuError as e:
-                ui.clear_screen()
-                rprint(ui.split_up_down(ui.get_sudoku_and_keys(grid), ui.get_info(f'[bold red]{e.error_message}')))
-                continue
-        ui.clear_screen()
+                tracer.count('errors')
+                info = f'[bold red]{e.error_message}'
+            except OSError as e:  # reading the next game from the dataset failed
+                tracer.count('errors')
+                info = f'[bold red]The next puzzle could not be loaded: {e}'
+        error = worker.take_error()
+        if error is not None and not info:
+            info = f'[yellow]The next hint could not be worked out ahead of time: {error}'
 
-        rprint(ui.split_up_down(ui.get_sudoku_and_keys(grid), ui.get_info()))
+        with tracer.span('validate'):
+            if game.is_solved():
+                info = '[bold green]You solved it!'
+
+        with tracer.span('build_ui'):
+            screen = ui.split_up_down(ui.get_sudoku_and_keys(game.grid, grid_buffer), ui.get_info(info))
+        with tracer.span('draw'):
+            renderer.draw(screen)
 
 
 def prompt_to_continue() -> str:
@@ -82,17 +258,19 @@ def prompt_to_continue() -> str:
     return prompt
 
 
-def get_quiz_and_solution_line(filename: str) -> Tuple[str, str]:
-    """Returns a Tuple containing quiz and solution for the Sudoku game."""
+def get_quiz_and_solution_line(filename: str, difficulty: Optional[str] = None) -> Tuple[str, str]:
+    """Returns a Tuple containing quiz and solution for the Sudoku game.
 
-    with open(filename, 'r') as csv_file:
-        csv_reader = csv.DictReader(csv_file)
-        quiz_and_soln = [row for row in csv_reader]
-        solution = random.choice(quiz_and_soln)
-        grid_soln = solution['solutions']
-        grid_question = solution['quizzes']
+    The puzzle is read from the memory-mapped puzzle store of the `filename` dataset, which is built on first use.
+    If a `difficulty` is given, the puzzle is picked from those of that difficulty, through the dataset's
+    rating index (which is also built on first use).
+    """
 
-    return (grid_question, grid_soln)
+    with open_store(filename) as store:
+        if difficulty is None:
+            return store.random_puzzle()
+        with open_rating_index(filename) as ratings:
+            return store[ratings.random_puzzle_number(difficulty)]
 
 
 def num_has_row_copy(loc: Tuple[int, int], grid: List[List[str]]) -> bool:
@@ -101,14 +279,8 @@ def num_has_row_copy(loc: Tuple[int, int], grid: List[List[str]]) -> bool:
 
     The `loc` (0, 1) refers to the second number (index 1) of the first row (index 0) in the `grid`.
     """
-    row, index = loc[0], loc[1]
-    this_num = grid[row][index]
-
-    # get numbers to the left and right of this number
-    left_nums = grid[row][0:index]
-    right_nums = grid[row][index + 1 :]
-
-    return this_num in left_nums or this_num in right_nums
+    row, col = loc
+    return _has_copy(grid[row][col], grid, geometry_of(grid).row_locs(row))
 
 
 def num_has_column_copy(loc: Tuple[int, int], grid: List[List[str]]) -> bool:
@@ -117,112 +289,438 @@ def num_has_column_copy(loc: Tuple[int, int], grid: List[List[str]]) -> bool:
 
     The `loc` (0, 1) refers to the second number (index 1) of the first row (index 0) in the `grid`.
     """
-    # unpacks the row and col from the `loc` tuple
-    _row, _col = loc
-    this_num = grid[_row][_col]
-
-    # Get numbers from the current column
-    column_nums = [grid[row][_col] for row in range(len(grid))]
-
-    # Delete the number that is being checked from the column
-    del column_nums[column_nums.index(this_num)]
-
-    # returns True if the number is in the column else returns False
-    return this_num in column_nums
+    row, col = loc
+    return _has_copy(grid[row][col], grid, geometry_of(grid).col_locs(col))
 
 
 def num_has_sub_grid_copy(loc: Tuple[int, int], grid: List[List[str]]) -> bool:
-    """Returns True if the number in `loc` location in the `grid` has a duplicate in the same 3 X 3 sub-grid.
+    """Returns True if the number in `loc` location in the `grid` has a duplicate in the same sub-grid.
     Returns False otherwise.
 
     The `loc` (0, 1) refers to the second number (index 1) of the first row (index 0) in the `grid`.
     """
     row, col = loc
-    this_num = grid[row][col]
-    if row in (1, 4, 7):
-        row -= 1
-    elif row in (2, 5, 8):
-        row -= 2
-
-    if col in (1, 4, 7):
-        col -= 1
-    elif col in (2, 5, 8):
-        col -= 2
-    count = 0
-    for i in range(row, row + 3):
-        for j in range(col, col + 3):
-            if this_num == grid[i][j]:
-                count += 1
-
-    return True if count > 1 else False
-
+    geometry = geometry_of(grid)
+    return _has_copy(grid[row][col], grid, geometry.box_locs(geometry.box_of_loc[row][col]))
+
+
+def _has_copy(number: str, grid: List[List[str]], unit: Tuple[Tuple[int, int], ...]) -> bool:
+    """Returns True if `number` appears more than once among the `unit` locations of the `grid`."""
+    seen = False
+    for row, col in unit:
+        if grid[row][col] == number:
+            if seen:
+                return True
+            seen = True
+    return False
+
+
+def make_move(
+    loc: Tuple[int, int],
+    number: int,
+    grid: List[List[str]],
+    board: Optional[Board] = None,
+    history: Optional[List[Tuple[Tuple[int, int], int]]] = None,
+) -> None:
+    """Places the `number` at `loc` location in the `grid`, and records it in the `board` masks if one is given.
 
-def make_move(loc: Tuple[int, int], number: int, grid: List[List[str]]) -> None:
-    """Places the `number` at `loc` location in the `grid`"""
+    The move is added to the `history` of the game, which defaults to the module's `board_state`.
+    """
+    if history is None:
+        history = board_state
 
     row, col = loc
 
     # Check if the desired location is empty or not
     if grid[row][col] == " ":
         grid[row][col] = str(number)
+        if board is not None:
+            board.add(loc, number)
 
         # Add the current location and number to the board_state list after each move.
         # This makes it easier to undo the last move later on.
-        board_state.append((loc, number))
+        history.append((loc, number))
     else:
         print("There's a number already in that position!!")
 
 
-def undo_move(grid: List[List[str]]):
-    """Undoes a move made by the player."""
+def undo_move(
+    grid: List[List[str]],
+    board: Optional[Board] = None,
+    history: Optional[List[Tuple[Tuple[int, int], int]]] = None,
+):
+    """Undoes a move made by the player, and removes it from the `board` masks if one is given.
+
+    The move is taken from the `history` of the game, which defaults to the module's `board_state`.
+    """
+    if history is None:
+        history = board_state
 
     # Check if the player has made any previous move or not
-    if len(board_state) < 1:
+    if len(history) < 1:
         print("You haven't made a move yet!")
         return
 
-    # Get the last location and number from the board_state list.
-    loc, number = board_state.pop()
+    # Get the last location and number from the history.
+    loc, number = history.pop()
     row, col = loc
     grid[row][col] = " "
+    if board is not None:
+        board.remove(loc, number)
 
 
-def sudoku_is_solved(grid: List[List[str]]) -> bool:
+def sudoku_is_solved(grid: List[List[str]], board: Optional[Board] = None) -> bool:
     """Returns True if the sudoku has been solved.
     Returns False otherwise.
-    """
-    for row in range(len(grid)):
-        for col in range(len(grid)):
-            if grid[row][col] == " ":
-                return False
-            elif (
-                num_has_row_copy((row, col), grid)
-                or num_has_column_copy((row, col), grid)
-                or num_has_sub_grid_copy((row, col), grid)
-            ) == True:
-                return False
 
-    return True
+    Pass the `board` that has been kept in step with the `grid` to answer without scanning the grid.
+    """
+    if board is None:
+        board = Board(grid)
+    return board.is_solved()
 
 
 def get_a_hint(
-    grid_incomplete: List[List[str]], grid_complete: List[List[str]], unfilled_cells: List[Tuple[int, int]]
+    grid_incomplete: List[List[str]],
+    grid_complete: Optional[List[List[str]]],
+    unfilled_cells: Set[Tuple[int, int]],
+    board: Optional[Board] = None,
+    history: Optional[List[Tuple[Tuple[int, int], int]]] = None,
 ) -> None:
-    """Gives the player a hint, by revealing one correct number in the unsolved Sudoku."""
+    """Gives the player a hint, by revealing one correct number in the unsolved Sudoku.
+
+    A number that can be worked out from the grid is preferred. When the solution (`grid_complete`)
+    isn't known, it is worked out from the current grid.
+    """
 
     # do nothing if there are no unfilled cells left
     if not len(unfilled_cells):
         return
 
-    empty_cell = random.choice(unfilled_cells)
-    row = empty_cell[0]
-    col = empty_cell[1]
-    hint_number = int(grid_complete[row][col])
-    make_move((row, col), hint_number, grid_incomplete)
+    if grid_complete is None:
+        grid_complete = solve(grid_incomplete).solution
+        if grid_complete is None:  # the moves made so far can't lead to a solution
+            return
+
+    if board is None:
+        board = Board(grid_incomplete)
+    hint = HintEngine(grid_incomplete, board, unfilled_cells, grid_complete).next_hint()
+    if hint is None:
+        return
+    make_move(hint.loc, hint.number, grid_incomplete, board, history)
 
     # remove this empty cell from the collection of empty cells
-    unfilled_cells.remove(empty_cell)
+    unfilled_cells.discard(hint.loc)
+
+
+def build_parser() -> 'argparse.ArgumentParser':
+    """Returns the command line parser. It only imports the choices of the batch commands, not their modules."""
+    import argparse
+    from utils.choices import EXECUTOR_NAMES, SYMMETRY_NAMES
+
+    parser = argparse.ArgumentParser(prog='sudoku.py', description='Play Sudoku, or run a batch command.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    play = commands.add_parser('play', help='play a game of Sudoku')
+    play.add_argument('--difficulty', choices=DIFFICULTIES, default=None)
+
+    rate = commands.add_parser('rate', help='rate the difficulty of every puzzle in a dataset, and index the ratings')
+    rate.add_argument('dataset', nargs='?', default=str(PRESOLVED_PUZZLES))
+    rate.add_argument('--workers', type=int, default=None, help='number of processes (default: one per CPU)')
+    rate.add_argument(
+        '--cache',
+        metavar='STORE',
+        default=None,
+        help='a result store file to take cached difficulties from and add new ones to',
+    )
+
+    generate = commands.add_parser('generate', help='generate new puzzles with unique solutions')
+    generate.add_argument('output', help='the dataset file to write, or - for standard output')
+    generate.add_argument('--count', type=int, default=1000, help='number of puzzles to generate')
+    generate.add_argument('--clues', type=int, default=30, help='number of numbers given in each quiz')
+    generate.add_argument('--workers', type=int, default=None, help='number of processes (default: one per CPU)')
+    generate.add_argument('--seed', type=int, default=None)
+
+    validate = commands.add_parser('validate', help='check every quiz and solution pair in a puzzle dataset')
+    validate.add_argument('dataset', nargs='?', default=str(PRESOLVED_PUZZLES))
+    validate.add_argument('--workers', type=int, default=None, help='number of processes (default: one per CPU)')
+    validate.add_argument('--chunk-size', type=int, default=10_000, help='number of lines sent to a process at a time')
+
+    solve_all = commands.add_parser('solve-all', help='solve every quiz in a dataset, comparing executors')
+    solve_all.add_argument('dataset', help='a dataset of quizzes, with or without solutions')
+    solve_all.add_argument('output', help='the dataset file to write the quizzes and their solutions to')
+    solve_all.add_argument(
+        '--executor',
+        action='append',
+        choices=EXECUTOR_NAMES,
+        help='how to solve the quizzes; give it more than once to compare executors (default: all of them)',
+    )
+    solve_all.add_argument(
+        '--workers', type=int, default=None, help='number of threads or processes (default: one per CPU)'
+    )
+    solve_all.add_argument('--batch-size', type=int, default=500, help='number of quizzes sent to a worker at a time')
+    solve_all.add_argument(
+        '--cache',
+        metavar='STORE',
+        default=None,
+        help='a result store file to take cached solutions from and add new ones to; '
+        'executors after the first are then served from it',
+    )
+
+    dedup = commands.add_parser('dedup', help='find repeated puzzles in a dataset, and index its puzzle hashes')
+    dedup.add_argument('dataset', nargs='?', default=str(PRESOLVED_PUZZLES))
+    dedup.add_argument(
+        '--check', metavar='NEW_DATASET', default=None, help='list the puzzles of this dataset that are already indexed'
+    )
+    dedup.add_argument('--workers', type=int, default=None, help='number of processes (default: one per CPU)')
+
+    query = commands.add_parser('query', help='find puzzles by their number of clues and the pattern of their givens')
+    query.add_argument('dataset', nargs='?', default=str(PRESOLVED_PUZZLES))
+    query.add_argument('--clues', type=int, default=None, help='the number of numbers given in the quiz')
+    query.add_argument('--symmetry', choices=SYMMETRY_NAMES, default=None, help='a symmetry of the given cells')
+    query.add_argument(
+        '--empty',
+        metavar='UNIT',
+        action='append',
+        default=[],
+        help='a row (A-I), column (1-9) or sub-grid (box1-box9) with no numbers given; can be given more than once',
+    )
+    query.add_argument('--limit', type=int, default=10, help='the most puzzles to list')
+
+    simulate = commands.add_parser('simulate', help='replay scripted moves against many games, without the UI')
+    simulate.add_argument('dataset', nargs='?', default=str(PRESOLVED_PUZZLES))
+    simulate.add_argument('--games', type=int, default=1000, help='number of games to play random scripts on')
+    simulate.add_argument('--commands', type=int, default=200, help='number of commands in each random script')
+    simulate.add_argument('--seed', type=int, default=None)
+    simulate.add_argument('--replay', metavar='SCRIPTS', default=None, help='replay this script file instead')
+    simulate.add_argument('--record', metavar='SCRIPTS', default=None, help='write the random scripts to this file')
+    simulate.add_argument(
+        '--check-every', type=int, default=0, help='check the invariants every this many commands, not only at the end'
+    )
+    simulate.add_argument('--workers', type=int, default=None, help='number of processes (default: one per CPU)')
+
+    serve = commands.add_parser('serve', help='serve games to many players over a line-based protocol')
+    serve.add_argument('dataset', nargs='?', default=str(PRESOLVED_PUZZLES))
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+
+    loadgen = commands.add_parser('loadgen', help='measure the move latency of a game server')
+    loadgen.add_argument('--host', default='127.0.0.1')
+    loadgen.add_argument('--port', type=int, default=8765)
+    loadgen.add_argument('--clients', type=int, default=100, help='number of concurrent sessions')
+    loadgen.add_argument('--commands', type=int, default=100, help='number of commands sent by each session')
+    loadgen.add_argument(
+        '--local', metavar='DATASET', default=None, help='start a server for this dataset in-process, and load it'
+    )
+
+    trace_summary = commands.add_parser('trace-summary', help='print the latency of each phase of a traced game')
+    trace_summary.add_argument('trace', help='a trace file written by a game played with SUDOKU_TRACE set')
+
+    return parser
+
+
+def run_command(argv: List[str]) -> int:
+    """Runs one of the non-interactive commands given on the command line, and returns its exit status.
+    A SudokuError, such as a dataset that has no puzzles, is printed and gives status 2.
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        return _run_command(args)
+    except SudokuError as e:
+        print(e.error_message)
+        return 2
+
+
+def _run_command(args: 'argparse.Namespace') -> int:
+    if args.command == 'play':
+        main(args.difficulty)
+        return 0
+
+    if args.command == 'rate':
+        from utils.rating import build_rating_index
+        from utils.result_cache import ResultCache, ResultStore
+
+        store = ResultStore(args.cache) if args.cache else None
+        cache = ResultCache(store) if store is not None else None
+        try:
+            rating_report = build_rating_index(args.dataset, workers=args.workers, cache=cache)
+            if store is not None:
+                store.write_index()
+        finally:
+            if store is not None:
+                store.close()
+
+        for difficulty, count in zip(DIFFICULTIES, rating_report.counts):
+            print(f'{difficulty}: {count} puzzles')
+        if rating_report.unrated:
+            print(f'{len(rating_report.unrated)} puzzles have no solution, and were left out.')
+        if cache is not None:
+            stats = cache.stats()
+            print(f'Cache: {stats.hits} hits, {stats.disk_hits} from disk, {stats.misses} misses.')
+        return 0
+
+    if args.command == 'generate':
+        from utils.generator import write_puzzles
+
+        if args.output == '-':
+            result = write_puzzles(sys.stdout, args.count, args.clues, args.workers, seed=args.seed)
+        else:
+            with open(args.output, 'w') as output:
+                result = write_puzzles(output, args.count, args.clues, args.workers, seed=args.seed)
+        print(
+            f'Generated {result.puzzles} puzzles in {result.seconds:.2f}s on {result.workers} processes '
+            f'({result.puzzles_per_second:,.1f} puzzles/sec, {result.puzzles_per_second_per_core:,.1f} per core).',
+            file=sys.stderr,
+        )
+        return 0
+
+    if args.command == 'validate':
+        from utils.validation import validate_dataset
+
+        report = validate_dataset(args.dataset, workers=args.workers, chunk_size=args.chunk_size)
+        for line_number, reason in report.invalid:
+            print(f'line {line_number}: {reason}')
+        print(
+            f'Checked {report.checked} puzzles in {report.seconds:.2f}s '
+            f'({report.puzzles_per_second:,.0f} puzzles/sec), {len(report.invalid)} invalid.'
+        )
+        return 1 if report.invalid else 0
+
+    if args.command == 'solve-all':
+        from utils.batch_solve import solve_dataset
+        from utils.choices import EXECUTOR_NAMES
+        from utils.result_cache import ResultCache, ResultStore
+
+        store = ResultStore(args.cache) if args.cache else None
+        cache = ResultCache(store) if store is not None else None
+        reports = []
+        try:
+            for executor in args.executor or EXECUTOR_NAMES:
+                # the first executor writes the solutions, and the rest are only timed
+                if not reports:
+                    with open(args.output, 'w') as output:
+                        reports.append(
+                            solve_dataset(args.dataset, output, executor, args.workers, args.batch_size, cache)
+                        )
+                else:
+                    reports.append(solve_dataset(args.dataset, None, executor, args.workers, args.batch_size, cache))
+            if store is not None:
+                store.write_index()
+        finally:
+            if store is not None:
+                store.close()
+
+        print(f'Solved {reports[0].puzzles} puzzles, {reports[0].unsolved} without a solution.')
+        if cache is not None:
+            stats = cache.stats()
+            print(
+                f'Cache: {stats.hits} hits, {stats.disk_hits} from disk, {stats.misses} misses, '
+                f'{stats.evictions} evictions.'
+            )
+            if len(reports) > 1:
+                print('The executors are not compared, as the ones after the first were served from the cache.')
+        fastest = max(report.puzzles_per_second for report in reports)
+        for report in reports:
+            line = (
+                f'{report.executor:>13} on {report.workers:>2} workers: {report.seconds:8.2f}s '
+                f'{report.puzzles_per_second:>12,.0f} puzzles/sec'
+            )
+            # nothing was solved in an empty dataset, and with a cache the executors after the first only read it
+            if fastest and cache is None:
+                line += f' ({report.puzzles_per_second / fastest:.0%} of the fastest)'
+            print(line)
+        return 0
+
+    if args.command == 'dedup':
+        from utils.dedup import build_hash_index, open_hash_index
+
+        if args.check:
+            with open_hash_index(args.dataset) as index:
+                repeats = 0
+                for line_number, first in index.find_repeats(args.check, workers=args.workers):
+                    print(f'line {line_number} repeats line {first} of {args.dataset}')
+                    repeats += 1
+            print(f'{repeats} puzzles of {args.check} are already in {args.dataset}.')
+            return 0
+
+        dedup_report = build_hash_index(args.dataset, workers=args.workers)
+        for line_number, first in dedup_report.duplicates:
+            print(f'line {line_number} repeats line {first}')
+        print(
+            f'Hashed {dedup_report.puzzles} puzzles in {dedup_report.seconds:.2f}s: '
+            f'{dedup_report.unique} unique, {len(dedup_report.duplicates)} repeats.'
+        )
+        return 0
+
+    if args.command == 'query':
+        from utils.pattern_index import open_pattern_index
+
+        with open_pattern_index(args.dataset) as index:
+            numbers = index.query(args.clues, args.symmetry, args.empty, limit=args.limit)
+            for quiz, solution in index.read_puzzles(numbers):
+                print(f'{quiz},{solution}')
+        return 0
+
+    if args.command == 'simulate':
+        import simulation
+
+        from contextlib import ExitStack
+
+        # the scripts are streamed through the simulation, and only written out as they go by if asked to
+        with ExitStack() as files:
+            if args.replay:
+                scripts = simulation.read_scripts(files.enter_context(open(args.replay)))
+            else:
+                scripts = simulation.random_scripts(args.dataset, args.games, args.commands, args.seed)
+            if args.record:
+                scripts = simulation.record_scripts(scripts, files.enter_context(open(args.record, 'w')))
+            result = simulation.simulate(scripts, args.workers, args.check_every)
+
+        for violation in result.violations:
+            print(violation)
+        print(
+            f'Played {result.games} games, {result.commands} commands in {result.seconds:.2f}s '
+            f'({result.commands_per_second:,.0f} commands/sec): {result.moves} moves, {result.undos} undos, '
+            f'{result.redos} redos, {result.hints} hints, {result.rejected} rejected, {result.solved} solved, '
+            f'{result.violation_count} invariant violations.'
+        )
+        return 1 if result.violation_count else 0
+
+    if args.command == 'serve':
+        import asyncio
+        import server
+
+        try:
+            asyncio.run(server.serve(args.dataset, args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.command == 'loadgen':
+        import asyncio
+        import server
+
+        if args.local:
+            load = asyncio.run(server.generate_local_load(args.local, args.clients, args.commands))
+        else:
+            load = asyncio.run(server.generate_load(args.host, args.port, args.clients, args.commands))
+        print(
+            f'{load.clients} sessions sent {load.commands} commands in {load.seconds:.2f}s '
+            f'({load.commands_per_second:,.0f} commands/sec): '
+            f'p50 {load.p50_ms:.2f} ms, p99 {load.p99_ms:.2f} ms'
+        )
+        return 0
+
+    if args.command == 'trace-summary':
+        from utils.instrumentation import summarize
+
+        print(summarize(args.trace))
+        return 0
+
+    return 0
 
 
 if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        sys.exit(run_command(sys.argv[1:]))
     main()
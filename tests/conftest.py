@@ -0,0 +1,37 @@
+"""Puzzles and fixtures shared by the tests."""
+
+import random
+
+import pytest
+
+PUZZLE = '004300209005009001070060043006002087190007400050083000600000105003508690042910300'
+SOLUTION = '864371259325849761971265843436192587198657432257483916689734125713528694542916378'
+OTHER_PUZZLE = '040100050107003960520008000000000017000906800803050620090060543600080700250097100'
+OTHER_SOLUTION = '346179258187523964529648371965832417472916835813754629798261543631485792254397186'
+# needs guessing to solve
+HARD_PUZZLE = '800000000003600000070090200050007000000045700000100030001000068008500010090000400'
+HARD_SOLUTION = '812753649943682175675491283154237896369845721287169534521974368438526917796318452'
+# two 1s in the first row, so it has no solution
+BROKEN = '11' + '0' * 79
+
+
+def equivalent(quiz: str, rng: random.Random) -> str:
+    """Returns a random equivalent of the `quiz`."""
+
+    def random_order():
+        return [band * 3 + row for band in rng.sample(range(3), 3) for row in rng.sample(range(3), 3)]
+
+    rows, cols = random_order(), random_order()
+    grid = [[quiz[row * 9 + col] for col in cols] for row in rows]
+    if rng.random() < 0.5:
+        grid = [list(col) for col in zip(*grid)]
+    labels = ['0'] + [str(number) for number in rng.sample(range(1, 10), 9)]
+    return ''.join(labels[int(cell)] for row in grid for cell in row)
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    """A dataset of one puzzle and its solution."""
+    path = tmp_path / 'puzzles.txt'
+    path.write_text(f'quizzes,solutions\n{PUZZLE},{SOLUTION}\n')
+    return path
@@ -0,0 +1,50 @@
+import io
+
+import pytest
+from conftest import BROKEN, PUZZLE, SOLUTION
+from sudoku import run_command
+from utils.batch_solve import EXECUTORS, solve_dataset
+from utils.sudoku_utils import SudokuError
+
+
+@pytest.mark.parametrize('executor', list(EXECUTORS))
+def test_every_executor_writes_the_same_solutions(tmp_path, executor):
+    dataset = tmp_path / 'quizzes.csv'
+    dataset.write_text('quizzes,solutions\n' + f'{PUZZLE},\n{BROKEN},\n' * 5)
+    output = io.StringIO()
+
+    report = solve_dataset(dataset, output, executor, workers=2, batch_size=3)
+
+    assert report.executor == executor
+    assert (report.puzzles, report.unsolved) == (10, 5)
+    lines = output.getvalue().splitlines()
+    assert lines[0] == 'quizzes,solutions'
+    assert lines[1:3] == [f'{PUZZLE},{SOLUTION}', f'{BROKEN},{"0" * 81}']
+    assert len(lines) == 11
+
+
+def test_shared_memory_batches_need_full_length_quizzes(tmp_path):
+    dataset = tmp_path / 'quizzes.csv'
+    dataset.write_text(f'{PUZZLE[:-1]},\n')
+
+    with pytest.raises(SudokuError, match='81 digits'):
+        solve_dataset(dataset, None, 'shared-memory', workers=1)
+
+
+def test_an_empty_dataset_is_solved_without_comparing_speeds(tmp_path, capsys):
+    dataset = tmp_path / 'quizzes.csv'
+    dataset.write_text('quizzes,solutions\n')
+
+    assert run_command(['solve-all', str(dataset), str(tmp_path / 'out.csv'), '--executor', 'serial']) == 0
+    assert 'of the fastest' not in capsys.readouterr().out
+
+
+def test_executors_served_from_the_cache_are_not_compared(tmp_path, capsys):
+    dataset = tmp_path / 'quizzes.csv'
+    dataset.write_text('quizzes,solutions\n' + f'{PUZZLE},\n' * 3)
+    argv = ['solve-all', str(dataset), str(tmp_path / 'out.csv'), '--executor', 'serial', '--executor', 'thread']
+
+    assert run_command(argv + ['--cache', str(tmp_path / 'results')]) == 0
+    output = capsys.readouterr().out
+    assert 'of the fastest' not in output
+    assert 'not compared' in output
@@ -0,0 +1,37 @@
+import json
+
+from benchmarks.hot_paths import BENCHMARKS, Result, find_regressions, main, measure
+
+
+def test_every_hot_path_is_measured():
+    for benchmark in BENCHMARKS.values():
+        result = measure(benchmark, repeats=1, min_seconds=0)
+        assert result.ops_per_sec > 0
+        assert result.peak_bytes >= 0
+
+
+def test_blocks_are_counted_while_the_results_are_held():
+    # every grid is a list of 9 row lists, so building one allocates at least 10 blocks
+    assert measure(BENCHMARKS['build_grid'], repeats=1, min_seconds=0).blocks_per_op >= 10
+
+
+def test_slowdowns_past_the_threshold_are_regressions():
+    baseline = {'build_grid': {'ops_per_sec': 1000.0}, 'translate_move': {'ops_per_sec': 1000.0}}
+    results = {'build_grid': Result(850.0, 0, 0.0), 'translate_move': Result(700.0, 0, 0.0)}
+
+    regressions = find_regressions(results, baseline, threshold=0.2)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith('translate_move: 700 ops/sec is 30% below')
+
+
+def test_results_are_saved_and_compared(tmp_path, capsys):
+    output = tmp_path / 'results.json'
+    assert main(['--output', str(output), '--repeats', '1', 'translate_move']) == 0
+    saved = json.loads(output.read_text())
+    assert list(saved['results']) == ['translate_move']
+
+    saved['results']['translate_move']['ops_per_sec'] *= 100
+    output.write_text(json.dumps(saved))
+    assert main(['--baseline', str(output), '--repeats', '1', 'translate_move']) == 1
+    assert 'REGRESSION translate_move' in capsys.readouterr().err
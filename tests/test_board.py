@@ -0,0 +1,46 @@
+from conftest import PUZZLE, SOLUTION
+from sudoku import make_move, undo_move, sudoku_is_solved
+from utils.board import Board
+from utils.sudoku_utils import build_grid, translate_move
+
+
+def test_legal_placements_follow_row_column_and_sub_grid_masks():
+    board = Board(build_grid(PUZZLE))
+
+    assert board.is_legal((0, 0), 8)
+    assert not board.is_legal((0, 0), 4)  # already in row A
+    assert not board.is_legal((0, 0), 6)  # already in column 1
+    assert not board.is_legal((0, 0), 7)  # already in the top-left sub-grid
+    assert board.candidates((0, 0)) == 1 << 8
+
+
+def test_board_follows_moves_and_undos():
+    grid = build_grid(PUZZLE)
+    board = Board(grid)
+
+    move = translate_move('8A1')
+    make_move(move[0], move[1], grid, board)
+    assert not board.is_legal((0, 1), 8)
+
+    undo_move(grid, board)
+    assert board.is_legal((0, 1), 8)
+    assert grid == build_grid(PUZZLE)
+
+
+def test_board_is_solved_only_without_repeats():
+    solved = build_grid(SOLUTION)
+    board = Board(solved)
+    assert board.is_solved()
+    assert sudoku_is_solved(solved, board)
+
+    # swap two numbers in the first row, so that their columns and sub-grids now repeat
+    board.remove((0, 0), 8)
+    board.remove((0, 4), 7)
+    board.add((0, 0), 7)
+    board.add((0, 4), 8)
+    assert not board.is_solved()
+
+    # a repeated number keeps its bit in the mask until every copy is gone
+    board.remove((0, 0), 7)
+    assert not board.is_legal((0, 0), 7)
+    assert not board.is_solved()
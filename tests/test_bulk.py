@@ -0,0 +1,29 @@
+import pytest
+from conftest import PUZZLE, SOLUTION
+from utils.bulk import givens_agree, grids_are_solved, parse_grids
+from utils.sudoku_utils import SudokuError, build_grid
+
+SWAPPED = SOLUTION[1] + SOLUTION[0] + SOLUTION[2:]
+
+
+def test_grids_are_parsed_into_one_array():
+    grids = parse_grids([PUZZLE, SOLUTION])
+
+    assert grids.shape == (2, 9, 9)
+    assert str(grids.dtype) == 'uint8'
+    assert [[str(n) if n else ' ' for n in row] for row in grids[0].tolist()] == build_grid(PUZZLE)
+
+
+def test_malformed_grids_are_rejected():
+    with pytest.raises(SudokuError):
+        parse_grids([PUZZLE, SOLUTION[:80]])
+    with pytest.raises(SudokuError):
+        parse_grids([PUZZLE[:80] + 'x'])
+
+
+def test_every_grid_is_checked_at_once():
+    quizzes = parse_grids([PUZZLE, PUZZLE[:2] + '5' + PUZZLE[3:], PUZZLE])
+    solutions = parse_grids([SOLUTION, SWAPPED, PUZZLE])
+
+    assert grids_are_solved(solutions).tolist() == [True, False, False]
+    assert givens_agree(quizzes, solutions).tolist() == [True, False, True]
@@ -0,0 +1,26 @@
+import random
+
+from conftest import OTHER_PUZZLE, PUZZLE, equivalent
+from utils.canonical import canonical_form, puzzle_hash
+
+
+def test_equivalent_quizzes_have_the_same_canonical_form():
+    rng = random.Random(7)
+    form = canonical_form(PUZZLE)
+
+    for _ in range(20):
+        assert canonical_form(equivalent(PUZZLE, rng)) == form
+
+
+def test_canonical_form_relabels_numbers_in_order_of_appearance():
+    form = canonical_form(PUZZLE)
+
+    assert len(form) == 81
+    assert form.count('0') == PUZZLE.count('0')
+    first_appearances = sorted({number: form.index(number) for number in set(form) - {'0'}}.items(), key=lambda x: x[1])
+    assert [number for number, _ in first_appearances] == list('123456789')
+
+
+def test_different_quizzes_have_different_hashes():
+    assert puzzle_hash(PUZZLE) != puzzle_hash(OTHER_PUZZLE)
+    assert puzzle_hash(PUZZLE) == puzzle_hash(equivalent(PUZZLE, random.Random(1)))
@@ -0,0 +1,54 @@
+import gzip
+import random
+import shutil
+from pathlib import Path
+
+import pytest
+from utils.dataset import iter_lines, iter_puzzles, sample_puzzles, shard_puzzles
+from utils.validation import validate_dataset
+
+DATASET = Path(__file__).parent.parent / 'puzzle-dataset' / 'pre-solved-sudokus.txt'
+
+
+@pytest.fixture
+def gzipped(tmp_path):
+    path = tmp_path / 'puzzles.txt.gz'
+    with open(DATASET, 'rb') as source, gzip.open(path, 'wb') as target:
+        shutil.copyfileobj(source, target)
+    return path
+
+
+def test_puzzles_are_streamed_without_the_header():
+    first_line = next(iter_lines(DATASET))
+    assert first_line[0] == 2
+    quiz, solution = next(iter_puzzles(DATASET))
+    assert len(quiz) == len(solution) == 81
+
+
+def test_gzipped_datasets_are_read_transparently(gzipped):
+    assert list(iter_puzzles(gzipped)) == list(iter_puzzles(DATASET))
+    assert validate_dataset(gzipped, workers=1).checked == 500
+
+
+def test_puzzles_can_be_sliced():
+    puzzles = list(iter_puzzles(DATASET))
+    assert list(iter_puzzles(DATASET, start=10, stop=20)) == puzzles[10:20]
+    assert list(iter_puzzles(DATASET, start=1, step=7)) == puzzles[1::7]
+
+
+@pytest.mark.parametrize('compressed', [False, True])
+def test_shards_cover_every_puzzle_once(compressed, gzipped):
+    path = gzipped if compressed else DATASET
+    shards = [list(shard_puzzles(path, index, 7)) for index in range(7)]
+
+    assert sorted(puzzle for shard in shards for puzzle in shard) == sorted(iter_puzzles(DATASET))
+    assert all(shards)
+
+
+def test_reservoir_sample_is_drawn_from_the_dataset():
+    puzzles = set(iter_puzzles(DATASET))
+    sample = sample_puzzles(DATASET, 10, random.Random(3))
+
+    assert len(sample) == len(set(sample)) == 10
+    assert set(sample) <= puzzles
+    assert len(sample_puzzles(DATASET, 1000)) == 500
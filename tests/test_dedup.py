@@ -0,0 +1,34 @@
+import random
+
+from conftest import OTHER_PUZZLE, PUZZLE, equivalent
+from utils.canonical import puzzle_hash
+from utils.dedup import build_hash_index, hash_index_path_for, open_hash_index
+
+THIRD_QUIZ = '600120384008459072000006005000264030070080006940003000310000050089700000502000190'
+
+
+def test_repeats_are_found_and_indexed(tmp_path):
+    dataset = tmp_path / 'puzzles.csv'
+    repeat = equivalent(PUZZLE, random.Random(2))
+    dataset.write_text(f'quizzes,solutions\n{PUZZLE},\n{OTHER_PUZZLE},\n{repeat},\n')
+
+    report = build_hash_index(dataset, workers=1)
+
+    assert (report.puzzles, report.unique) == (3, 2)
+    assert report.duplicates == [(4, 2)]
+    assert hash_index_path_for(dataset).exists()
+    with open_hash_index(dataset) as index:
+        assert len(index) == 2
+        assert index.first_line(puzzle_hash(repeat)) == 2
+        assert puzzle_hash(OTHER_PUZZLE) in index
+        assert puzzle_hash(THIRD_QUIZ) not in index
+
+
+def test_new_imports_are_checked_against_the_index(tmp_path):
+    dataset = tmp_path / 'puzzles.csv'
+    dataset.write_text(f'{PUZZLE},\n{OTHER_PUZZLE},\n')
+    new_import = tmp_path / 'import.csv'
+    new_import.write_text(f'{THIRD_QUIZ},\n{equivalent(OTHER_PUZZLE, random.Random(4))},\n')
+
+    with open_hash_index(dataset) as index:
+        assert list(index.find_repeats(new_import, workers=1)) == [(2, 2)]
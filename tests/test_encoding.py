@@ -0,0 +1,57 @@
+from array import array
+
+import pytest
+from conftest import PUZZLE, SOLUTION
+from utils.encoding import (
+    PACKED_GRID_SIZE,
+    decode_snapshot,
+    encode_snapshot,
+    iter_snapshots,
+    pack_grid,
+    unpack_grid,
+)
+from utils.sudoku_utils import SudokuError, build_grid
+
+
+def test_grids_pack_into_41_bytes_and_back():
+    grid = build_grid(PUZZLE)
+
+    packed = pack_grid(grid)
+
+    assert len(packed) == PACKED_GRID_SIZE
+    assert packed[0] == 0x00 and packed[1] == 0x43
+    assert unpack_grid(packed) == grid
+
+
+def test_snapshots_round_trip_with_and_without_a_solution():
+    moves = array('H', [(0 << 4) | 8, (80 << 4) | 8])
+
+    snapshot = decode_snapshot(encode_snapshot(build_grid(PUZZLE), build_grid(SOLUTION), moves))
+    assert snapshot.grid == build_grid(PUZZLE)
+    assert snapshot.solution == build_grid(SOLUTION)
+    assert snapshot.moves == moves
+
+    assert decode_snapshot(encode_snapshot(build_grid(PUZZLE), None, array('H'))).solution is None
+
+
+def test_snapshots_written_one_after_another_are_split_apart():
+    first = encode_snapshot(build_grid(PUZZLE), None, array('H', [8]))
+    second = encode_snapshot(build_grid(SOLUTION), None, array('H'))
+
+    views = list(iter_snapshots(first + second))
+
+    assert [bytes(view) for view in views] == [first, second]
+
+
+def test_bad_snapshots_are_rejected():
+    snapshot = encode_snapshot(build_grid(PUZZLE), None, array('H', [8]))
+
+    with pytest.raises(SudokuError, match='cut short'):
+        decode_snapshot(snapshot[:-1])
+    with pytest.raises(SudokuError, match='not a saved game'):
+        decode_snapshot(b'XXXX' + snapshot[4:])
+    with pytest.raises(SudokuError, match='corrupt'):
+        unpack_grid(b'\xff' * PACKED_GRID_SIZE)
+    for move in ((81 << 4) | 8, (0 << 4) | 0, (0 << 4) | 10):  # off the grid, and numbers out of range
+        with pytest.raises(SudokuError, match='corrupt'):
+            decode_snapshot(encode_snapshot(build_grid(PUZZLE), None, array('H', [move])))
@@ -0,0 +1,109 @@
+from array import array
+
+import pytest
+from conftest import PUZZLE, SOLUTION
+from sudoku import GAME_KEY_ACTIONS, Game
+from utils.encoding import encode_snapshot
+from utils.sudoku_utils import SudokuError, build_grid
+
+
+def test_games_keep_their_own_state():
+    first = Game.from_line((PUZZLE, SOLUTION))
+    second = Game.from_line((PUZZLE, SOLUTION))
+
+    first.move((0, 0), 8)
+
+    assert first.grid[0][0] == '8'
+    assert second.grid == build_grid(PUZZLE)
+    assert len(first.unfilled_cells) == len(second.unfilled_cells) - 1
+    assert not first.board.is_legal((0, 1), 8)
+    assert second.board.is_legal((0, 1), 8)
+
+
+def test_moves_are_undone_in_reverse_order():
+    game = Game.from_line((PUZZLE, SOLUTION))
+    game.move((0, 0), 8)
+    game.move((8, 8), 8)
+
+    game.undo()
+    assert game.grid[8][8] == ' '
+    assert game.grid[0][0] == '8'
+    assert (8, 8) in game.unfilled_cells
+
+    game.undo()
+    assert game.grid == build_grid(PUZZLE)
+    with pytest.raises(SudokuError, match="You haven't made a move yet!"):
+        game.undo()
+
+
+def test_undone_moves_are_redone_and_branches_are_kept():
+    game = Game.from_line((PUZZLE, SOLUTION))
+    game.move((0, 0), 8)
+    game.checkpoint('corner')
+    game.move((8, 8), 8)
+    game.undo()
+
+    GAME_KEY_ACTIONS['r'](game)
+    assert game.grid[8][8] == '8'
+    with pytest.raises(SudokuError, match='There is no move to redo!'):
+        game.redo()
+
+    game.go_to('corner')
+    game.move((0, 1), 6)  # a new branch
+    other_branch = game.history.snapshot()
+    game.go_to(game.history.root)
+    assert game.grid == build_grid(PUZZLE)
+    assert not game.moves and len(game.unfilled_cells) == PUZZLE.count('0')
+
+    game.go_to(other_branch)
+    assert (game.grid[0][0], game.grid[0][1], game.grid[8][8]) == ('8', '6', ' ')
+    assert list(game.moves) == [0 << 4 | 8, 1 << 4 | 6]
+    assert not game.board.is_legal((0, 2), 6)
+
+
+def test_occupied_cells_are_rejected():
+    game = Game.from_line((PUZZLE, SOLUTION))
+    with pytest.raises(SudokuError, match="There's a number already in that position!!"):
+        game.move((0, 2), 5)
+    assert not game.moves
+
+
+def test_game_keys_dispatch_to_methods():
+    game = Game.from_line((PUZZLE, ''))  # the solution is worked out by the game
+    unfilled = len(game.unfilled_cells)
+
+    for _ in range(unfilled):
+        GAME_KEY_ACTIONS['h'](game)
+    assert game.is_solved()
+    assert game.grid == build_grid(SOLUTION)
+
+    GAME_KEY_ACTIONS['u'](game)
+    assert len(game.unfilled_cells) == 1
+    assert not game.is_solved()
+
+
+def test_games_are_restored_from_their_snapshots():
+    game = Game.from_line((PUZZLE, SOLUTION))
+    game.move((0, 0), 8)
+    game.hint()
+
+    assert len(game.to_bytes()) == 90 + 2 * 2
+    restored = Game.from_bytes(memoryview(b'padding' + game.to_bytes()), offset=len(b'padding'))
+
+    assert restored.grid == game.grid
+    assert restored.solution == game.solution
+    assert restored.moves == game.moves
+    assert restored.unfilled_cells == game.unfilled_cells
+    restored.undo()
+    restored.undo()
+    assert restored.grid == build_grid(PUZZLE)
+
+
+def test_snapshots_with_moves_that_disagree_with_the_grid_are_rejected():
+    game = Game.from_line((PUZZLE, SOLUTION))
+    game.move((0, 0), 8)
+
+    for moves in ([(0 << 4) | 9], [(0 << 4) | 8, (0 << 4) | 8], [(1 << 4) | 6]):
+        snapshot = encode_snapshot(game.grid, game.solution, array('H', moves))
+        with pytest.raises(SudokuError, match='corrupt'):
+            Game.from_bytes(snapshot)
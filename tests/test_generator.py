@@ -0,0 +1,31 @@
+import io
+import random
+
+from utils.generator import generate_puzzle, write_puzzles
+from utils.solver import count_solutions
+from utils.sudoku_utils import build_grid, build_puzzle_solution_pair
+from utils.validation import check_pair, check_lines
+
+
+def test_generated_puzzle_has_a_unique_solution():
+    quiz, solution = generate_puzzle(30, random.Random(7))
+
+    assert 81 - quiz.count('0') == 30
+    assert check_pair(quiz, solution) is None
+    assert count_solutions(build_grid(quiz)) == 1
+
+
+def test_solution_count_stops_at_the_limit():
+    assert count_solutions(build_grid('0' * 81), limit=3) == 3
+    assert count_solutions(build_grid('11' + '0' * 79)) == 0
+
+
+def test_generated_puzzles_are_written_in_dataset_format():
+    output = io.StringIO()
+    report = write_puzzles(output, count=3, clues=35, workers=1, batch_size=2, seed=1)
+
+    lines = output.getvalue().splitlines()
+    assert lines[0] == 'quizzes,solutions'
+    assert len(lines) == 4 and report.puzzles == 3
+    assert not check_lines(list(enumerate(lines[1:], start=2)))
+    build_puzzle_solution_pair(tuple(lines[1].split(',')))
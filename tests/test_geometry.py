@@ -0,0 +1,59 @@
+import pytest
+from sudoku import num_has_column_copy, num_has_row_copy, num_has_sub_grid_copy
+from utils.board import Board
+from utils.geometry import BOX_OF_LOC, PEERS, STANDARD, UNITS, geometry, geometry_of
+from utils.hints import HintEngine
+from utils.solver import count_solutions, solve
+from utils.sudoku_utils import SudokuError, get_unfilled_cells
+
+
+def test_standard_tables():
+    assert len(UNITS) == 27
+    assert all(len(unit) == 9 for unit in UNITS)
+    assert all(len(peers) == 20 for peers in PEERS)
+    assert set(PEERS[0]) == {1, 2, 3, 4, 5, 6, 7, 8, 9, 18, 27, 36, 45, 54, 63, 72, 10, 11, 19, 20}
+    assert BOX_OF_LOC[4][7] == 5
+    assert STANDARD.box_locs(8)[0] == (6, 6)
+
+
+@pytest.mark.parametrize('box_size', [2, 4, 5])
+def test_larger_and_smaller_boards_are_solved(box_size):
+    size = box_size * box_size
+    tables = geometry(box_size)
+    assert len(tables.units) == 3 * size
+    assert all(len(peers) == 3 * size - 2 * box_size - 1 for peers in tables.peers)
+
+    solution = solve([[' '] * size for _ in range(size)]).solution
+
+    assert solution is not None
+    assert Board(solution).is_solved()
+
+
+def test_boards_of_other_sizes_are_checked_and_hinted():
+    grid = [
+        ['1', '2', ' ', '4'],
+        ['3', '4', '1', '2'],
+        ['2', '1', '4', '3'],
+        ['4', '3', '2', '1'],
+    ]
+    board = Board(grid)
+    assert board.is_legal((0, 2), 3)
+    assert not board.is_legal((0, 2), 1)
+    assert count_solutions(grid) == 1
+
+    hint = HintEngine(grid, board, get_unfilled_cells(grid)).next_hint()
+    assert (hint.loc, hint.number, hint.technique) == ((0, 2), 3, 'naked single')
+
+    grid[0][2] = '3'
+    assert not num_has_row_copy((0, 2), grid)
+    assert not num_has_column_copy((0, 2), grid)
+    assert not num_has_sub_grid_copy((0, 2), grid)
+    grid[0][2] = '4'
+    assert num_has_row_copy((0, 2), grid)
+    assert num_has_column_copy((0, 2), grid)
+    assert num_has_sub_grid_copy((0, 2), grid)
+
+
+def test_grids_must_have_a_square_number_of_rows():
+    with pytest.raises(SudokuError, match='square number of rows'):
+        geometry_of([[' '] * 6 for _ in range(6)])
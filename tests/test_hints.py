@@ -0,0 +1,52 @@
+from conftest import HARD_PUZZLE, PUZZLE, SOLUTION
+from sudoku import Game
+from utils.board import Board
+from utils.hints import Hint, HintEngine
+from utils.sudoku_utils import build_grid, get_unfilled_cells
+
+
+def test_hints_explain_the_technique():
+    game = Game.from_line((PUZZLE, SOLUTION))
+
+    hint = game.hint()
+
+    assert hint.technique in ('naked single', 'hidden single')
+    assert str(hint.number) == SOLUTION[hint.loc[0] * 9 + hint.loc[1]]
+    assert hint.loc not in game.unfilled_cells
+    assert str(Hint((0, 2), 4, 'naked single')) == '4 goes in A3 (naked single)'
+
+
+def test_naked_singles_follow_moves_and_undos():
+    grid = build_grid(PUZZLE)
+    board = Board(grid)
+    unfilled_cells = get_unfilled_cells(grid)
+    engine = HintEngine(grid, board, unfilled_cells)
+    # A1 can only be 8, so it is a naked single straight away
+    assert (0, 0) in engine._singles
+
+    grid[0][0] = '8'
+    board.add((0, 0), 8)
+    unfilled_cells.discard((0, 0))
+    engine.placed((0, 0))
+    assert (0, 0) not in engine._singles
+
+    grid[0][0] = ' '
+    board.remove((0, 0), 8)
+    unfilled_cells.add((0, 0))
+    engine.removed((0, 0))
+    assert (0, 0) in engine._singles
+
+
+def test_wrong_moves_dont_lead_to_wrong_hints():
+    game = Game.from_line((PUZZLE, SOLUTION))
+    game.move((0, 1), 1)  # the solution has 6 here
+
+    for _ in range(len(game.unfilled_cells)):
+        hint = game.hint()
+        assert str(hint.number) == SOLUTION[hint.loc[0] * 9 + hint.loc[1]]
+
+
+def test_hints_fall_back_to_the_solution():
+    game = Game.from_line((HARD_PUZZLE, ''))
+
+    assert game.hint().technique == 'from the solution'
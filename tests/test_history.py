@@ -0,0 +1,37 @@
+import pytest
+from conftest import PUZZLE
+from utils.history import History, PersistentBoard
+from utils.sudoku_utils import SudokuError, build_grid
+
+
+def test_boards_share_the_rows_they_do_not_change():
+    board = PersistentBoard.from_grid(build_grid(PUZZLE))
+    changed = board.set((0, 0), '8')
+
+    assert board.cell((0, 0)) == ' ' and changed.cell((0, 0)) == '8'
+    assert all(changed.rows[row] is board.rows[row] for row in range(1, 9))
+    assert changed.to_grid() == [['8'] + build_grid(PUZZLE)[0][1:]] + build_grid(PUZZLE)[1:]
+
+
+def test_history_branches_instead_of_forgetting():
+    history = History(PersistentBoard.from_grid(build_grid(PUZZLE)))
+    first = history.play((0, 0), 8)
+    second = history.play((0, 1), 6)
+    history.undo()
+    history.checkpoint('first')
+    branch = history.play((0, 1), 1)
+
+    assert history.branches(first) == [second, branch]
+    assert branch.moves() == [((0, 0), 8), ((0, 1), 1)]
+
+    history.undo()
+    assert history.redo() is branch  # redo follows the move last undone
+    assert history.goto(second) == ([branch], [second])
+    assert history.board.cell((0, 1)) == '6'
+    assert history.goto('first') == ([second], [])
+    assert len(list(history)) == 4
+
+    with pytest.raises(SudokuError, match='no checkpoint'):
+        history.goto('second')
+    with pytest.raises(SudokuError, match='not in this history'):
+        history.goto(History(history.root.board).root)
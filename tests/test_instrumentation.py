@@ -0,0 +1,52 @@
+import json
+
+from utils.instrumentation import Tracer, load_durations, summarize
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+
+    with tracer.span('move'):
+        pass
+    tracer.count('moves')
+
+    assert tracer.events == []
+    assert not tracer.counters
+
+
+def test_spans_are_exported_as_chrome_trace_events(tmp_path):
+    tracer = Tracer()
+    tracer.enabled = True
+
+    tracer.next_turn()
+    with tracer.span('move'):
+        pass
+    tracer.count('moves')
+    trace_path = tmp_path / 'trace.json'
+    tracer.export(trace_path)
+
+    events = json.loads(trace_path.read_text())['traceEvents']
+    span, counter = events
+    assert span['name'] == 'move' and span['ph'] == 'X' and span['dur'] >= 0
+    assert span['args'] == {'turn': 1}
+    assert counter['ph'] == 'C' and counter['args'] == {'moves': 1}
+
+
+def test_summary_has_a_line_and_histogram_per_phase(tmp_path):
+    tracer = Tracer()
+    tracer.enabled = True
+    for _ in range(10):
+        for phase in ('move', 'draw'):
+            with tracer.span(phase):
+                pass
+    trace_path = tmp_path / 'trace.json'
+    tracer.export(trace_path)
+
+    assert {name: len(durations) for name, durations in load_durations(trace_path).items()} == {
+        'move': 10,
+        'draw': 10,
+    }
+    summary = summarize(trace_path)
+    assert 'draw: 10 samples' in summary
+    assert 'move: 10 samples' in summary
+    assert ' us | #' in summary
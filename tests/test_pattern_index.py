@@ -0,0 +1,61 @@
+import pytest
+from conftest import PUZZLE, SOLUTION
+from utils import pattern_index
+from utils.pattern_index import open_pattern_index, pattern_index_path_for, posting_lists_of
+from utils.sudoku_utils import SudokuError
+
+# the givens are only symmetric under a half turn of the grid
+ROTATIONAL = '010000000' + '0' * 63 + '000000020'
+# row A and column 1 are empty
+EMPTY_CORNER = '0' * 9 + ('0' + '12345678') * 7 + '012345600'
+
+
+def test_symmetries_are_told_apart():
+    assert len(posting_lists_of(ROTATIONAL)) == 1 + 27 + 2  # symmetric and rotational
+    assert len(posting_lists_of('0' * 81)) == 1 + 27 + 7
+    assert len(posting_lists_of(EMPTY_CORNER)) == 1 + 27
+    assert len(posting_lists_of(PUZZLE)) == 1 + 27
+
+
+def test_queries_intersect_the_posting_lists(tmp_path):
+    dataset = tmp_path / 'puzzles.csv'
+    dataset.write_text(f'quizzes,solutions\n{PUZZLE},{SOLUTION}\n\n{ROTATIONAL},\n{EMPTY_CORNER},\n{ROTATIONAL},\n')
+
+    with open_pattern_index(dataset) as index:
+        assert pattern_index_path_for(dataset).exists()
+        assert len(index) == 4
+        assert index.query() == [0, 1, 2, 3]
+        assert index.query(clues=2) == [1, 3]
+        assert index.query(clues=2, symmetry='rotational', limit=1) == [1]
+        assert index.query(symmetry='diagonal') == []
+        assert index.query(empty=['1']) == [1, 2, 3]
+        assert index.query(empty=['A', '1']) == [2]
+        assert index.query(empty=['box5'], patterns={'I': 0b010000000}) == [1, 3]
+        assert index.query(clues=62, empty=['A']) == [2]
+        assert index.query(empty=['a', '1']) == [2]
+        assert index.query(empty=['BOX5']) == index.query(empty=['box5'])
+        assert list(index.read_puzzles([0, 2])) == [(PUZZLE, SOLUTION), (EMPTY_CORNER, '')]
+
+
+def test_bad_queries_are_rejected(tmp_path):
+    dataset = tmp_path / 'puzzles.csv'
+    dataset.write_text(f'{PUZZLE},\n')
+
+    with open_pattern_index(dataset) as index:
+        with pytest.raises(SudokuError):
+            index.query(empty=['J'])
+        with pytest.raises(SudokuError):
+            index.query(symmetry='spiral')
+        with pytest.raises(SudokuError):
+            index.query(clues=82)
+
+
+def test_the_index_reads_back_on_any_host(tmp_path, monkeypatch):
+    # a big-endian host swaps the posting lists on the way out, and back on the way in
+    monkeypatch.setattr(pattern_index.sys, 'byteorder', 'big')
+    dataset = tmp_path / 'puzzles.csv'
+    dataset.write_text(f'{PUZZLE},\n{ROTATIONAL},\n{EMPTY_CORNER},\n')
+
+    with open_pattern_index(dataset) as index:
+        assert index.query(clues=2, symmetry='rotational') == [1]
+        assert index.query(empty=['A', '1']) == [2]
@@ -0,0 +1,81 @@
+import time
+
+import pytest
+from conftest import PUZZLE, SOLUTION
+from sudoku import Game
+from utils.prefetch import Prefetcher, ThinkTimeWorker
+from utils.sudoku_utils import SudokuError
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_the_next_result_is_loaded_ahead():
+    loads = iter(range(3))
+    prefetcher = Prefetcher(lambda: next(loads))
+
+    assert prefetcher.take() == 0
+    assert prefetcher.take() == 1
+
+
+def test_load_errors_are_raised_when_taken():
+    def load():
+        raise SudokuError('The puzzle dataset is empty.')
+
+    with pytest.raises(SudokuError, match='empty'):
+        Prefetcher(load).take()
+
+
+def test_other_load_errors_are_raised_when_taken_too():
+    def load():
+        raise FileNotFoundError('puzzle-dataset/missing.txt')
+
+    prefetcher = Prefetcher(load)
+    with pytest.raises(FileNotFoundError, match='missing'):
+        prefetcher.take()
+
+
+def test_hint_errors_are_reported_without_stopping_the_game():
+    class BrokenHints:
+        def next_hint(self):
+            raise IndexError('list index out of range')
+
+    class BrokenGame:
+        hints = BrokenHints()
+
+    worker = ThinkTimeWorker(BrokenGame())
+    try:
+        wait_until(worker.is_current)
+        assert isinstance(worker.take_error(), IndexError)
+        assert worker.take_error() is None  # reported once
+
+        with worker.updating():  # the game can still be changed
+            pass
+        wait_until(worker.is_current)
+        assert isinstance(worker.take_error(), IndexError)
+    finally:
+        worker.stop()
+
+
+def test_hints_are_worked_out_while_the_player_thinks():
+    game = Game.from_line((PUZZLE, SOLUTION))
+    worker = ThinkTimeWorker(game)
+    try:
+        wait_until(worker.is_current)
+        with worker.updating():
+            expected = game.hints.next_hint()
+            hint = game.hint()
+        assert hint == expected
+        assert game.grid[hint.loc[0]][hint.loc[1]] == str(hint.number)
+
+        wait_until(worker.is_current)
+        with worker.updating():
+            worker.game = game = Game.from_line((PUZZLE, SOLUTION))
+        wait_until(worker.is_current)
+        assert game.hints._next_is_known
+    finally:
+        worker.stop()
@@ -0,0 +1,62 @@
+import os
+import random
+
+import pytest
+from conftest import OTHER_PUZZLE, OTHER_SOLUTION, PUZZLE, SOLUTION
+from sudoku import get_quiz_and_solution_line
+from utils.puzzle_store import PuzzleStore, build_store, open_store, store_path_for
+from utils.sudoku_utils import SudokuError
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = tmp_path / 'puzzles.txt'
+    path.write_text(f'quizzes,solutions\n{PUZZLE},{SOLUTION}\n{OTHER_PUZZLE},{OTHER_SOLUTION}\n')
+    return path
+
+
+def test_store_gives_random_access_to_every_puzzle(dataset, tmp_path):
+    assert build_store(dataset, tmp_path / 'puzzles.store') == 2
+
+    with PuzzleStore(tmp_path / 'puzzles.store') as store:
+        assert len(store) == 2
+        assert store[0] == (PUZZLE, SOLUTION)
+        assert store[1] == (OTHER_PUZZLE, OTHER_SOLUTION)
+        assert store[-1] == (OTHER_PUZZLE, OTHER_SOLUTION)
+        assert store.random_puzzle(random.Random(0)) in ((PUZZLE, SOLUTION), (OTHER_PUZZLE, OTHER_SOLUTION))
+        with pytest.raises(IndexError):
+            store[2]
+
+
+def test_store_is_rebuilt_when_the_dataset_changes(dataset):
+    with open_store(dataset) as store:
+        assert len(store) == 2
+
+    dataset.write_text(f'quizzes,solutions\n{OTHER_PUZZLE},{OTHER_SOLUTION}\n')
+    stale = store_path_for(dataset).stat().st_mtime
+    os.utime(dataset, (stale + 10, stale + 10))
+
+    with open_store(dataset) as store:
+        assert len(store) == 1
+        assert store[0] == (OTHER_PUZZLE, OTHER_SOLUTION)
+
+
+def test_malformed_dataset_line_is_rejected(tmp_path):
+    path = tmp_path / 'puzzles.txt'
+    path.write_text(f'quizzes,solutions\n{PUZZLE},{SOLUTION}\n{OTHER_PUZZLE[:80]},{OTHER_SOLUTION}\n')
+
+    with pytest.raises(SudokuError, match='Line 3'):
+        build_store(path, tmp_path / 'puzzles.store')
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_quiz_and_solution_line_comes_from_the_dataset(dataset):
+    assert get_quiz_and_solution_line(str(dataset)) in ((PUZZLE, SOLUTION), (OTHER_PUZZLE, OTHER_SOLUTION))
+
+
+def test_quizzes_without_a_solution_are_stored(tmp_path):
+    path = tmp_path / 'puzzles.txt'
+    path.write_text(f'quizzes,solutions\n{PUZZLE}\n')
+
+    with open_store(path) as store:
+        assert store[0] == (PUZZLE, '')
@@ -0,0 +1,53 @@
+import pytest
+from conftest import HARD_PUZZLE, HARD_SOLUTION, PUZZLE, SOLUTION
+from sudoku import get_quiz_and_solution_line
+from utils import rating
+from utils.rating import build_rating_index, rate
+from utils.result_cache import ResultCache
+from utils.sudoku_utils import SudokuError, build_grid
+
+X_WING = '100000569492056108056109240009640801064010000218035604040500016905061402621000005'
+
+
+def test_puzzles_are_rated_by_the_hardest_technique_they_need():
+    assert rate(build_grid(PUZZLE)).difficulty == 'easy'
+
+    x_wing = rate(build_grid(X_WING))
+    assert (x_wing.difficulty, x_wing.technique, x_wing.nodes) == ('hard', 'x-wing', 0)
+
+    expert = rate(build_grid(HARD_PUZZLE))
+    assert (expert.difficulty, expert.technique) == ('expert', 'search')
+    assert expert.nodes > 0
+
+
+def test_puzzles_without_a_solution_cannot_be_rated():
+    with pytest.raises(SudokuError):
+        rate(build_grid('44' + PUZZLE[2:]))
+
+
+def test_puzzles_are_picked_by_difficulty(tmp_path):
+    dataset = tmp_path / 'puzzles.txt'
+    unsolvable = '44' + PUZZLE[2:]
+    dataset.write_text(
+        f'quizzes,solutions\n{PUZZLE},{SOLUTION}\n{HARD_PUZZLE},{HARD_SOLUTION}\n'
+        f'{unsolvable},\n{PUZZLE},{SOLUTION}\n'
+    )
+
+    assert build_rating_index(dataset, workers=1) == ([2, 0, 0, 1], [2])
+    assert get_quiz_and_solution_line(str(dataset), 'expert') == (HARD_PUZZLE, HARD_SOLUTION)
+    assert get_quiz_and_solution_line(str(dataset), 'easy') == (PUZZLE, SOLUTION)
+    with pytest.raises(SudokuError, match='no hard puzzles'):
+        get_quiz_and_solution_line(str(dataset), 'hard')
+
+
+def test_cached_difficulties_are_not_worked_out_again(tmp_path, monkeypatch):
+    dataset = tmp_path / 'puzzles.txt'
+    unsolvable = '44' + PUZZLE[2:]
+    dataset.write_text(f'quizzes,solutions\n{PUZZLE},{SOLUTION}\n{unsolvable},\n{HARD_PUZZLE},{HARD_SOLUTION}\n')
+    cache = ResultCache()
+
+    assert build_rating_index(dataset, workers=1, chunk_size=2, cache=cache) == ([1, 0, 0, 1], [1])
+    assert cache.get(HARD_PUZZLE).difficulty == 'expert' and cache.get(unsolvable).difficulty == ''
+
+    monkeypatch.setattr(rating, 'rate', None)  # every difficulty has to come from the cache now
+    assert build_rating_index(dataset, workers=1, chunk_size=2, cache=cache) == ([1, 0, 0, 1], [1])
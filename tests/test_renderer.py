@@ -0,0 +1,89 @@
+import io
+import re
+
+from conftest import PUZZLE
+from rich.console import Console
+from utils import ui
+from utils.renderer import CLEAR_SCREEN, TerminalRenderer
+from utils.sudoku_utils import build_grid
+
+
+def make_renderer():
+    stream = io.StringIO()
+    console = Console(file=io.StringIO(), width=100, height=50, force_terminal=True)
+    return TerminalRenderer(stream, console), stream
+
+
+def game_screen(grid, message=''):
+    return ui.split_up_down(ui.get_sudoku_and_keys(grid), ui.get_info(message))
+
+
+def test_first_frame_is_drawn_on_a_cleared_screen():
+    renderer, stream = make_renderer()
+    grid = build_grid(PUZZLE)
+
+    renderer.draw(game_screen(grid))
+
+    output = stream.getvalue()
+    assert output.startswith(CLEAR_SCREEN)
+    for line in renderer.render(game_screen(grid)):
+        assert line in output
+
+
+def test_only_changed_lines_are_redrawn():
+    renderer, stream = make_renderer()
+    grid = build_grid(PUZZLE)
+    renderer.draw(game_screen(grid))
+    stream.seek(0)
+    stream.truncate()
+
+    grid[0][0] = '8'
+    renderer.draw(game_screen(grid))
+
+    output = stream.getvalue()
+    assert CLEAR_SCREEN not in output
+    # one line of the grid was rewritten, and the cursor was parked below the frame
+    assert len(re.findall(r'\x1b\[\d+;1H', output)) == 2
+    assert ' 8 ' in output
+    assert 'B ' not in output
+
+
+def test_unchanged_frame_only_parks_the_cursor():
+    renderer, stream = make_renderer()
+    grid = build_grid(PUZZLE)
+    renderer.draw(game_screen(grid))
+    stream.seek(0)
+    stream.truncate()
+
+    renderer.draw(game_screen(grid))
+
+    assert stream.getvalue() == f'\x1b[{len(renderer.render(game_screen(grid))) + 1};1H\x1b[J'
+
+
+def test_screen_is_cleared_with_cls_where_escape_codes_cannot_be_turned_on(monkeypatch, capsys):
+    commands = []
+    monkeypatch.setattr(ui, 'enable_escape_codes', lambda: False)
+    monkeypatch.setattr(ui.os, 'system', commands.append)
+
+    ui.clear_screen()
+
+    assert commands == ['cls']
+    assert capsys.readouterr().out == ''
+
+
+def test_frames_taller_than_the_screen_are_always_drawn_in_full():
+    stream = io.StringIO()
+    console = Console(file=io.StringIO(), width=100, height=24, force_terminal=True)
+    renderer = TerminalRenderer(stream, console)
+    grid = build_grid(PUZZLE)
+    lines = renderer.render(game_screen(grid))
+    assert len(lines) + 2 > 24
+
+    renderer.draw(game_screen(grid))
+    grid[0][0] = '8'
+    renderer.draw(game_screen(grid))
+
+    second = stream.getvalue().split(CLEAR_SCREEN)[-1]
+    assert stream.getvalue().count(CLEAR_SCREEN) == 2
+    assert second == '\n'.join(renderer.render(game_screen(grid))) + '\n'
+    assert not re.search(r'\x1b\[\d+;1H', stream.getvalue())
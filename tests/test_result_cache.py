@@ -0,0 +1,99 @@
+import io
+import struct
+
+from conftest import BROKEN, PUZZLE, SOLUTION
+from utils.batch_solve import solve_dataset
+from utils import result_cache
+from utils.result_cache import INDEX_HEADER, PuzzleFacts, ResultCache, ResultStore, index_path_for, quiz_key
+
+
+def test_facts_are_merged_and_kept_in_both_tiers(tmp_path):
+    candidates = tuple(range(81))
+    with ResultStore(tmp_path / 'results') as store:
+        cache = ResultCache(store)
+        cache.put(PUZZLE, PuzzleFacts(solution=SOLUTION, nodes=3))
+        facts = cache.put(PUZZLE, PuzzleFacts(solution_count=1, difficulty='easy', candidates=candidates))
+
+        assert facts == PuzzleFacts(SOLUTION, 1, 'easy', 3, candidates)
+        assert cache.get(PUZZLE) == facts
+        assert store.get(quiz_key(PUZZLE)) == facts
+        assert cache.stats() == (1, 0, 0, 0)
+
+
+def test_quizzes_with_no_solution_are_cached_too(tmp_path):
+    with ResultStore(tmp_path / 'results') as store:
+        store.put(quiz_key(BROKEN), PuzzleFacts(solution='', solution_count=0, difficulty=''))
+        assert ResultCache(store).get(BROKEN) == PuzzleFacts(solution='', solution_count=0, difficulty='')
+
+
+def test_the_least_recently_used_facts_are_evicted():
+    cache = ResultCache(capacity=2)
+    for quiz in ('1' + '0' * 80, '2' + '0' * 80, '1' + '0' * 80, '3' + '0' * 80):
+        cache.put(quiz, PuzzleFacts(solution_count=2))
+
+    assert cache.evictions == 1
+    assert cache.get('2' + '0' * 80) is None
+    assert cache.get('1' + '0' * 80) == PuzzleFacts(solution_count=2)
+
+
+def test_other_processes_read_what_was_appended(tmp_path):
+    path = tmp_path / 'results'
+    with ResultStore(path) as writer, ResultStore(path) as reader:
+        writer.put(quiz_key(PUZZLE), PuzzleFacts(solution=SOLUTION))
+        assert reader.get(quiz_key(PUZZLE)) == PuzzleFacts(solution=SOLUTION)
+
+        # the latest record of a key wins, before and after indexing
+        writer.put(quiz_key(PUZZLE), PuzzleFacts(solution=SOLUTION, solution_count=1))
+        assert writer.write_index() == 1
+        assert reader.get(quiz_key(PUZZLE)).solution_count == 1
+
+    with ResultStore(path) as reopened:
+        assert index_path_for(path).exists()
+        assert reopened.get(quiz_key(PUZZLE)).solution_count == 1
+        assert reopened.get(quiz_key(BROKEN)) is None
+
+
+def test_a_new_store_is_never_seen_without_its_header(tmp_path):
+    path = tmp_path / 'results'
+    path.touch()  # an empty file, as left by a store that was created but not yet written to
+    with ResultStore(path) as store:
+        store.put(quiz_key(PUZZLE), PuzzleFacts(solution=SOLUTION))
+    with ResultStore(path) as reopened:
+        assert reopened.get(quiz_key(PUZZLE)) == PuzzleFacts(solution=SOLUTION)
+    assert [file.name for file in tmp_path.iterdir() if file.suffix == '.tmp'] == []
+
+
+def test_batch_runs_skip_cached_solutions(tmp_path):
+    dataset = tmp_path / 'quizzes.csv'
+    dataset.write_text(f'{PUZZLE},\n{BROKEN},\n' * 3)
+
+    with ResultStore(tmp_path / 'results') as store:
+        first = io.StringIO()
+        solve_dataset(dataset, first, 'serial', batch_size=2, cache=ResultCache(store))
+
+        cache = ResultCache(store)
+        second = io.StringIO()
+        report = solve_dataset(dataset, second, 'serial', batch_size=2, cache=cache)
+
+    assert (report.puzzles, report.unsolved) == (6, 3)
+    assert second.getvalue() == first.getvalue()
+    assert cache.stats() == (4, 2, 0, 0)
+
+
+def test_the_index_is_little_endian_on_any_host(tmp_path, monkeypatch):
+    path = tmp_path / 'results'
+    with ResultStore(path) as store:
+        store.put(quiz_key(PUZZLE), PuzzleFacts(solution=SOLUTION))
+        store.write_index()
+    assert struct.unpack_from('<Q', index_path_for(path).read_bytes(), INDEX_HEADER.size)[0] == quiz_key(PUZZLE)
+
+    # the swaps a big-endian host makes on the way out are undone on the way in
+    monkeypatch.setattr(result_cache.sys, 'byteorder', 'big')
+    swapped_path = tmp_path / 'swapped'
+    with ResultStore(swapped_path) as store:
+        store.put(quiz_key(PUZZLE), PuzzleFacts(solution=SOLUTION))
+        store.put(quiz_key(BROKEN), PuzzleFacts(solution=''))
+        assert store.write_index() == 2
+    with ResultStore(swapped_path) as store:
+        assert store.get(quiz_key(PUZZLE)) == PuzzleFacts(solution=SOLUTION)
+        assert store.get(quiz_key(BROKEN)) == PuzzleFacts(solution='')
@@ -0,0 +1,113 @@
+import asyncio
+
+from conftest import PUZZLE, SOLUTION
+from server import SudokuServer, generate_load
+from utils.sudoku_utils import SudokuError
+
+
+async def send(reader, writer, command):
+    writer.write(f'{command}\n'.encode())
+    return (await reader.readline()).decode().strip()
+
+
+def test_sessions_are_independent(dataset):
+    async def scenario():
+        server = SudokuServer(dataset)
+        host, port = await server.start()
+        try:
+            first = await asyncio.open_connection(host, port)
+            second = await asyncio.open_connection(host, port)
+            assert (await first[0].readline()).decode().strip() == f'OK {PUZZLE}'
+            assert (await second[0].readline()).decode().strip() == f'OK {PUZZLE}'
+
+            assert await send(*first, '8a1') == f'OK 8{PUZZLE[1:]}'
+            assert await send(*second, 'show') == f'OK {PUZZLE}'
+            assert await send(*second, 'u') == "ERR You haven't made a move yet!"
+            assert await send(*first, '9a1') == "ERR There's a number already in that position!!"
+            assert (await send(*first, 'x')).startswith('ERR Coordinate is invalid.')
+            assert await send(*first, 'u') == f'OK {PUZZLE}'
+            assert await send(*first, 'r') == f'OK 8{PUZZLE[1:]}'
+            assert await send(*first, 'r') == 'ERR There is no move to redo!'
+            assert await send(*first, 'u') == f'OK {PUZZLE}'
+
+            hinted = (await send(*second, 'h')).split()[1]
+            changed = [index for index in range(81) if hinted[index] != PUZZLE[index]]
+            assert len(changed) == 1 and hinted[changed[0]] == SOLUTION[changed[0]]
+            assert server.sessions == 2
+
+            assert await send(*first, 'q') == 'BYE'
+        finally:
+            await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_solving_the_grid_wins(dataset):
+    async def scenario():
+        server = SudokuServer(dataset)
+        host, port = await server.start()
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            await reader.readline()
+            for _ in range(PUZZLE.count('0') - 1):
+                assert (await send(reader, writer, 'h')).startswith('OK ')
+            assert await send(reader, writer, 'h') == f'WON {SOLUTION}'
+            assert await send(reader, writer, 'h') == 'ERR There are no unfilled cells left!'
+        finally:
+            await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_load_generator_reports_latencies(dataset):
+    async def scenario():
+        server = SudokuServer(dataset)
+        host, port = await server.start()
+        try:
+            return await generate_load(host, port, clients=20, commands=10, seed=1)
+        finally:
+            await server.close()
+
+    report = asyncio.run(scenario())
+    assert report.commands == 200
+    assert 0 < report.p50_ms <= report.p99_ms
+
+
+def test_games_that_cannot_be_set_up_are_errors(tmp_path):
+    dataset = tmp_path / 'puzzles.txt'
+    dataset.write_text(f'quizzes,solutions\n44{PUZZLE[2:]},\n')
+
+    async def scenario():
+        server = SudokuServer(dataset)
+        host, port = await server.start()
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            assert (await reader.readline()).decode().startswith('ERR ')
+            assert await reader.readline() == b''  # the session is closed
+            writer.close()
+            assert server.sessions == 0
+        finally:
+            await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_a_new_game_that_cannot_be_set_up_keeps_the_current_one(dataset):
+    async def scenario():
+        server = SudokuServer(dataset)
+        host, port = await server.start()
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            await reader.readline()
+            assert await send(reader, writer, '8a1') == f'OK 8{PUZZLE[1:]}'
+
+            def broken_game():
+                raise SudokuError('This puzzle has no solution.')
+
+            server.new_game = broken_game
+            assert await send(reader, writer, 'new') == 'ERR This puzzle has no solution.'
+            assert await send(reader, writer, 'show') == f'OK 8{PUZZLE[1:]}'
+        finally:
+            await server.close()
+
+    asyncio.run(scenario())
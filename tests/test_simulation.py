@@ -0,0 +1,98 @@
+import io
+import random
+
+from conftest import PUZZLE, SOLUTION
+from simulation import (
+    check_invariants,
+    random_script,
+    read_scripts,
+    record_scripts,
+    replay,
+    simulate,
+    write_scripts,
+)
+from sudoku import Game, run_command
+from utils.sudoku_utils import build_grid
+
+
+def solving_commands():
+    return [
+        f"{SOLUTION[cell]}{'abcdefghi'[cell // 9]}{cell % 9 + 1}" for cell in range(81) if PUZZLE[cell] == '0'
+    ]
+
+
+def test_a_script_that_solves_the_puzzle_is_replayed():
+    commands = ['h', 'u', 'r', 'u', '9a1', 'u', 'zz', 'r', 'u'] + solving_commands()
+
+    counts, violations = replay(((PUZZLE, SOLUTION), commands), check_every=10)
+
+    assert violations == []
+    assert counts['hints'] == 1
+    assert counts['undos'] == 4
+    assert counts['redos'] == 2
+    assert counts['rejected'] == 1
+    assert counts['moves'] == 1 + len(solving_commands())
+    assert counts['solved'] == 1
+
+
+def test_broken_invariants_are_reported():
+    game = Game.from_line((PUZZLE, SOLUTION))
+    game.move((0, 0), 8)
+    game.unfilled_cells.add((0, 0))
+
+    assert check_invariants(game, build_grid(PUZZLE)) == ['the unfilled cells are out of step with the grid']
+
+
+def test_a_history_out_of_step_with_the_game_is_reported():
+    game = Game.from_line((PUZZLE, SOLUTION))
+    game.move((0, 0), 8)
+    game.history.undo()
+
+    assert check_invariants(game, build_grid(PUZZLE)) == [
+        'the board of the history is out of step with the grid',
+        'the branch of the history does not match the move log',
+    ]
+
+
+def test_scripts_round_trip_through_a_script_file():
+    rng = random.Random(3)
+    scripts = [random_script((PUZZLE, SOLUTION), 20, rng) for _ in range(3)]
+    script_file = io.StringIO()
+
+    write_scripts(scripts, script_file)
+    script_file.seek(0)
+
+    assert list(read_scripts(script_file)) == scripts
+
+
+def test_streamed_scripts_are_recorded_as_they_are_played():
+    rng = random.Random(4)
+    scripts = [random_script((PUZZLE, SOLUTION), 20, rng) for _ in range(3)]
+    script_file = io.StringIO()
+
+    report = simulate(record_scripts(iter(scripts), script_file), workers=1, batch_size=2)
+    script_file.seek(0)
+
+    assert report.games == 3
+    assert list(read_scripts(script_file)) == scripts
+
+
+def test_random_scripts_keep_every_invariant():
+    rng = random.Random(5)
+    scripts = [random_script((PUZZLE, SOLUTION), 300, rng) for _ in range(20)]
+
+    report = simulate(scripts, workers=1, check_every=25, batch_size=7)
+
+    assert report.games == 20
+    assert report.commands == 6000
+    assert report.moves + report.undos + report.redos + report.hints + report.rejected == report.commands
+    assert report.redos > 0
+    assert report.violations == [] and report.violation_count == 0
+
+
+def test_dataset_errors_are_reported_without_a_traceback(tmp_path, capsys):
+    dataset = tmp_path / 'puzzles.txt'
+    dataset.write_text('')
+
+    assert run_command(['simulate', str(dataset), '--games', '3', '--workers', '1']) == 2
+    assert capsys.readouterr().out == 'The puzzle dataset is empty.\n'
@@ -0,0 +1,48 @@
+from conftest import HARD_PUZZLE, PUZZLE, SOLUTION
+from sudoku import get_a_hint, sudoku_is_solved
+from utils.solver import solve
+from utils.sudoku_utils import build_grid, build_puzzle_solution_pair, get_unfilled_cells
+
+
+def test_puzzle_is_solved():
+    result = solve(build_grid(PUZZLE))
+    assert result.solution == build_grid(SOLUTION)
+    assert result.nodes == 0  # singles alone solve this one
+
+
+def test_hard_puzzle_is_solved_by_searching():
+    puzzle = build_grid(HARD_PUZZLE)
+    result = solve(puzzle)
+
+    assert result.nodes > 0
+    assert sudoku_is_solved(result.solution)
+    for row in range(9):
+        for col in range(9):
+            if puzzle[row][col] != ' ':
+                assert result.solution[row][col] == puzzle[row][col]
+
+
+def test_puzzles_without_a_solution_are_reported():
+    # two 4s in the first row
+    assert solve(build_grid('44' + PUZZLE[2:])).solution is None
+
+    # the first cell can't hold any number
+    puzzle = build_grid(PUZZLE)
+    puzzle[0][1:9] = list('12345679')
+    assert solve(puzzle).solution is None
+
+
+def test_line_without_a_solution_is_solved():
+    puzzle, solution = build_puzzle_solution_pair((PUZZLE, ''))
+    assert solution == build_grid(SOLUTION)
+
+
+def test_hint_without_a_known_solution():
+    grid = build_grid(PUZZLE)
+    unfilled_cells = get_unfilled_cells(grid)
+    unfilled_count = len(unfilled_cells)
+
+    get_a_hint(grid, None, unfilled_cells)
+
+    assert len(get_unfilled_cells(grid)) == len(unfilled_cells) == unfilled_count - 1
+    assert all(cell in (' ', number) for cell, number in zip((cell for row in grid for cell in row), SOLUTION))
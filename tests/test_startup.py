@@ -0,0 +1,69 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+REPO = Path(__file__).parent.parent
+DATASET = REPO / 'puzzle-dataset' / 'pre-solved-sudokus.txt'
+
+# the most that importing sudoku may take, at best of a few tries; it took about 0.14s when it still imported rich
+IMPORT_BUDGET_SECONDS = 0.1
+
+
+def run_python(code: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=REPO, capture_output=True, text=True, check=True, timeout=60
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_importing_sudoku_is_fast_and_leaves_out_the_ui():
+    code = (
+        'import json, sys, time\n'
+        'start = time.perf_counter()\n'
+        'import sudoku\n'
+        'seconds = time.perf_counter() - start\n'
+        'print(json.dumps({"seconds": seconds, "modules": sorted(sys.modules)}))\n'
+    )
+    runs = [run_python(code) for _ in range(3)]
+
+    modules = runs[0]['modules']
+    assert 'rich' not in modules
+    assert 'utils.ui' not in modules
+    assert 'utils.renderer' not in modules
+    assert min(run['seconds'] for run in runs) < IMPORT_BUDGET_SECONDS
+
+
+def test_batch_commands_never_import_rich():
+    code = (
+        'import contextlib, io, json, sys\n'
+        'import sudoku\n'
+        'with contextlib.redirect_stdout(io.StringIO()):\n'
+        f'    status = sudoku.run_command(["validate", {str(DATASET)!r}, "--workers", "1"])\n'
+        'print(json.dumps({"status": status, "rich": "rich" in sys.modules}))\n'
+    )
+
+    assert run_python(code) == {'status': 0, 'rich': False}
+
+
+def test_parsing_a_command_leaves_out_the_batch_modules():
+    code = (
+        'import json, sys\n'
+        'import sudoku\n'
+        'args = sudoku.build_parser().parse_args(["play"])\n'
+        'print(json.dumps({"command": args.command, "modules": sorted(sys.modules)}))\n'
+    )
+    result = run_python(code)
+
+    assert result['command'] == 'play'
+    for module in ('concurrent.futures', 'utils.batch_solve', 'utils.pattern_index', 'utils.result_cache'):
+        assert module not in result['modules']
+
+
+def test_the_parser_choices_match_the_modules():
+    from utils.batch_solve import EXECUTORS
+    from utils.choices import EXECUTOR_NAMES, SYMMETRY_NAMES
+    from utils.pattern_index import SYMMETRY_MAPS
+
+    assert EXECUTOR_NAMES == tuple(EXECUTORS)
+    assert SYMMETRY_NAMES == ('symmetric',) + tuple(SYMMETRY_MAPS)
@@ -0,0 +1,40 @@
+from conftest import PUZZLE
+from utils import ui
+from utils.sudoku_utils import build_grid
+
+
+def test_rendered_grids_are_cached_by_their_cells():
+    grid = build_grid(PUZZLE)
+    first = ui.get_sudoku_grid(grid)
+    hits = ui._render_sudoku_grid.cache_info().hits
+
+    assert ui.get_sudoku_grid(build_grid(PUZZLE)) is first
+    assert ui._render_sudoku_grid.cache_info().hits == hits + 1
+
+    grid[0][0] = '8'
+    assert ui.get_sudoku_grid(grid) != first
+    assert ui._render_sudoku_grid.cache_info().maxsize == ui.GRID_CACHE_SIZE
+
+
+def test_grid_buffer_only_rewrites_the_cells_that_changed():
+    grid = build_grid(PUZZLE)
+    buffer = ui.GridBuffer(grid)
+    first = buffer.render()
+    assert first == ui.get_sudoku_grid(grid)
+    assert buffer.update(grid) == 0 and buffer.render() is first
+
+    grid[0][0] = '8'
+    grid[8][8] = '8'
+    assert buffer.update(grid) == 2
+    assert buffer.render() == ui.get_sudoku_grid(grid)
+    assert buffer.render().split('\n')[2].startswith('A ┃ 8 │')
+
+
+def test_the_game_screen_is_drawn_from_the_grid_buffer():
+    grid = build_grid(PUZZLE)
+    buffer = ui.GridBuffer(build_grid('0' * 81))
+
+    screen = ui.get_sudoku_and_keys(grid, buffer)
+
+    assert buffer.render() == ui.get_sudoku_grid(grid)
+    assert list(screen.columns[0].cells) == [buffer.render()]
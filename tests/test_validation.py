@@ -0,0 +1,46 @@
+import pytest
+from conftest import PUZZLE, SOLUTION
+from sudoku import run_command
+from utils.validation import check_pair, validate_dataset
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    # swapping the first two numbers breaks the column and the given `4`
+    path = tmp_path / 'puzzles.txt'
+    lines = [
+        'quizzes,solutions',
+        f'{PUZZLE},{SOLUTION}',
+        f'{PUZZLE},{SOLUTION[1] + SOLUTION[0] + SOLUTION[2:]}',
+        f'{PUZZLE},{SOLUTION}',
+        f'{PUZZLE[:2]}5{PUZZLE[3:]},{SOLUTION}',
+        f'{PUZZLE}',
+    ]
+    path.write_text('\n'.join(lines) + '\n')
+    return path
+
+
+def test_consistent_pair_passes():
+    assert check_pair(PUZZLE, SOLUTION) is None
+
+
+def test_inconsistent_pairs_are_explained():
+    assert 'repeats' in check_pair(PUZZLE, SOLUTION[1] + SOLUTION[0] + SOLUTION[2:])
+    assert 'disagrees' in check_pair(PUZZLE[:2] + '5' + PUZZLE[3:], SOLUTION)
+    assert '81 digits' in check_pair(PUZZLE, SOLUTION[:80])
+    assert '81 digits' in check_pair(PUZZLE, SOLUTION[:80] + '0')
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_invalid_rows_are_reported_with_line_numbers(dataset, workers):
+    report = validate_dataset(dataset, workers=workers, chunk_size=2)
+
+    assert report.checked == 5
+    assert [line_number for line_number, _ in report.invalid] == [3, 5, 6]
+
+
+def test_validate_command_fails_on_invalid_rows(dataset, capsys):
+    assert run_command(['validate', str(dataset), '--workers', '1']) == 1
+    output = capsys.readouterr().out
+    assert 'line 3:' in output
+    assert 'puzzles/sec' in output
@@ -0,0 +1,204 @@
+"""Solves every quiz of a dataset in bulk, on a choice of executors.
+
+The executors trade off differently: threads share memory but not the interpreter, processes run in parallel but
+pickle every batch of quizzes and solutions through a pipe, and the shared-memory executor hands processes their
+batches through shared memory blocks so that only a block name and a count cross the pipe.
+The executors' modules are slow to import, so each is only loaded when it runs.
+Given a `ResultCache`, quizzes whose solution is already cached are not sent to the executor at all.
+"""
+
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+from utils.dataset import chunked, iter_puzzles
+from utils.parallel import map_chunks
+from utils.puzzle_store import UNSOLVED
+from utils.solver import solve
+from utils.sudoku_utils import SudokuError, build_grid
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from utils.result_cache import ResultCache
+
+GRID_LENGTH = 81
+
+
+class SolveReport(NamedTuple):
+    """The outcome of solving a dataset on one executor."""
+
+    executor: str
+    workers: int
+    puzzles: int
+    unsolved: int
+    seconds: float
+
+    @property
+    def puzzles_per_second(self) -> float:
+        return self.puzzles / self.seconds if self.seconds else 0.0
+
+
+def solve_quiz(quiz: str) -> str:
+    """Returns the solution of the `quiz`, both in dataset format, or an empty string if it has no solution."""
+    solution = solve(build_grid(quiz)).solution
+    if solution is None:
+        return ''
+    return ''.join(''.join(row) for row in solution)
+
+
+def solve_quizzes(quizzes: List[str]) -> List[str]:
+    return [solve_quiz(quiz) for quiz in quizzes]
+
+
+def _solve_shared_batch(job: Tuple[str, int]) -> int:
+    """Solves the `count` quizzes at the start of the shared memory block `name`, and writes their solutions
+    after them. Returns the count.
+    """
+    from multiprocessing import shared_memory
+
+    name, count = job
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        buffer = block.buf
+        quizzes = bytes(buffer[: count * GRID_LENGTH]).decode('ascii')
+        solutions = ''.join(
+            solve_quiz(quizzes[start : start + GRID_LENGTH]) or UNSOLVED
+            for start in range(0, count * GRID_LENGTH, GRID_LENGTH)
+        )
+        buffer[count * GRID_LENGTH : 2 * count * GRID_LENGTH] = solutions.encode('ascii')
+        del buffer
+    finally:
+        block.close()
+    return count
+
+
+def _map_shared_memory(batches: Iterable[List[str]], workers: int, batch_size: int) -> Iterator[List[str]]:
+    """Yields the solutions of every batch, solved on `workers` processes through shared memory blocks.
+
+    There is one block per batch in flight, each big enough for `batch_size` quizzes and their solutions, and
+    blocks are reused once their batch is collected.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    max_in_flight = 2 * workers
+    blocks = [shared_memory.SharedMemory(create=True, size=2 * batch_size * GRID_LENGTH) for _ in range(max_in_flight)]
+    free = list(blocks)
+    in_flight: Deque[Tuple['Future', shared_memory.SharedMemory, int]] = deque()
+
+    def collect() -> List[str]:
+        future, block, count = in_flight.popleft()
+        future.result()
+        solutions = bytes(block.buf[count * GRID_LENGTH : 2 * count * GRID_LENGTH]).decode('ascii')
+        free.append(block)
+        return [
+            '' if solution == UNSOLVED else solution
+            for solution in (solutions[start : start + GRID_LENGTH] for start in range(0, len(solutions), GRID_LENGTH))
+        ]
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for batch in batches:
+                if not free:
+                    yield collect()
+                quizzes = ''.join(batch).encode('ascii')
+                if len(quizzes) != len(batch) * GRID_LENGTH:
+                    raise SudokuError('Every quiz must be 81 digits long.')
+                block = free.pop()
+                block.buf[: len(quizzes)] = quizzes
+                in_flight.append((pool.submit(_solve_shared_batch, (block.name, len(batch))), block, len(batch)))
+            while in_flight:
+                yield collect()
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def _run_serial(batches: Iterable[List[str]], workers: int, batch_size: int) -> Iterator[List[str]]:
+    return map_chunks(solve_quizzes, batches, workers=1)
+
+
+def _run_threads(batches: Iterable[List[str]], workers: int, batch_size: int) -> Iterator[List[str]]:
+    from concurrent.futures import ThreadPoolExecutor
+
+    return map_chunks(solve_quizzes, batches, workers, pool_class=ThreadPoolExecutor)
+
+
+def _run_processes(batches: Iterable[List[str]], workers: int, batch_size: int) -> Iterator[List[str]]:
+    return map_chunks(solve_quizzes, batches, workers)
+
+
+# every executor maps batches of quizzes to their solutions, in order
+EXECUTORS: Dict[str, Callable[[Iterable[List[str]], int, int], Iterator[List[str]]]] = {
+    'serial': _run_serial,
+    'thread': _run_threads,
+    'process': _run_processes,
+    'shared-memory': _map_shared_memory,
+}
+
+
+def solve_dataset(
+    input_path: Union[str, Path],
+    output: Optional[TextIO] = None,
+    executor: str = 'process',
+    workers: Optional[int] = None,
+    batch_size: int = 500,
+    cache: Optional['ResultCache'] = None,
+) -> SolveReport:
+    """Solves every quiz of the `input_path` dataset on the `executor`, and writes the quizzes with their
+    solutions to `output` in the same format, if it is given. Quizzes with no solution get an all-zero solution.
+    Solutions found in the `cache` are used as they are, and the solutions of the rest are added to it.
+    """
+    workers = 1 if executor == 'serial' else workers or os.cpu_count() or 1
+    quizzes = (quiz for quiz, _ in iter_puzzles(input_path))
+    puzzles = unsolved = 0
+
+    start = time.perf_counter()
+    # every batch in flight, with the solutions that were cached (None for the ones the executor works out)
+    batches: Deque[Tuple[List[str], List[Optional[str]]]] = deque()
+
+    def remember(batch: List[str]) -> List[str]:
+        cached: List[Optional[str]] = [None] * len(batch)
+        if cache is not None:
+            for position, quiz in enumerate(batch):
+                facts = cache.get(quiz)
+                if facts is not None:
+                    cached[position] = facts.solution
+        batches.append((batch, cached))
+        return [quiz for quiz, solution in zip(batch, cached) if solution is None]
+
+    if output is not None:
+        output.write('quizzes,solutions\n')
+    run = EXECUTORS[executor]
+    for solved in run((remember(batch) for batch in chunked(quizzes, batch_size)), workers, batch_size):
+        batch, cached = batches.popleft()
+        if cache is not None:
+            from utils.result_cache import PuzzleFacts
+
+            for quiz, solution in zip((quiz for quiz, known in zip(batch, cached) if known is None), solved):
+                cache.put(quiz, PuzzleFacts(solution=solution))
+        new_solutions = iter(solved)
+        solutions = [solution if solution is not None else next(new_solutions) for solution in cached]
+        puzzles += len(batch)
+        unsolved += solutions.count('')
+        if output is not None:
+            output.writelines(f'{quiz},{solution or UNSOLVED}\n' for quiz, solution in zip(batch, solutions))
+
+    return SolveReport(executor, workers, puzzles, unsolved, time.perf_counter() - start)
@@ -0,0 +1,127 @@
+"""Bitmask bookkeeping of the numbers placed in each row, column and sub-grid of a Sudoku grid"""
+
+from typing import List, Tuple
+
+from utils.geometry import BOX_OF_LOC, Geometry, geometry_of
+
+
+def box_index(row: int, col: int) -> int:
+    """Returns the index (0 to 8, left to right, top to bottom) of the 3 X 3 sub-grid that contains `row`, `col`."""
+    return BOX_OF_LOC[row][col]
+
+
+class Board:
+    """Keeps per-row, per-column and per-sub-grid bitmasks of the numbers in a grid.
+
+    The masks are updated incrementally through `add` and `remove`, so checking whether a number can be placed,
+    or whether the grid is solved, doesn't need to rescan the grid.
+    The grid itself is not stored; callers keep the `List[List[str]]` grid and the board in step.
+    Grids of any N² X N² size are supported, and their size is worked out from the grid.
+    """
+
+    __slots__ = (
+        'geometry',
+        'rows',
+        'cols',
+        'boxes',
+        '_all_numbers',
+        '_box_of_loc',
+        '_stride',
+        '_col_offset',
+        '_box_offset',
+        '_counts',
+        '_filled',
+        '_conflicts',
+    )
+
+    def __init__(self, grid: List[List[str]]) -> None:
+        self.geometry: Geometry = geometry_of(grid)
+        size = self.geometry.size
+        self.rows = [0] * size
+        self.cols = [0] * size
+        self.boxes = [0] * size
+        self._all_numbers = self.geometry.all_numbers
+        self._box_of_loc = self.geometry.box_of_loc
+
+        # how many times each number appears in each unit, indexed by `unit * stride + number`,
+        # where the units are the rows, then the columns, then the sub-grids
+        self._stride = size + 1
+        self._col_offset = size * self._stride
+        self._box_offset = 2 * size * self._stride
+        self._counts = [0] * (3 * size * self._stride)
+        self._filled = 0
+        self._conflicts = 0  # the number of extra copies of numbers across all units
+
+        for row in range(size):
+            for col in range(size):
+                cell = grid[row][col]
+                if cell != ' ':
+                    self.add((row, col), int(cell))
+
+    def add(self, loc: Tuple[int, int], number: int) -> None:
+        """Records that `number` has been placed at `loc`."""
+        row, col = loc
+        box = self._box_of_loc[row][col]
+        bit = 1 << number
+        counts = self._counts
+        stride = self._stride
+
+        for index in (
+            row * stride + number,
+            self._col_offset + col * stride + number,
+            self._box_offset + box * stride + number,
+        ):
+            if counts[index]:
+                self._conflicts += 1
+            counts[index] += 1
+
+        self.rows[row] |= bit
+        self.cols[col] |= bit
+        self.boxes[box] |= bit
+        self._filled += 1
+
+    def remove(self, loc: Tuple[int, int], number: int) -> None:
+        """Records that `number` has been removed from `loc`."""
+        row, col = loc
+        box = self._box_of_loc[row][col]
+        bit = 1 << number
+        counts = self._counts
+        stride = self._stride
+
+        row_index, col_index, box_index_ = (
+            row * stride + number,
+            self._col_offset + col * stride + number,
+            self._box_offset + box * stride + number,
+        )
+        for index in (row_index, col_index, box_index_):
+            counts[index] -= 1
+            if counts[index]:
+                self._conflicts -= 1
+
+        # a number stays in a unit's mask while another copy of it is still there
+        if not counts[row_index]:
+            self.rows[row] &= ~bit
+        if not counts[col_index]:
+            self.cols[col] &= ~bit
+        if not counts[box_index_]:
+            self.boxes[box] &= ~bit
+        self._filled -= 1
+
+    def candidates(self, loc: Tuple[int, int]) -> int:
+        """Returns a bitmask of the numbers that can be placed at `loc` without repeating one in its row,
+        column or sub-grid.
+        """
+        row, col = loc
+        return self._all_numbers & ~(self.rows[row] | self.cols[col] | self.boxes[self._box_of_loc[row][col]])
+
+    def is_legal(self, loc: Tuple[int, int], number: int) -> bool:
+        """Returns True if `number` doesn't already appear in the row, column or sub-grid of `loc`.
+        Returns False otherwise.
+        """
+        return bool(self.candidates(loc) & (1 << number))
+
+    def is_solved(self) -> bool:
+        """Returns True if every cell is filled and no number repeats in any row, column or sub-grid.
+        Returns False otherwise.
+        """
+        return self._filled == self.geometry.cell_count and not self._conflicts
@@ -0,0 +1,50 @@
+"""Vectorized parsing and checking of many Sudoku grids at once, for analytics over whole datasets.
+
+Grids are held in an `(N, 9, 9)` uint8 array, where 0 marks an unfilled cell.
+"""
+
+from typing import Sequence
+
+import numpy as np
+
+from utils.sudoku_utils import SudokuError
+
+GRID_SIZE = 9
+GRID_LENGTH = GRID_SIZE * GRID_SIZE
+ALL_NUMBERS = 0b1111111110  # bit `n` is set for every number `n` from 1 to 9
+
+
+def parse_grids(lines: Sequence[str]) -> np.ndarray:
+    """Returns an `(N, 9, 9)` uint8 array of the grids in the N 81-digit `lines`."""
+    raw = ''.join(lines).encode('ascii')
+    if len(raw) != GRID_LENGTH * len(lines):
+        raise SudokuError('Every grid must be exactly 81 digits long.')
+
+    grids = np.frombuffer(raw, dtype=np.uint8) - ord('0')
+    if grids.size and grids.max() > 9:  # anything below '0' wraps around to a large number too
+        raise SudokuError('Grids may only contain the digits 0 to 9.')
+
+    return grids.reshape(-1, GRID_SIZE, GRID_SIZE)
+
+
+def sub_grids(grids: np.ndarray) -> np.ndarray:
+    """Returns the `grids` rearranged so that each row holds one 3 X 3 sub-grid, left to right, top to bottom."""
+    return grids.reshape(-1, 3, 3, 3, 3).transpose(0, 1, 3, 2, 4).reshape(-1, GRID_SIZE, GRID_SIZE)
+
+
+def grids_are_solved(grids: np.ndarray) -> np.ndarray:
+    """Returns a boolean array of length N, which is True for every grid that is completely and correctly filled."""
+    bits = np.left_shift(np.uint16(1), grids.astype(np.uint16))
+
+    # a unit holds every number from 1 to 9 exactly once only if its bits add up to all nine numbers,
+    # while an unfilled cell contributes bit 0, which spoils the mask
+    rows_ok = np.bitwise_or.reduce(bits, axis=2) == ALL_NUMBERS
+    cols_ok = np.bitwise_or.reduce(bits, axis=1) == ALL_NUMBERS
+    boxes_ok = np.bitwise_or.reduce(sub_grids(bits), axis=2) == ALL_NUMBERS
+
+    return rows_ok.all(axis=1) & cols_ok.all(axis=1) & boxes_ok.all(axis=1)
+
+
+def givens_agree(quizzes: np.ndarray, solutions: np.ndarray) -> np.ndarray:
+    """Returns a boolean array of length N, which is True wherever a solution keeps every number given in its quiz."""
+    return ((quizzes == 0) | (quizzes == solutions)).all(axis=(1, 2))
@@ -0,0 +1,145 @@
+"""Canonical forms and hashes of Sudoku quizzes, that are the same for every quiz equivalent to another.
+
+Two quizzes are equivalent when one can be turned into the other by relabelling its numbers, reordering the rows
+within a band (a row of sub-grids) or the bands themselves, reordering the columns within a stack (a column of
+sub-grids) or the stacks themselves, and transposing. The canonical form of a quiz is the smallest of the 81-digit
+strings of all its equivalents, with numbers relabelled 1, 2, 3... in the order they first appear and 0 for every
+unfilled cell.
+
+The smallest string is found by branch and bound: the output is built one row at a time, and only the row orders,
+column orders and relabellings that give the smallest output so far are carried on to the next row.
+"""
+
+from hashlib import blake2b
+from itertools import permutations, product
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+from utils.geometry import COLS, GRID_SIZE
+
+BOX_SIZE = 3
+BANDS = tuple(tuple(range(band * BOX_SIZE, (band + 1) * BOX_SIZE)) for band in range(BOX_SIZE))
+STACKS = BANDS
+HASH_SIZE = 8  # bytes
+
+# the state of a partially built output: whether the cells are transposed, the rows left in the current band,
+# the bands left, the column order, and the label given to each number so far (0 if it has none yet)
+_State = Tuple[int, FrozenSet[int], FrozenSet[int], Tuple[int, ...], Tuple[int, ...]]
+
+
+def _first_row_orders(row: Tuple[int, ...]) -> Iterable[Tuple[int, ...]]:
+    """Yields every column order that puts the unfilled cells of the `row` as early as they can go.
+
+    Within each stack the unfilled cells go first, and stacks with more unfilled cells go first. Columns and
+    stacks that are alike can still go in any order.
+    """
+    by_blanks: Dict[int, List[List[List[int]]]] = {}
+    for stack in STACKS:
+        blanks = [col for col in stack if not row[col]]
+        givens = [col for col in stack if row[col]]
+        orders = [list(first) + list(second) for first in permutations(blanks) for second in permutations(givens)]
+        by_blanks.setdefault(len(blanks), []).append(orders)
+
+    groups = [by_blanks[blanks] for blanks in sorted(by_blanks, reverse=True)]
+    # the stacks of a group can be in any order, and each stack in any of its own orders
+    group_choices = [
+        [
+            [col for stack_order in chosen for col in stack_order]
+            for stacks in permutations(group)
+            for chosen in product(*stacks)
+        ]
+        for group in groups
+    ]
+    for choice in product(*group_choices):
+        yield tuple(col for part in choice for col in part)
+
+
+def _relabel(values: Iterable[int], mapping: List[int], next_label: int) -> Tuple[Tuple[int, ...], int]:
+    output = []
+    for value in values:
+        if value:
+            if not mapping[value]:
+                mapping[value] = next_label
+                next_label += 1
+            value = mapping[value]
+        output.append(value)
+    return tuple(output), next_label
+
+
+def canonical_cells(cells: Tuple[int, ...]) -> Tuple[int, ...]:
+    """Returns the canonical form of the 81 `cells` of a quiz (row by row, 0 for unfilled), as 81 numbers."""
+    transposed = tuple(cells[cell] for col in COLS for cell in col)
+    variants = (cells, transposed)
+
+    # the first row: its relabelled output only depends on where its unfilled cells go
+    best = None
+    starts = []
+    for variant in range(len(variants)):
+        for row in range(GRID_SIZE):
+            values = variants[variant][row * GRID_SIZE : (row + 1) * GRID_SIZE]
+            # the more unfilled cells the leading stacks have, the smaller the output
+            key = sorted((sum(not values[col] for col in stack) for stack in STACKS), reverse=True)
+            if best is None or key > best:
+                best, starts = key, [(variant, row)]
+            elif key == best:
+                starts.append((variant, row))
+
+    states: Dict[_State, None] = {}
+    output: List[int] = []
+    for variant, row in starts:
+        values = variants[variant][row * GRID_SIZE : (row + 1) * GRID_SIZE]
+        band = row // BOX_SIZE
+        for order in _first_row_orders(values):
+            mapping = [0] * (GRID_SIZE + 1)
+            first, _ = _relabel((values[col] for col in order), mapping, 1)
+            output = list(first)
+            rows_left = frozenset(BANDS[band]) - {row}
+            bands_left = frozenset(range(BOX_SIZE)) - {band}
+            states[(variant, rows_left, bands_left, order, tuple(mapping))] = None
+
+    # every other row: keep the choices that give the smallest output so far
+    for _ in range(GRID_SIZE - 1):
+        best_row = None
+        next_states: Dict[_State, None] = {}
+        for variant, rows_left, bands_left, order, mapping in states:
+            if rows_left:
+                choices = [(row, rows_left - {row}, bands_left) for row in rows_left]
+            else:
+                choices = [
+                    (row, frozenset(BANDS[band]) - {row}, bands_left - {band})
+                    for band in bands_left
+                    for row in BANDS[band]
+                ]
+            cells_of_variant = variants[variant]
+            next_label = max(mapping) + 1
+            for row, next_rows_left, next_bands_left in choices:
+                base = row * GRID_SIZE
+                next_mapping = list(mapping)
+                values, _ = _relabel((cells_of_variant[base + col] for col in order), next_mapping, next_label)
+                if best_row is None or values < best_row:
+                    best_row, next_states = values, {}
+                if values == best_row:
+                    next_states[(variant, next_rows_left, next_bands_left, order, tuple(next_mapping))] = None
+        output += best_row
+        states = next_states
+
+    return tuple(output)
+
+
+def canonical_form(quiz: str) -> str:
+    """Returns the canonical form of the 81-digit `quiz`, as 81 digits."""
+    return ''.join(map(str, canonical_cells(tuple(map(int, quiz)))))
+
+
+def canonical_grid_form(grid: List[List[str]]) -> str:
+    """Returns the canonical form of the quiz in the `grid`, as 81 digits."""
+    return canonical_form(''.join(cell if cell != ' ' else '0' for row in grid for cell in row))
+
+
+def hash_canonical_form(form: str) -> int:
+    """Returns the 64-bit hash of a canonical form. It is never 0, so 0 can mark an empty slot in a hash table."""
+    return int.from_bytes(blake2b(form.encode('ascii'), digest_size=HASH_SIZE).digest(), 'little') or 1
+
+
+def puzzle_hash(quiz: str) -> int:
+    """Returns the 64-bit hash of the canonical form of the 81-digit `quiz`, the same for all its equivalents."""
+    return hash_canonical_form(canonical_form(quiz))
@@ -0,0 +1,11 @@
+"""The choices of the batch commands' options.
+
+They are kept apart from the modules that use them, so that building the command line parser doesn't import those
+modules (and what they import) for commands that don't need them.
+"""
+
+# the executors that `utils.batch_solve` can solve a dataset on
+EXECUTOR_NAMES = ('serial', 'thread', 'process', 'shared-memory')
+
+# the symmetries of the givens that `utils.pattern_index` indexes; 'symmetric' stands for any of them
+SYMMETRY_NAMES = ('symmetric', 'rotational', 'quarter-turn', 'horizontal', 'vertical', 'diagonal', 'anti-diagonal')
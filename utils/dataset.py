@@ -0,0 +1,126 @@
+"""Streaming access to puzzle datasets of any size.
+
+A dataset is a text file of `quiz,solution` lines, optionally starting with a `quizzes,solutions` header and
+optionally gzip-compressed. Everything here reads the file lazily, so memory doesn't grow with the dataset.
+"""
+
+import gzip
+import os
+import random
+from itertools import islice
+from pathlib import Path
+from typing import IO, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
+
+T = TypeVar('T')
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+# a dataset line, and the (1-based) line number it was read from
+NumberedLine = Tuple[int, str]
+
+
+def is_gzipped(path: Union[str, Path]) -> bool:
+    with open(path, 'rb') as dataset:
+        return dataset.read(2) == GZIP_MAGIC
+
+
+def open_dataset(path: Union[str, Path]) -> IO[str]:
+    """Opens the dataset for reading text, decompressing it on the fly if it is gzipped."""
+    if is_gzipped(path):
+        return gzip.open(path, 'rt')
+    return open(path, 'r')
+
+
+def _is_header(line: str) -> bool:
+    return not line[:1].isdecimal()
+
+
+def iter_lines(
+    path: Union[str, Path], start: int = 0, stop: Optional[int] = None, step: int = 1
+) -> Iterator[NumberedLine]:
+    """Yields the numbered puzzle lines of the dataset, without the header, blank lines or line endings.
+
+    `start`, `stop` and `step` select puzzles by their position among the puzzle lines, like a slice does,
+    so `step` workers can each take every `step`-th puzzle by starting at their own index.
+    """
+    with open_dataset(path) as dataset:
+        numbered = (
+            (line_number, line.strip())
+            for line_number, line in enumerate(dataset, start=1)
+            if line.strip() and not (line_number == 1 and _is_header(line))
+        )
+        yield from islice(numbered, start, stop, step)
+
+
+def iter_puzzles(
+    path: Union[str, Path], start: int = 0, stop: Optional[int] = None, step: int = 1
+) -> Iterator[Tuple[str, str]]:
+    """Yields the (quiz, solution) pairs of the dataset, selected like `iter_lines` does.
+    The solution is empty for quizzes that come without one.
+    """
+    for _, line in iter_lines(path, start, stop, step):
+        quiz, _, solution = line.partition(',')
+        yield (quiz, solution)
+
+
+def iter_byte_range(path: Union[str, Path], begin: int, end: int) -> Iterator[Tuple[str, str]]:
+    """Yields the (quiz, solution) pairs of the lines that start within bytes `begin` to `end` of an
+    uncompressed dataset.
+
+    Seeking straight to `begin` lets workers split a large file between them without reading the parts before
+    their own. Every line belongs to exactly one range, as a line is read by the range it starts in.
+    """
+    with open(path, 'rb') as dataset:
+        if begin > 0:
+            dataset.seek(begin - 1)
+            dataset.readline()  # finish the line that started before this range
+        while dataset.tell() < end:
+            line = dataset.readline()
+            if not line:
+                return
+            text = line.decode('ascii').strip()
+            if text and not (dataset.tell() == len(line) and _is_header(text)):
+                quiz, _, solution = text.partition(',')
+                yield (quiz, solution)
+
+
+def shard_puzzles(path: Union[str, Path], index: int, count: int) -> Iterator[Tuple[str, str]]:
+    """Yields the puzzles of shard `index` of `count` shards of the dataset, so that `count` workers
+    can share it out.
+
+    Uncompressed datasets are split into byte ranges that each worker seeks to. Compressed datasets can't be
+    seeked into, so every worker reads the whole stream and takes every `count`-th puzzle.
+    """
+    if is_gzipped(path):
+        return iter_puzzles(path, start=index, step=count)
+
+    size = os.path.getsize(path)
+    return iter_byte_range(path, size * index // count, size * (index + 1) // count)
+
+
+def sample_puzzles(path: Union[str, Path], k: int, rng: Optional[random.Random] = None) -> List[Tuple[str, str]]:
+    """Returns `k` puzzles picked uniformly at random from the dataset, in one pass and with memory for only
+    `k` puzzles (reservoir sampling). Fewer are returned if the dataset is smaller than `k`.
+    """
+    rng = rng or random.Random()
+    reservoir: List[Tuple[str, str]] = []
+
+    for seen, puzzle in enumerate(iter_puzzles(path)):
+        if seen < k:
+            reservoir.append(puzzle)
+        else:
+            slot = rng.randrange(seen + 1)
+            if slot < k:
+                reservoir[slot] = puzzle
+
+    return reservoir
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Yields lists of up to `size` consecutive items."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,149 @@
+"""Finds repeated puzzles in a dataset, and keeps an index of the puzzles it has, by their canonical hash.
+
+Puzzles repeat when they are equivalent (see `utils.canonical`), so they are compared by the hash of their canonical
+form. The hash index is an open-addressing hash table of (hash, line number) slots in a file next to the dataset,
+memory-mapped to check whether a new puzzle is already in the dataset in O(1), without reading the dataset again.
+"""
+
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from utils.canonical import puzzle_hash
+from utils.dataset import NumberedLine, chunked, iter_lines
+from utils.parallel import map_chunks
+from utils.sudoku_utils import SudokuError
+
+HASH_INDEX_MAGIC = b'SDKHASH1'
+# magic, number of slots (a power of two), number of puzzles in the table
+HASH_INDEX_HEADER = struct.Struct('<8sQQ')
+# the canonical hash of a puzzle (0 for an empty slot), and the line number it first appears on
+SLOT = struct.Struct('<QQ')
+
+
+class DedupReport(NamedTuple):
+    """The outcome of hashing a dataset."""
+
+    puzzles: int
+    unique: int
+    duplicates: List[Tuple[int, int]]  # the line number of every repeat, and of the puzzle it repeats
+    seconds: float
+
+
+def hash_lines(lines: List[NumberedLine]) -> List[Tuple[int, int]]:
+    """Returns the line number and canonical hash of the quiz of each dataset line."""
+    return [(line_number, puzzle_hash(line.partition(',')[0])) for line_number, line in lines]
+
+
+def hash_index_path_for(csv_path: Union[str, Path]) -> Path:
+    """Returns the location of the hash index that belongs to the `csv_path` dataset."""
+    return Path(csv_path).with_suffix('.hashes')
+
+
+def _iter_hashes(
+    csv_path: Union[str, Path], workers: Optional[int], chunk_size: int
+) -> Iterator[Tuple[int, int]]:
+    for hashes in map_chunks(hash_lines, chunked(iter_lines(csv_path), chunk_size), workers):
+        yield from hashes
+
+
+def write_hash_table(path: Union[str, Path], first_lines: Dict[int, int]) -> None:
+    """Writes the (hash: line number) pairs of `first_lines` as a hash table file at `path`."""
+    capacity = 16
+    while capacity < 2 * len(first_lines):  # at most half full, so that probes stay short
+        capacity *= 2
+
+    table = bytearray(HASH_INDEX_HEADER.size + capacity * SLOT.size)
+    HASH_INDEX_HEADER.pack_into(table, 0, HASH_INDEX_MAGIC, capacity, len(first_lines))
+    for puzzle_hash_, line_number in first_lines.items():
+        slot = puzzle_hash_ & (capacity - 1)
+        while SLOT.unpack_from(table, HASH_INDEX_HEADER.size + slot * SLOT.size)[0]:
+            slot = (slot + 1) & (capacity - 1)
+        SLOT.pack_into(table, HASH_INDEX_HEADER.size + slot * SLOT.size, puzzle_hash_, line_number)
+
+    path = Path(path)
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    tmp_path.write_bytes(table)
+    os.replace(tmp_path, path)
+
+
+def build_hash_index(
+    csv_path: Union[str, Path], workers: Optional[int] = None, chunk_size: int = 2_000
+) -> DedupReport:
+    """Hashes every puzzle of the dataset on `workers` processes, streaming through it, and writes the hash index
+    next to it. Returns the puzzles that repeat an earlier one.
+    """
+    start = time.perf_counter()
+    first_lines: Dict[int, int] = {}
+    duplicates: List[Tuple[int, int]] = []
+    puzzles = 0
+
+    for line_number, puzzle_hash_ in _iter_hashes(csv_path, workers, chunk_size):
+        puzzles += 1
+        first = first_lines.setdefault(puzzle_hash_, line_number)
+        if first != line_number:
+            duplicates.append((line_number, first))
+
+    write_hash_table(hash_index_path_for(csv_path), first_lines)
+    return DedupReport(puzzles, len(first_lines), duplicates, time.perf_counter() - start)
+
+
+class HashIndex:
+    """Memory-mapped lookups in a hash index built by `build_hash_index`."""
+
+    def __init__(self, index_path: Union[str, Path]) -> None:
+        with open(index_path, 'rb') as index_file:
+            self._map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._capacity, self._count = HASH_INDEX_HEADER.unpack_from(self._map)
+        if magic != HASH_INDEX_MAGIC:
+            self._map.close()
+            raise SudokuError(f'{index_path} is not a hash index.')
+
+    def __len__(self) -> int:
+        return self._count
+
+    def first_line(self, puzzle_hash_: int) -> Optional[int]:
+        """Returns the line number of the puzzle with the canonical hash `puzzle_hash_`, or None if there is none."""
+        mask = self._capacity - 1
+        slot = puzzle_hash_ & mask
+        while True:
+            found, line_number = SLOT.unpack_from(self._map, HASH_INDEX_HEADER.size + slot * SLOT.size)
+            if found == puzzle_hash_:
+                return line_number
+            if not found:
+                return None
+            slot = (slot + 1) & mask
+
+    def __contains__(self, puzzle_hash_: int) -> bool:
+        return self.first_line(puzzle_hash_) is not None
+
+    def find_repeats(
+        self, csv_path: Union[str, Path], workers: Optional[int] = None, chunk_size: int = 2_000
+    ) -> Iterator[Tuple[int, int]]:
+        """Yields the line number of every puzzle of another dataset that is already in the index, and the line
+        number it has in the indexed dataset.
+        """
+        for line_number, puzzle_hash_ in _iter_hashes(csv_path, workers, chunk_size):
+            first = self.first_line(puzzle_hash_)
+            if first is not None:
+                yield (line_number, first)
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> 'HashIndex':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def open_hash_index(csv_path: Union[str, Path]) -> HashIndex:
+    """Opens the hash index of the `csv_path` dataset, hashing the dataset first if it has changed since."""
+    index_path = hash_index_path_for(csv_path)
+    if not index_path.exists() or index_path.stat().st_mtime < Path(csv_path).stat().st_mtime:
+        build_hash_index(csv_path)
+    return HashIndex(index_path)
@@ -0,0 +1,121 @@
+"""A compact binary encoding of games, for saving and restoring them.
+
+A grid is nibble-packed: each cell is a number from 0 (empty) to 9 in 4 bits, two cells to a byte, so a whole
+grid takes 41 bytes. A snapshot of a game is a small header, the packed grid and solution, and the move log in the
+same `cell index << 4 | number` form that games keep it in memory. Snapshots are read straight out of any buffer
+(bytes, an mmap, a slice of a larger file) through a memoryview, without copying it first.
+"""
+
+import struct
+import sys
+from array import array
+from typing import Iterator, List, NamedTuple, Optional, Union
+
+from utils.sudoku_utils import SudokuError
+
+GRID_SIZE = 9
+CELL_COUNT = GRID_SIZE * GRID_SIZE
+PACKED_GRID_SIZE = (CELL_COUNT + 1) // 2
+
+SNAPSHOT_MAGIC = b'SDKG'
+SNAPSHOT_VERSION = 1
+HAS_SOLUTION = 1
+# magic, version, flags, number of moves
+SNAPSHOT_HEADER = struct.Struct('<4sBBH')
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+# the cell characters of each packed byte, and the nibble of each cell character
+_CHARS = ' 123456789'
+_PAIR_OF_BYTE = tuple(
+    (_CHARS[byte >> 4], _CHARS[byte & 0xF]) if byte >> 4 < 10 and byte & 0xF < 10 else None for byte in range(256)
+)
+_NIBBLE_OF_CHAR = {char: nibble for nibble, char in enumerate(_CHARS)}
+_NIBBLE_OF_CHAR['0'] = 0
+
+
+class Snapshot(NamedTuple):
+    """The state of a game, as decoded from a snapshot."""
+
+    grid: List[List[str]]
+    solution: Optional[List[List[str]]]
+    moves: array  # array('H') of `cell index << 4 | number`
+
+
+def pack_grid(grid: List[List[str]]) -> bytes:
+    """Returns the `grid` packed into 41 bytes, two cells to a byte."""
+    nibbles = [_NIBBLE_OF_CHAR[char] for row in grid for char in row]
+    nibbles.append(0)  # pads the last byte
+    return bytes(nibbles[i] << 4 | nibbles[i + 1] for i in range(0, CELL_COUNT, 2))
+
+
+def unpack_grid(buffer: Buffer, offset: int = 0) -> List[List[str]]:
+    """Returns the grid packed into the 41 bytes of the `buffer` starting at `offset`."""
+    packed = memoryview(buffer)[offset : offset + PACKED_GRID_SIZE]
+    if len(packed) < PACKED_GRID_SIZE:
+        raise SudokuError('This saved game is cut short.')
+    cells: List[str] = []
+    try:
+        for byte in packed:
+            cells += _PAIR_OF_BYTE[byte]
+        del cells[CELL_COUNT:]  # drops the padding
+    except TypeError:  # a nibble above 9
+        raise SudokuError('This saved game is corrupt.') from None
+    return [cells[row : row + GRID_SIZE] for row in range(0, CELL_COUNT, GRID_SIZE)]
+
+
+def snapshot_size(move_count: int) -> int:
+    return SNAPSHOT_HEADER.size + 2 * PACKED_GRID_SIZE + 2 * move_count
+
+
+def encode_snapshot(grid: List[List[str]], solution: Optional[List[List[str]]], moves: array) -> bytes:
+    """Returns the snapshot of a game with the `grid`, `solution` and `moves` made so far."""
+    if moves.typecode != 'H':
+        raise SudokuError("Moves must be kept in an array('H').")
+    if sys.byteorder == 'big':
+        moves = array('H', moves)
+        moves.byteswap()
+    header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, HAS_SOLUTION if solution else 0, len(moves))
+    packed_solution = pack_grid(solution) if solution else bytes(PACKED_GRID_SIZE)
+    return b''.join((header, pack_grid(grid), packed_solution, moves.tobytes()))
+
+
+def decode_snapshot(buffer: Buffer, offset: int = 0) -> Snapshot:
+    """Returns the game state of the snapshot in the `buffer` starting at `offset`."""
+    view = memoryview(buffer)
+    if len(view) - offset < SNAPSHOT_HEADER.size:
+        raise SudokuError('This saved game is cut short.')
+    magic, version, flags, move_count = SNAPSHOT_HEADER.unpack_from(view, offset)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise SudokuError('This is not a saved game.')
+
+    position = offset + SNAPSHOT_HEADER.size
+    grid = unpack_grid(view, position)
+    solution = unpack_grid(view, position + PACKED_GRID_SIZE) if flags & HAS_SOLUTION else None
+
+    position += 2 * PACKED_GRID_SIZE
+    move_bytes = view[position : position + 2 * move_count]
+    if len(move_bytes) < 2 * move_count:
+        raise SudokuError('This saved game is cut short.')
+    moves = array('H')
+    moves.frombytes(move_bytes)
+    if sys.byteorder == 'big':
+        moves.byteswap()
+
+    if any(packed >> 4 >= CELL_COUNT or not 1 <= packed & 0xF <= 9 for packed in moves):
+        raise SudokuError('This saved game is corrupt.')
+
+    return Snapshot(grid, solution, moves)
+
+
+def iter_snapshots(buffer: Buffer) -> Iterator[memoryview]:
+    """Yields a view of each snapshot in a `buffer` of snapshots written one after another."""
+    view = memoryview(buffer)
+    offset = 0
+    while offset < len(view):
+        if len(view) - offset < SNAPSHOT_HEADER.size:
+            raise SudokuError('This saved game is cut short.')
+        move_count = SNAPSHOT_HEADER.unpack_from(view, offset)[3]
+        size = snapshot_size(move_count)
+        yield view[offset : offset + size]
+        offset += size
@@ -0,0 +1,113 @@
+"""Generates new Sudoku puzzles with unique solutions"""
+
+import os
+import random
+import time
+from typing import Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from utils.geometry import GRID_SIZE, STANDARD
+from utils.parallel import map_chunks
+from utils.solver import count_solutions, solve
+from utils.sudoku_utils import SudokuError
+
+
+class GenerationReport(NamedTuple):
+    """The outcome of generating a batch of puzzles."""
+
+    puzzles: int
+    workers: int
+    seconds: float
+
+    @property
+    def puzzles_per_second(self) -> float:
+        return self.puzzles / self.seconds if self.seconds else 0.0
+
+    @property
+    def puzzles_per_second_per_core(self) -> float:
+        return self.puzzles_per_second / self.workers
+
+
+def random_solution(rng: random.Random) -> List[List[str]]:
+    """Returns a random, completely filled grid.
+
+    The three sub-grids on the diagonal don't share a row or column, so they are filled with independent random
+    permutations first, and the solver completes the rest.
+    """
+    grid = [[' '] * GRID_SIZE for _ in range(GRID_SIZE)]
+    for box in (0, 4, 8):
+        numbers = rng.sample('123456789', GRID_SIZE)
+        for (row, col), number in zip(STANDARD.box_locs(box), numbers):
+            grid[row][col] = number
+
+    solution = solve(grid).solution
+    if solution is None:  # can't happen, as the diagonal sub-grids never conflict
+        raise SudokuError('Could not complete a random grid.')
+    return solution
+
+
+def generate_puzzle(clues: int, rng: random.Random) -> Tuple[str, str]:
+    """Returns a new (quiz, solution) pair, in dataset format, whose quiz has a unique solution.
+
+    Numbers are taken out of a random solution in random order for as long as the solution stays unique,
+    stopping once only `clues` numbers are left. If no more numbers can be taken out without losing
+    uniqueness, the quiz keeps more than `clues` numbers.
+    """
+    solution = random_solution(rng)
+    puzzle = [row[:] for row in solution]
+    remaining = GRID_SIZE * GRID_SIZE
+
+    cells = [(row, col) for row in range(GRID_SIZE) for col in range(GRID_SIZE)]
+    rng.shuffle(cells)
+    for row, col in cells:
+        if remaining <= clues:
+            break
+        number = puzzle[row][col]
+        puzzle[row][col] = ' '
+        if count_solutions(puzzle) == 1:
+            remaining -= 1
+        else:
+            puzzle[row][col] = number
+
+    quiz = ''.join(cell if cell != ' ' else '0' for row in puzzle for cell in row)
+    return (quiz, ''.join(cell for row in solution for cell in row))
+
+
+def generate_batch(job: Tuple[int, int, int]) -> List[Tuple[str, str]]:
+    """Returns `count` new puzzles with `clues` clues, for a `(count, clues, seed)` job."""
+    count, clues, seed = job
+    rng = random.Random(seed)
+    return [generate_puzzle(clues, rng) for _ in range(count)]
+
+
+def generate_puzzles(
+    count: int, clues: int, workers: Optional[int] = None, batch_size: int = 50, seed: Optional[int] = None
+) -> Iterator[Tuple[str, str]]:
+    """Yields `count` new puzzles with `clues` clues, generated in batches on `workers` processes."""
+    seeds = random.Random(seed)
+
+    def jobs() -> Iterator[Tuple[int, int, int]]:
+        for start in range(0, count, batch_size):
+            yield (min(batch_size, count - start), clues, seeds.getrandbits(64))
+
+    for batch in map_chunks(generate_batch, jobs(), workers):
+        yield from batch
+
+
+def write_puzzles(
+    output: TextIO,
+    count: int,
+    clues: int,
+    workers: Optional[int] = None,
+    batch_size: int = 50,
+    seed: Optional[int] = None,
+) -> GenerationReport:
+    """Writes `count` new puzzles to `output` in the `quizzes,solutions` dataset format, as they are generated."""
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    output.write('quizzes,solutions\n')
+    for quiz, solution in generate_puzzles(count, clues, workers, batch_size, seed):
+        output.write(f'{quiz},{solution}\n')
+
+    return GenerationReport(count, workers, time.perf_counter() - start)
+
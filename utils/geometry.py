@@ -0,0 +1,137 @@
+"""Precomputed index tables of the rows, columns, sub-grids and peers of a Sudoku board.
+
+Cells are numbered left to right, top to bottom, from 0. The units of a board are its rows, then its columns,
+then its sub-grids, so on a standard board rows are units 0-8, columns are units 9-17 and sub-grids are units 18-26.
+Besides the standard 9 X 9 board (sub-grids of 3 X 3), boards of any N² X N² size are supported: 4 X 4, 16 X 16,
+25 X 25 and so on. The tables of a size are built once and shared by everything that works on boards of that size.
+"""
+
+from functools import lru_cache
+from math import isqrt
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+Loc = Tuple[int, int]
+
+
+class _BitCounts:
+    """Stands in for a table of bit counts when the masks of a board are too wide to tabulate."""
+
+    def __getitem__(self, mask: int) -> int:
+        return bin(mask).count('1')
+
+
+# the widest masks (of a 16 X 16 board) that get a table of bit counts
+MAX_TABULATED_SIZE = 16
+
+
+class Geometry(NamedTuple):
+    """The immutable index tables of an N² X N² board."""
+
+    box_size: int  # N, the width of a sub-grid
+    size: int  # N², the width of the board and the count of numbers
+    cell_count: int
+    all_numbers: int  # a mask with bit `n` set for every number `n` from 1 to N²
+    units: Tuple[Tuple[int, ...], ...]  # the cells of every row, column and sub-grid
+    rows: Tuple[Tuple[int, ...], ...]
+    cols: Tuple[Tuple[int, ...], ...]
+    boxes: Tuple[Tuple[int, ...], ...]
+    peers: Tuple[Tuple[int, ...], ...]  # the other cells that share a unit with each cell
+    row_of: Tuple[int, ...]  # the row, column and sub-grid of each cell
+    col_of: Tuple[int, ...]
+    box_of: Tuple[int, ...]
+    box_of_loc: Tuple[Tuple[int, ...], ...]  # the sub-grid of each (row, col) location, indexed [row][col]
+    unit_locs: Tuple[Tuple[Loc, ...], ...]  # the (row, col) locations of the cells of every unit
+    peer_locs: Dict[Loc, Tuple[Loc, ...]]  # the (row, col) locations of the peers of every location
+    bit_count: Sequence[int]  # the number of bits set in each mask
+    number_of_bit: Dict[int, int]  # the number whose bit is set in each single-bit mask
+
+    def row_locs(self, row: int) -> Tuple[Loc, ...]:
+        return self.unit_locs[row]
+
+    def col_locs(self, col: int) -> Tuple[Loc, ...]:
+        return self.unit_locs[self.size + col]
+
+    def box_locs(self, box: int) -> Tuple[Loc, ...]:
+        return self.unit_locs[2 * self.size + box]
+
+
+def _bit_counts(size: int) -> Sequence[int]:
+    if size > MAX_TABULATED_SIZE:
+        return _BitCounts()
+    counts: List[int] = [0] * (1 << (size + 1))
+    for mask in range(1, len(counts)):
+        counts[mask] = counts[mask >> 1] + (mask & 1)
+    return tuple(counts)
+
+
+@lru_cache(maxsize=None)
+def geometry(box_size: int = 3) -> Geometry:
+    """Returns the index tables of a board whose sub-grids are `box_size` X `box_size`."""
+    size = box_size * box_size
+    cell_count = size * size
+
+    rows = tuple(tuple(row * size + col for col in range(size)) for row in range(size))
+    cols = tuple(tuple(row * size + col for row in range(size)) for col in range(size))
+    boxes = tuple(
+        tuple((box_row + r) * size + box_col + c for r in range(box_size) for c in range(box_size))
+        for box_row in range(0, size, box_size)
+        for box_col in range(0, size, box_size)
+    )
+    units = rows + cols + boxes
+
+    row_of = tuple(cell // size for cell in range(cell_count))
+    col_of = tuple(cell % size for cell in range(cell_count))
+    box_of = tuple((row_of[cell] // box_size) * box_size + col_of[cell] // box_size for cell in range(cell_count))
+    peers = tuple(
+        tuple(sorted((set(rows[row_of[cell]]) | set(cols[col_of[cell]]) | set(boxes[box_of[cell]])) - {cell}))
+        for cell in range(cell_count)
+    )
+
+    return Geometry(
+        box_size=box_size,
+        size=size,
+        cell_count=cell_count,
+        all_numbers=((1 << size) - 1) << 1,
+        units=units,
+        rows=rows,
+        cols=cols,
+        boxes=boxes,
+        peers=peers,
+        row_of=row_of,
+        col_of=col_of,
+        box_of=box_of,
+        box_of_loc=tuple(box_of[row * size : (row + 1) * size] for row in range(size)),
+        unit_locs=tuple(tuple(divmod(cell, size) for cell in unit) for unit in units),
+        peer_locs={divmod(cell, size): tuple(divmod(peer, size) for peer in peers[cell]) for cell in range(cell_count)},
+        bit_count=_bit_counts(size),
+        number_of_bit={1 << number: number for number in range(1, size + 1)},
+    )
+
+
+def geometry_of(grid: Sequence[Sequence[str]]) -> Geometry:
+    """Returns the index tables of the board that the `grid` is, working out its size from its number of rows."""
+    box_size = isqrt(len(grid))
+    if box_size < 1 or box_size * box_size != len(grid):
+        # imported here, as sudoku_utils itself depends on the solver, which depends on this module
+        from utils.sudoku_utils import SudokuError
+
+        raise SudokuError(f'A Sudoku grid must have a square number of rows, not {len(grid)}.')
+    if box_size == 3:
+        return STANDARD
+    return geometry(box_size)
+
+
+# the tables of the standard 9 X 9 board
+STANDARD = geometry(3)
+GRID_SIZE = STANDARD.size
+CELL_COUNT = STANDARD.cell_count
+ALL_NUMBERS = STANDARD.all_numbers
+UNITS = STANDARD.units
+ROWS, COLS, BOXES = STANDARD.rows, STANDARD.cols, STANDARD.boxes
+PEERS = STANDARD.peers
+ROW_OF, COL_OF, BOX_OF = STANDARD.row_of, STANDARD.col_of, STANDARD.box_of
+BOX_OF_LOC = STANDARD.box_of_loc
+UNIT_LOCS = STANDARD.unit_locs
+PEER_LOCS = STANDARD.peer_locs
+BIT_COUNT = STANDARD.bit_count
+NUMBER_OF_BIT = STANDARD.number_of_bit
@@ -0,0 +1,129 @@
+"""Hints that explain which number can be worked out next, and how"""
+
+from string import ascii_uppercase
+from typing import List, NamedTuple, Optional, Set, Tuple
+
+from utils.board import Board
+
+ROW_LETTERS = ascii_uppercase
+
+
+class Hint(NamedTuple):
+    """A number that goes into an unfilled cell, and the technique that works it out."""
+
+    loc: Tuple[int, int]
+    number: int
+    technique: str
+
+    def __str__(self) -> str:
+        row, col = self.loc
+        return f'{self.number} goes in {ROW_LETTERS[row]}{col + 1} ({self.technique})'
+
+
+class HintEngine:
+    """Works out hints for a grid as moves are made and undone.
+
+    The engine keeps the set of naked singles (unfilled cells with exactly one candidate) up to date, by
+    rechecking only the peers of a cell when it is filled or emptied. Callers update the grid, the board and the
+    set of unfilled cells first, then tell the engine through `placed` and `removed`.
+    The next hint is remembered until then, so it can be worked out ahead of time.
+    """
+
+    __slots__ = (
+        '_grid',
+        '_board',
+        '_unfilled_cells',
+        '_solution',
+        '_singles',
+        '_bit_count',
+        '_peer_locs',
+        '_next',
+        '_next_is_known',
+    )
+
+    def __init__(
+        self,
+        grid: List[List[str]],
+        board: Board,
+        unfilled_cells: Set[Tuple[int, int]],
+        solution: Optional[List[List[str]]] = None,
+    ) -> None:
+        self._grid = grid
+        self._board = board
+        self._unfilled_cells = unfilled_cells
+        self._solution = solution
+        self._singles: Set[Tuple[int, int]] = set()
+        self._bit_count = board.geometry.bit_count
+        self._peer_locs = board.geometry.peer_locs
+        self._next: Optional[Hint] = None
+        self._next_is_known = False
+        for loc in unfilled_cells:
+            self._recheck(loc)
+
+    def _recheck(self, loc: Tuple[int, int]) -> None:
+        row, col = loc
+        if self._grid[row][col] == ' ' and self._bit_count[self._board.candidates(loc)] == 1:
+            self._singles.add(loc)
+        else:
+            self._singles.discard(loc)
+
+    def placed(self, loc: Tuple[int, int]) -> None:
+        """Updates the hints after a number has been placed at `loc`."""
+        self._next_is_known = False
+        self._singles.discard(loc)
+        for peer in self._peer_locs[loc]:
+            self._recheck(peer)
+
+    def removed(self, loc: Tuple[int, int]) -> None:
+        """Updates the hints after the number at `loc` has been taken out."""
+        self._next_is_known = False
+        self._recheck(loc)
+        for peer in self._peer_locs[loc]:
+            self._recheck(peer)
+
+    def _is_correct(self, loc: Tuple[int, int], number: int) -> bool:
+        # a wrong move elsewhere can make a wrong number look deducible
+        return self._solution is None or self._solution[loc[0]][loc[1]] == str(number)
+
+    def next_hint(self) -> Optional[Hint]:
+        """Returns a hint for an unfilled cell, or None if there is nothing to hint at.
+
+        Naked singles come first, then hidden singles (a number with one possible cell left in a row, column or
+        sub-grid). When neither is left, any unfilled cell is revealed from the solution, if it is known.
+        """
+        if not self._next_is_known:
+            self._next = self._find_hint()
+            self._next_is_known = True
+        return self._next
+
+    def _find_hint(self) -> Optional[Hint]:
+        board = self._board
+        number_of_bit = board.geometry.number_of_bit
+
+        for loc in self._singles:
+            number = number_of_bit[board.candidates(loc)]
+            if self._is_correct(loc, number):
+                return Hint(loc, number, 'naked single')
+
+        for unit in board.geometry.unit_locs:
+            once = twice = 0
+            for loc in unit:
+                if loc in self._unfilled_cells:
+                    cands = board.candidates(loc)
+                    twice |= once & cands
+                    once |= cands
+            hidden = once & ~twice
+            while hidden:
+                bit = hidden & -hidden
+                hidden ^= bit
+                for loc in unit:
+                    if loc in self._unfilled_cells and board.candidates(loc) & bit:
+                        if self._is_correct(loc, number_of_bit[bit]):
+                            return Hint(loc, number_of_bit[bit], 'hidden single')
+                        break
+
+        if self._solution is not None:
+            for loc in self._unfilled_cells:
+                return Hint(loc, int(self._solution[loc[0]][loc[1]]), 'from the solution')
+
+        return None
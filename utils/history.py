@@ -0,0 +1,165 @@
+"""Immutable boards that share their unchanged rows, and a tree of the boards a game has been through.
+
+A `PersistentBoard` is a tuple of row tuples. Setting a cell copies only the path to it, a new row and a new tuple
+of rows, and shares the other 8 rows with the board it came from, so keeping a board costs memory in proportion to
+what changed rather than 81 cells, and a snapshot is just a reference to one.
+
+A `History` is a tree of moves. Playing a move adds a child to the current node, so playing after an undo starts a
+new branch instead of dropping the old one; undo and redo walk up and down the tree in O(1), and named checkpoints
+can be returned to from anywhere in it.
+"""
+
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from utils.sudoku_utils import SudokuError
+
+Loc = Tuple[int, int]
+
+
+class PersistentBoard(NamedTuple):
+    """An immutable grid, with ' ' for every unfilled cell."""
+
+    rows: Tuple[Tuple[str, ...], ...]
+
+    @classmethod
+    def from_grid(cls, grid: List[List[str]]) -> 'PersistentBoard':
+        return cls(tuple(tuple(row) for row in grid))
+
+    def cell(self, loc: Loc) -> str:
+        row, col = loc
+        return self.rows[row][col]
+
+    def set(self, loc: Loc, value: str) -> 'PersistentBoard':
+        """Returns a board with the `value` at `loc`, sharing every other row with this one."""
+        row, col = loc
+        old_row = self.rows[row]
+        new_row = old_row[:col] + (value,) + old_row[col + 1 :]
+        return PersistentBoard(self.rows[:row] + (new_row,) + self.rows[row + 1 :])
+
+    def to_grid(self) -> List[List[str]]:
+        """Returns a mutable copy of the board, in the grid format the rest of the game uses."""
+        return [list(row) for row in self.rows]
+
+
+class Node:
+    """A board in a `History`, and the move that led to it from its parent."""
+
+    __slots__ = ('board', 'move', 'parent', 'children', 'depth', 'redo_child')
+
+    def __init__(
+        self, board: PersistentBoard, move: Optional[Tuple[Loc, int]] = None, parent: Optional['Node'] = None
+    ) -> None:
+        self.board = board
+        self.move = move
+        self.parent = parent
+        self.children: Dict[Tuple[Loc, int], Node] = {}
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.redo_child: Optional[Node] = None  # the child that was last undone, which redo goes back to
+
+    def moves(self) -> List[Tuple[Loc, int]]:
+        """Returns the moves that lead to this node from the root, in the order they were played."""
+        moves = []
+        node: Optional[Node] = self
+        while node is not None and node.move is not None:
+            moves.append(node.move)
+            node = node.parent
+        return moves[::-1]
+
+
+class History:
+    """A tree of every board reached from a starting board, and the node of the board being played on."""
+
+    def __init__(self, board: PersistentBoard) -> None:
+        self.root = Node(board)
+        self.current = self.root
+        self.checkpoints: Dict[str, Node] = {}
+
+    @property
+    def board(self) -> PersistentBoard:
+        return self.current.board
+
+    def play(self, loc: Loc, number: int) -> Node:
+        """Moves to the board with the `number` placed at `loc`, a branch of the current one, and returns it.
+        Playing a move that was played from this board before returns to its branch.
+        """
+        move = (loc, number)
+        node = self.current.children.get(move)
+        if node is None:
+            node = Node(self.current.board.set(loc, str(number)), move, self.current)
+            self.current.children[move] = node
+        self.current.redo_child = node
+        self.current = node
+        return node
+
+    def undo(self) -> Node:
+        """Moves back to the board before the last move, and returns the node that was undone."""
+        node = self.current
+        if node.parent is None:
+            raise SudokuError("You haven't made a move yet!")
+        node.parent.redo_child = node
+        self.current = node.parent
+        return node
+
+    def redo(self) -> Node:
+        """Moves forward to the board of the move that was last undone from here, and returns it."""
+        node = self.current.redo_child
+        if node is None:
+            raise SudokuError('There is no move to redo!')
+        self.current = node
+        return node
+
+    def snapshot(self) -> Node:
+        """Returns the current node, which keeps its board and can be gone back to with `goto`."""
+        return self.current
+
+    def checkpoint(self, name: str) -> None:
+        """Names the current board, to go back to it with `goto`."""
+        self.checkpoints[name] = self.current
+
+    def path(self, source: Node, target: Node) -> Tuple[List[Node], List[Node]]:
+        """Returns the nodes to undo (from `source` upwards) and then to replay (downwards) to get from `source`
+        to `target` through their closest common ancestor.
+        """
+        undone: List[Node] = []
+        replayed: List[Node] = []
+        while source.depth > target.depth:
+            undone.append(source)
+            source = source.parent  # type: ignore[assignment]
+        while target.depth > source.depth:
+            replayed.append(target)
+            target = target.parent  # type: ignore[assignment]
+        while source is not target:
+            if source.parent is None or target.parent is None:
+                raise SudokuError('That board is not in this history.')
+            undone.append(source)
+            replayed.append(target)
+            source, target = source.parent, target.parent
+        return undone, replayed[::-1]
+
+    def goto(self, target: Union[str, Node]) -> Tuple[List[Node], List[Node]]:
+        """Moves to the `target` node, or the checkpoint of that name, and returns the nodes undone and replayed
+        on the way (see `path`).
+        """
+        if isinstance(target, str):
+            if target not in self.checkpoints:
+                raise SudokuError(f'There is no checkpoint called {target}.')
+            target = self.checkpoints[target]
+        undone, replayed = self.path(self.current, target)
+        for node in undone:
+            node.parent.redo_child = node  # type: ignore[union-attr]
+        for node in replayed:
+            node.parent.redo_child = node  # type: ignore[union-attr]
+        self.current = target
+        return undone, replayed
+
+    def branches(self, node: Optional[Node] = None) -> List[Node]:
+        """Returns the boards that have been reached in one move from the `node` (the current one by default)."""
+        return list((node or self.current).children.values())
+
+    def __iter__(self) -> Iterator[Node]:
+        """Yields every node of the tree, depth first."""
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(list(node.children.values())))
@@ -0,0 +1,141 @@
+"""Opt-in timing of the phases of each turn of the game.
+
+Tracing is off by default, and a disabled span costs one attribute check. Once enabled, every span is recorded
+as a Chrome trace event (viewable in chrome://tracing or Perfetto), and written out when the program exits.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from pathlib import Path
+from typing import ContextManager, Dict, List, Optional, Union
+
+# set this environment variable to a file path to trace the game into that file
+TRACE_ENV_VAR = 'SUDOKU_TRACE'
+
+_DISABLED_SPAN = nullcontext()
+
+
+class _Span:
+    __slots__ = ('_tracer', '_name', '_start')
+
+    def __init__(self, tracer: 'Tracer', name: str) -> None:
+        self._tracer = tracer
+        self._name = name
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter_ns()
+
+    def __exit__(self, *exc_info) -> None:
+        end = time.perf_counter_ns()
+        self._tracer._record(self._name, self._start, end)
+
+
+class Tracer:
+    """Records how long the named phases of each turn take, along with counters of game events."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.turn = 0
+        self.events: List[dict] = []
+        self.counters: Counter = Counter()
+        self._pid = os.getpid()
+
+    def span(self, name: str) -> ContextManager:
+        """Returns a context manager that times the `name` phase of the current turn."""
+        if not self.enabled:
+            return _DISABLED_SPAN
+        return _Span(self, name)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Adds `amount` to the `name` counter."""
+        if self.enabled:
+            self.counters[name] += amount
+            self.events.append(
+                {
+                    'name': name,
+                    'ph': 'C',
+                    'ts': time.perf_counter_ns() / 1000,
+                    'pid': self._pid,
+                    'args': {name: self.counters[name]},
+                }
+            )
+
+    def next_turn(self) -> None:
+        if self.enabled:
+            self.turn += 1
+
+    def _record(self, name: str, start_ns: int, end_ns: int) -> None:
+        self.events.append(
+            {
+                'name': name,
+                'ph': 'X',
+                'ts': start_ns / 1000,
+                'dur': (end_ns - start_ns) / 1000,
+                'pid': self._pid,
+                'tid': threading.get_ident(),
+                'args': {'turn': self.turn},
+            }
+        )
+
+    def export(self, path: Union[str, Path]) -> None:
+        """Writes the recorded events to `path` in the Chrome trace event format."""
+        Path(path).write_text(json.dumps({'traceEvents': self.events, 'displayTimeUnit': 'ms'}))
+
+
+tracer = Tracer()
+
+
+def enable_tracing(path: Optional[Union[str, Path]] = None) -> bool:
+    """Turns tracing on, writing the trace to `path` (or the file named by the `SUDOKU_TRACE` environment
+    variable) when the program exits. Returns False, and leaves tracing off, if no file was named.
+    """
+    path = path or os.environ.get(TRACE_ENV_VAR)
+    if not path:
+        return False
+    if not tracer.enabled:
+        tracer.enabled = True
+        atexit.register(tracer.export, path)
+    return True
+
+
+def load_durations(path: Union[str, Path]) -> Dict[str, List[float]]:
+    """Returns the durations (in microseconds) of every phase recorded in the trace file at `path`."""
+    durations: Dict[str, List[float]] = {}
+    for event in json.loads(Path(path).read_text())['traceEvents']:
+        if event.get('ph') == 'X':
+            durations.setdefault(event['name'], []).append(event['dur'])
+    return durations
+
+
+def summarize(path: Union[str, Path], width: int = 40) -> str:
+    """Returns a latency summary and histogram of every phase recorded in the trace file at `path`.
+
+    Histogram buckets double in size, starting from 1 microsecond.
+    """
+    lines = []
+    for name, durations in sorted(load_durations(path).items()):
+        durations.sort()
+        count = len(durations)
+
+        def percentile(fraction: float) -> float:
+            return durations[min(count - 1, int(fraction * count))]
+
+        lines.append(
+            f'{name}: {count} samples, p50 {percentile(0.5):,.0f} us, p90 {percentile(0.9):,.0f} us, '
+            f'p99 {percentile(0.99):,.0f} us, max {durations[-1]:,.0f} us'
+        )
+
+        buckets: Counter = Counter(max(0, int(duration)).bit_length() for duration in durations)
+        tallest = max(buckets.values())
+        for bucket in range(min(buckets), max(buckets) + 1):
+            upper = 1 << bucket
+            bar = '#' * round(width * buckets[bucket] / tallest)
+            lines.append(f'  < {upper:>9,} us | {bar} {buckets[bucket]}')
+        lines.append('')
+
+    return '\n'.join(lines)
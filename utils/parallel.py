@@ -0,0 +1,47 @@
+"""Helpers for spreading batch work over a pool of processes (or threads)"""
+
+import os
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Deque, Iterable, Iterator, Optional, Type, TypeVar
+
+if TYPE_CHECKING:  # concurrent.futures is slow to import, so it is only loaded once a pool is needed
+    from concurrent.futures import Executor, Future
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def map_chunks(
+    func: Callable[[T], R],
+    chunks: Iterable[T],
+    workers: Optional[int] = None,
+    pool_class: Optional[Type['Executor']] = None,
+) -> Iterator[R]:
+    """Yields `func(chunk)` for every chunk, in order, computing them on `workers` processes
+    (one per CPU by default), or on threads if `pool_class` is a `ThreadPoolExecutor`.
+
+    At most two chunks per worker are in flight at a time, so memory stays bounded by the chunk size
+    however many chunks there are. With a single worker, everything runs in this process.
+    """
+    if workers == 1:
+        for chunk in chunks:
+            yield func(chunk)
+        return
+
+    if pool_class is None:
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool_class = ProcessPoolExecutor
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = 2 * workers
+
+    with pool_class(max_workers=workers) as pool:
+        in_flight: Deque[Future] = deque()
+
+        for chunk in chunks:
+            in_flight.append(pool.submit(func, chunk))
+            if len(in_flight) >= max_in_flight:
+                yield in_flight.popleft().result()
+
+        while in_flight:
+            yield in_flight.popleft().result()
@@ -0,0 +1,273 @@
+"""Secondary indexes of a puzzle dataset, to find puzzles by their number of clues and the pattern of their givens.
+
+One scan of the dataset writes an index file next to it, holding the byte offset of every puzzle line and posting
+lists of puzzle numbers, one for each:
+- number of clues (givens), from 0 to 81;
+- row, column and sub-grid, and pattern of givens in it: a 9-bit mask with bit `i` set if the `i`-th cell of the
+  unit is given, so that mask 0 lists the puzzles where the unit is empty;
+- symmetry of the givens, which the puzzle may have several of.
+
+A query intersects the posting lists it names, walking the shortest one and looking the rest up by binary search,
+so it takes time in proportion to the shortest list rather than the dataset. The matching puzzles are then read
+from the dataset itself, at their offsets, so the dataset stays the source of truth.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from utils.choices import SYMMETRY_NAMES
+from utils.dataset import is_gzipped
+from utils.geometry import CELL_COUNT, GRID_SIZE, UNITS
+from utils.sudoku_utils import SudokuError
+
+INDEX_MAGIC = b'SDKPATT1'
+# magic, number of puzzles, number of posting lists
+INDEX_HEADER = struct.Struct('<8sQQ')
+# the start and length of a posting list
+POSTING = struct.Struct('<QQ')
+
+ROW_NAMES = 'ABCDEFGHI'
+# the name of every unit, in the order of `UNITS`: rows A to I, columns 1 to 9, then sub-grids box1 to box9
+UNIT_NAMES = (
+    tuple(ROW_NAMES)
+    + tuple(str(col + 1) for col in range(GRID_SIZE))
+    + tuple(f'box{box + 1}' for box in range(GRID_SIZE))
+)
+# the unit of each name, in upper case, so that unit names are not case-sensitive (as rows aren't in moves)
+UNIT_NUMBERS = {name.upper(): unit for unit, name in enumerate(UNIT_NAMES)}
+PATTERNS_PER_UNIT = 1 << GRID_SIZE
+_LAST = GRID_SIZE - 1
+
+
+def _cell_map(loc_of: Callable[[int, int], Tuple[int, int]]) -> Tuple[int, ...]:
+    """Returns the cell that each cell goes to, when the cell at (row, col) goes to `loc_of(row, col)`."""
+    return tuple(
+        row * GRID_SIZE + col for row, col in (loc_of(*divmod(cell, GRID_SIZE)) for cell in range(CELL_COUNT))
+    )
+
+
+# the cell that each cell goes to under each symmetry of the board
+SYMMETRY_MAPS: Dict[str, Tuple[int, ...]] = {
+    'rotational': _cell_map(lambda row, col: (_LAST - row, _LAST - col)),
+    'quarter-turn': _cell_map(lambda row, col: (col, _LAST - row)),
+    'horizontal': _cell_map(lambda row, col: (_LAST - row, col)),
+    'vertical': _cell_map(lambda row, col: (row, _LAST - col)),
+    'diagonal': _cell_map(lambda row, col: (col, row)),
+    'anti-diagonal': _cell_map(lambda row, col: (_LAST - col, _LAST - row)),
+}
+# 'symmetric' lists the puzzles that have any of the symmetries, and the rest are in the order of `SYMMETRY_MAPS`
+SYMMETRIES = SYMMETRY_NAMES
+
+# the posting lists, in the order they are stored: clue counts, then unit patterns, then symmetries
+CLUE_LISTS = CELL_COUNT + 1
+PATTERN_LISTS = len(UNITS) * PATTERNS_PER_UNIT
+LIST_COUNT = CLUE_LISTS + PATTERN_LISTS + len(SYMMETRIES)
+
+
+def _clues_list(clues: int) -> int:
+    return clues
+
+
+def _pattern_list(unit: int, mask: int) -> int:
+    return CLUE_LISTS + unit * PATTERNS_PER_UNIT + mask
+
+
+def _symmetry_list(symmetry: str) -> int:
+    return CLUE_LISTS + PATTERN_LISTS + SYMMETRIES.index(symmetry)
+
+
+def posting_lists_of(quiz: str) -> List[int]:
+    """Returns the posting lists that the 81-digit `quiz` belongs in."""
+    givens = [cell != '0' for cell in quiz]
+    lists = [_clues_list(sum(givens))]
+    for unit, cells in enumerate(UNITS):
+        mask = 0
+        for position, cell in enumerate(cells):
+            if givens[cell]:
+                mask |= 1 << position
+        lists.append(_pattern_list(unit, mask))
+
+    symmetries = [
+        symmetry
+        for symmetry, cell_map in SYMMETRY_MAPS.items()
+        if all(givens[cell] == givens[cell_map[cell]] for cell in range(CELL_COUNT))
+    ]
+    if symmetries:
+        lists += [_symmetry_list(symmetry) for symmetry in ['symmetric'] + symmetries]
+    return lists
+
+
+def pattern_index_path_for(csv_path: Union[str, Path]) -> Path:
+    """Returns the location of the pattern index that belongs to the `csv_path` dataset."""
+    return Path(csv_path).with_suffix('.patterns')
+
+
+def _iter_offsets(csv_path: Union[str, Path]) -> Iterator[Tuple[int, str]]:
+    """Yields the byte offset and quiz of every puzzle line of the dataset, skipping the header and blank lines."""
+    if is_gzipped(csv_path):
+        raise SudokuError(f'{csv_path} is compressed, so its puzzles cannot be read at an offset.')
+    with open(csv_path, 'rb') as dataset:
+        offset = 0
+        for line_number, line in enumerate(dataset, start=1):
+            quiz = line.split(b',', 1)[0].strip()
+            if quiz and not (line_number == 1 and not quiz[:1].isdigit()):
+                if len(quiz) != CELL_COUNT:
+                    raise SudokuError(f'Line {line_number} of {csv_path} is not a valid quiz and solution pair.')
+                yield offset, quiz.decode('ascii')
+            offset += len(line)
+
+
+def _write_array(index_file: BinaryIO, values: array) -> None:
+    if sys.byteorder == 'big':  # the index is little-endian
+        values.byteswap()
+    index_file.write(values.tobytes())
+
+
+def build_pattern_index(csv_path: Union[str, Path]) -> int:
+    """Scans the dataset once, and writes its pattern index next to it. Returns the number of puzzles indexed."""
+    offsets = array('Q')
+    postings = [array('I') for _ in range(LIST_COUNT)]
+    for number, (offset, quiz) in enumerate(_iter_offsets(csv_path)):
+        offsets.append(offset)
+        for posting in posting_lists_of(quiz):
+            postings[posting].append(number)
+
+    index_path = pattern_index_path_for(csv_path)
+    tmp_path = index_path.with_name(f'{index_path.name}.{os.getpid()}.tmp')
+    position = INDEX_HEADER.size + 8 * len(offsets) + POSTING.size * LIST_COUNT
+    with open(tmp_path, 'wb') as index_file:
+        index_file.write(INDEX_HEADER.pack(INDEX_MAGIC, len(offsets), LIST_COUNT))
+        _write_array(index_file, offsets)
+        for posting in postings:
+            index_file.write(POSTING.pack(position, len(posting)))
+            position += 4 * len(posting)
+        for posting in postings:
+            _write_array(index_file, posting)
+    os.replace(tmp_path, index_path)
+
+    return len(offsets)
+
+
+class PatternIndex:
+    """Memory-mapped queries of a pattern index built by `build_pattern_index`."""
+
+    def __init__(self, csv_path: Union[str, Path], index_path: Union[str, Path]) -> None:
+        self.csv_path = Path(csv_path)
+        with open(index_path, 'rb') as index_file:
+            self._map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count, list_count = INDEX_HEADER.unpack_from(self._map)
+        if magic != INDEX_MAGIC or list_count != LIST_COUNT:
+            self._map.close()
+            raise SudokuError(f'{index_path} is not a pattern index.')
+        self._directory = INDEX_HEADER.size + 8 * self._count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _posting(self, posting: int) -> Union[memoryview, array]:
+        start, length = POSTING.unpack_from(self._map, self._directory + posting * POSTING.size)
+        view = memoryview(self._map)[start : start + 4 * length].cast('I')
+        if sys.byteorder == 'big':  # the index is little-endian, so the list is read into a swapped copy
+            values = array('I', view)
+            values.byteswap()
+            view.release()
+            return values
+        return view
+
+    def _posting_lists(self, clues: Optional[int], symmetry: Optional[str], patterns: Dict[str, int]) -> List[int]:
+        lists = []
+        if clues is not None:
+            if not 0 <= clues <= CELL_COUNT:
+                raise SudokuError(f'A quiz has from 0 to {CELL_COUNT} clues.')
+            lists.append(_clues_list(clues))
+        if symmetry is not None:
+            if symmetry not in SYMMETRIES:
+                raise SudokuError(f"Unknown symmetry. Choose one of: {', '.join(SYMMETRIES)}.")
+            lists.append(_symmetry_list(symmetry))
+        for unit_name, mask in patterns.items():
+            unit = UNIT_NUMBERS.get(unit_name.upper())
+            if unit is None:
+                raise SudokuError(f'Unknown unit {unit_name}. Units are rows A-I, columns 1-9 and box1-box9.')
+            if not 0 <= mask < PATTERNS_PER_UNIT:
+                raise SudokuError(f'A pattern is a mask of the {GRID_SIZE} cells of a unit.')
+            lists.append(_pattern_list(unit, mask))
+        return lists
+
+    def query(
+        self,
+        clues: Optional[int] = None,
+        symmetry: Optional[str] = None,
+        empty: Iterable[str] = (),
+        patterns: Optional[Dict[str, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[int]:
+        """Returns the numbers (in dataset order) of the puzzles that match every condition given, at most `limit`.
+
+        `clues` is the number of givens, `symmetry` one of `SYMMETRIES`, `empty` names units (such as 'A', '5' or
+        'box9') with no givens, and `patterns` maps unit names to the mask of the cells given in them.
+        """
+        lists = self._posting_lists(clues, symmetry, {**{unit: 0 for unit in empty}, **(patterns or {})})
+        if limit is None:
+            limit = self._count
+        if not lists:
+            return list(range(min(limit, self._count)))
+
+        views = sorted((self._posting(posting) for posting in set(lists)), key=len)
+        try:
+            shortest, others = views[0], views[1:]
+            starts = [0] * len(others)  # the lists are sorted, so each search starts where the last one stopped
+            found: List[int] = []
+            for number in shortest:
+                for position, other in enumerate(others):
+                    start = bisect_left(other, number, starts[position])
+                    starts[position] = start
+                    if start == len(other) or other[start] != number:
+                        break
+                else:
+                    found.append(number)
+                    if len(found) == limit:
+                        break
+            return found
+        finally:
+            for view in views:
+                if isinstance(view, memoryview):
+                    view.release()
+
+    def offset(self, number: int) -> int:
+        """Returns the byte offset of the line of puzzle `number` in the dataset."""
+        if not 0 <= number < self._count:
+            raise IndexError('puzzle number out of range')
+        return struct.unpack_from('<Q', self._map, INDEX_HEADER.size + 8 * number)[0]
+
+    def read_puzzles(self, numbers: Iterable[int]) -> Iterator[Tuple[str, str]]:
+        """Yields the (quiz, solution) pairs of the puzzles `numbers`, read from the dataset at their offsets.
+        The solution is empty for quizzes that come without one.
+        """
+        with open(self.csv_path, 'rb') as dataset:
+            for number in numbers:
+                dataset.seek(self.offset(number))
+                quiz, _, solution = dataset.readline().decode('ascii').strip().partition(',')
+                yield (quiz, solution)
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> 'PatternIndex':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def open_pattern_index(csv_path: Union[str, Path]) -> PatternIndex:
+    """Opens the pattern index of the `csv_path` dataset, indexing the dataset first if it has changed since."""
+    index_path = pattern_index_path_for(csv_path)
+    if not index_path.exists() or index_path.stat().st_mtime < Path(csv_path).stat().st_mtime:
+        build_pattern_index(csv_path)
+    return PatternIndex(csv_path, index_path)
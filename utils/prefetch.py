@@ -0,0 +1,116 @@
+"""Work done on background threads while the player reads or thinks, so that it's ready when they ask for it.
+
+`Prefetcher` loads the next game (reading the puzzle, parsing it and setting the game up) ahead of time, and
+starts on the one after as soon as it is taken. `ThinkTimeWorker` works out the next hint of the current game
+after every move, while the game waits for the player's next command.
+
+The game is only ever touched by one thread at a time: the game loop changes it inside `ThinkTimeWorker.updating`,
+which holds the worker's lock and bumps its version, and the worker holds the same lock while it works. The version
+tells the worker whether the game has changed since it last worked on it.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Generic, Iterator, Optional, TypeVar
+
+if TYPE_CHECKING:
+    from sudoku import Game
+
+T = TypeVar('T')
+
+
+class Prefetcher(Generic[T]):
+    """Calls `load` on a background thread, so that its result is ready by the time it's taken."""
+
+    def __init__(self, load: Callable[[], T]) -> None:
+        self._load = load
+        self._ready = threading.Event()
+        self._result: Optional[T] = None
+        self._error: Optional[Exception] = None
+        self._start()
+
+    def _start(self) -> None:
+        self._ready.clear()
+        self._result, self._error = None, None
+        threading.Thread(target=self._run, name='prefetch', daemon=True).start()
+
+    def _run(self) -> None:
+        try:
+            self._result = self._load()
+        except Exception as e:  # raised again in the thread that takes the result
+            self._error = e
+        finally:
+            self._ready.set()
+
+    def take(self) -> T:
+        """Returns the loaded result, waiting for it if it isn't ready yet, and starts loading the next one.
+        Raises the error that loading raised, if it did.
+        """
+        self._ready.wait()
+        result, error = self._result, self._error
+        self._start()
+        if error is not None:
+            raise error
+        return result  # type: ignore[return-value]
+
+
+class ThinkTimeWorker:
+    """Works out the next hint of a game on a background thread, whenever the game changes.
+    The hint engine remembers the hint, so the game's next `hint` returns it straight away.
+    """
+
+    def __init__(self, game: 'Game') -> None:
+        self.game = game
+        self.lock = threading.Lock()
+        self.version = 0  # bumped every time the game changes
+        self._done_version = -1  # the version the worker last worked on
+        self._error: Optional[Exception] = None  # what went wrong in the background, until it's reported
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='think-time', daemon=True)
+        self._thread.start()
+        self._wake.set()
+
+    @contextmanager
+    def updating(self) -> Iterator[None]:
+        """Holds the game for the caller to change (or replace, by setting `game`), and has the worker catch up
+        once it is released.
+        """
+        with self.lock:
+            try:
+                yield
+            finally:
+                self.version += 1
+        self._wake.set()
+
+    def take_error(self) -> Optional[Exception]:
+        """Returns the error that working out a hint in the background raised since the last call, if one did.
+        Hints are only worked out ahead to save time, so the game carries on, and works the hint out when asked.
+        """
+        with self.lock:
+            error, self._error = self._error, None
+        return error
+
+    def is_current(self) -> bool:
+        """Returns True if the worker has worked on the game since it last changed."""
+        with self.lock:
+            return self._done_version == self.version
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._stopped:
+                return
+            with self.lock:
+                if self._done_version != self.version:
+                    try:
+                        self.game.hints.next_hint()
+                    except Exception as e:  # reported by take_error
+                        self._error = e
+                    self._done_version = self.version
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wake.set()
+        self._thread.join()
@@ -0,0 +1,122 @@
+"""A fixed-width, memory-mapped store of Sudoku puzzles and their solutions.
+
+The store is built once from the `quizzes,solutions` CSV dataset. Each record holds the 81-character quiz followed by
+the 81-character solution, so any puzzle can be read by index without loading the rest of the dataset.
+Quizzes without a solution are stored with an all-zero solution, and read back with an empty one.
+"""
+
+import mmap
+import os
+import random
+import struct
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+from utils.dataset import iter_lines
+from utils.sudoku_utils import SudokuError
+
+STORE_MAGIC = b'SDKSTORE'
+STORE_VERSION = 1
+GRID_LENGTH = 81
+RECORD_SIZE = 2 * GRID_LENGTH
+UNSOLVED = '0' * GRID_LENGTH
+
+# magic, version, record size, number of records
+HEADER = struct.Struct('<8sIIQ')
+
+
+def store_path_for(csv_path: Union[str, Path]) -> Path:
+    """Returns the location of the puzzle store that belongs to the `csv_path` dataset."""
+    return Path(csv_path).with_suffix('.store')
+
+
+def build_store(csv_path: Union[str, Path], store_path: Union[str, Path]) -> int:
+    """Builds a puzzle store at `store_path` from the `csv_path` dataset, and returns the number of puzzles stored.
+
+    The dataset (which may be gzipped) is streamed line by line, and the store is written to a temporary file first,
+    so readers never see a half-built store.
+    """
+    store_path = Path(store_path)
+    tmp_path = store_path.with_name(f'{store_path.name}.{os.getpid()}.tmp')
+    count = 0
+
+    with open(tmp_path, 'wb') as store:
+        store.write(HEADER.pack(STORE_MAGIC, STORE_VERSION, RECORD_SIZE, 0))
+
+        for line_number, line in iter_lines(csv_path):
+            quiz, _, solution = line.partition(',')
+            solution = solution or UNSOLVED
+            if len(quiz) != GRID_LENGTH or len(solution) != GRID_LENGTH:
+                os.remove(tmp_path)
+                raise SudokuError(f'Line {line_number} of {csv_path} is not a valid quiz and solution pair.')
+            store.write(quiz.encode('ascii'))
+            store.write(solution.encode('ascii'))
+            count += 1
+
+        # go back and record how many puzzles were written
+        store.seek(0)
+        store.write(HEADER.pack(STORE_MAGIC, STORE_VERSION, RECORD_SIZE, count))
+
+    os.replace(tmp_path, store_path)
+    return count
+
+
+class PuzzleStore:
+    """Read-only, memory-mapped access to a puzzle store built by `build_store`."""
+
+    def __init__(self, store_path: Union[str, Path]) -> None:
+        self._file = open(store_path, 'rb')
+        try:
+            header = self._file.read(HEADER.size)
+            if len(header) != HEADER.size:
+                raise SudokuError(f'{store_path} is not a puzzle store.')
+            magic, version, record_size, count = HEADER.unpack(header)
+            if magic != STORE_MAGIC or version != STORE_VERSION or record_size != RECORD_SIZE:
+                raise SudokuError(f'{store_path} is not a puzzle store.')
+            self._count = count
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> Tuple[str, str]:
+        """Returns the (quiz, solution) pair stored at `index`."""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('puzzle index out of range')
+
+        start = HEADER.size + index * RECORD_SIZE
+        record = self._map[start : start + RECORD_SIZE].decode('ascii')
+        solution = record[GRID_LENGTH:]
+        return (record[:GRID_LENGTH], '' if solution == UNSOLVED else solution)
+
+    def random_puzzle(self, rng: Optional[random.Random] = None) -> Tuple[str, str]:
+        """Returns a random (quiz, solution) pair, reading only that one record."""
+        if not self._count:
+            raise SudokuError('The puzzle dataset is empty.')
+        return self[(rng or random).randrange(self._count)]
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> 'PuzzleStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def open_store(csv_path: Union[str, Path]) -> PuzzleStore:
+    """Opens the puzzle store for the `csv_path` dataset.
+
+    The store is (re)built first if it does not exist yet, or if the dataset has changed since it was built.
+    """
+    store_path = store_path_for(csv_path)
+    if not store_path.exists() or store_path.stat().st_mtime < Path(csv_path).stat().st_mtime:
+        build_store(csv_path, store_path)
+    return PuzzleStore(store_path)
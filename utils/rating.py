@@ -0,0 +1,360 @@
+"""Rates how difficult Sudoku puzzles are, and keeps an index of the ratings of a whole dataset.
+
+A puzzle is rated by the hardest human technique needed to solve it, applying the simplest technique that makes
+progress at every step. Puzzles that the techniques can't finish need guessing, and are rated by the number of
+search nodes the solver took as well.
+"""
+
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from collections import deque
+from itertools import combinations
+from pathlib import Path
+from typing import TYPE_CHECKING, Deque, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from utils.dataset import chunked
+from utils.geometry import ALL_NUMBERS, BIT_COUNT, BOX_OF, BOXES, CELL_COUNT, COL_OF, COLS, PEERS, ROW_OF, ROWS, UNITS
+from utils.parallel import map_chunks
+from utils.puzzle_store import open_store, store_path_for
+from utils.solver import solve
+from utils.sudoku_utils import SudokuError, build_grid
+
+if TYPE_CHECKING:
+    from utils.result_cache import ResultCache
+
+# the techniques, from the simplest to the hardest
+TECHNIQUES = (
+    'naked single',
+    'hidden single',
+    'locked candidates',
+    'naked pair',
+    'hidden pair',
+    'x-wing',
+    'search',
+)
+
+# the difficulty of a puzzle, by the hardest technique it needs
+DIFFICULTIES = ('easy', 'medium', 'hard', 'expert')
+DIFFICULTY_OF_TECHNIQUE = {
+    'naked single': 'easy',
+    'hidden single': 'easy',
+    'locked candidates': 'medium',
+    'naked pair': 'medium',
+    'hidden pair': 'medium',
+    'x-wing': 'hard',
+    'search': 'expert',
+}
+
+
+class Rating(NamedTuple):
+    """How difficult a puzzle is."""
+
+    difficulty: str
+    technique: str  # the hardest technique needed
+    steps: int  # how many times a technique was applied
+    nodes: int  # the search nodes needed once the techniques ran out
+
+
+class _Candidates:
+    """The candidate bitmask of every cell of a grid being solved by hand."""
+
+    def __init__(self, grid: List[List[str]]) -> None:
+        self.values = [0] * CELL_COUNT
+        self.cands = [ALL_NUMBERS] * CELL_COUNT
+        for cell in range(CELL_COUNT):
+            number = grid[ROW_OF[cell]][COL_OF[cell]]
+            if number != ' ':
+                if not self.cands[cell] & (1 << int(number)):
+                    raise SudokuError('The numbers given in this puzzle repeat.')
+                self.place(cell, 1 << int(number))
+
+    def place(self, cell: int, bit: int) -> None:
+        self.values[cell] = bit
+        self.cands[cell] = 0
+        for peer in PEERS[cell]:
+            self.cands[peer] &= ~bit
+
+    def eliminate(self, cells: Iterator[int], bits: int) -> bool:
+        """Removes the `bits` from the candidates of the `cells`, and returns True if anything was removed."""
+        changed = False
+        for cell in cells:
+            if self.cands[cell] & bits:
+                self.cands[cell] &= ~bits
+                changed = True
+        return changed
+
+    def is_solved(self) -> bool:
+        return all(self.values)
+
+    def is_broken(self) -> bool:
+        return any(not value and not cands for value, cands in zip(self.values, self.cands))
+
+    def naked_single(self) -> bool:
+        for cell in range(CELL_COUNT):
+            if not self.values[cell] and BIT_COUNT[self.cands[cell]] == 1:
+                self.place(cell, self.cands[cell])
+                return True
+        return False
+
+    def hidden_single(self) -> bool:
+        for unit in UNITS:
+            for number in range(1, 10):
+                bit = 1 << number
+                cells = [cell for cell in unit if self.cands[cell] & bit]
+                if len(cells) == 1:
+                    self.place(cells[0], bit)
+                    return True
+        return False
+
+    def locked_candidates(self) -> bool:
+        for number in range(1, 10):
+            bit = 1 << number
+            # pointing: the number is confined to one row or column of a sub-grid
+            for box in BOXES:
+                cells = [cell for cell in box if self.cands[cell] & bit]
+                if not cells:
+                    continue
+                for line_of, lines in ((ROW_OF, ROWS), (COL_OF, COLS)):
+                    if len({line_of[cell] for cell in cells}) == 1:
+                        line = lines[line_of[cells[0]]]
+                        if self.eliminate((cell for cell in line if cell not in box), bit):
+                            return True
+            # claiming: the number is confined to one sub-grid of a row or column
+            for line in ROWS + COLS:
+                cells = [cell for cell in line if self.cands[cell] & bit]
+                if cells and len({BOX_OF[cell] for cell in cells}) == 1:
+                    box = BOXES[BOX_OF[cells[0]]]
+                    if self.eliminate((cell for cell in box if cell not in line), bit):
+                        return True
+        return False
+
+    def naked_pair(self) -> bool:
+        for unit in UNITS:
+            pairs = [cell for cell in unit if BIT_COUNT[self.cands[cell]] == 2]
+            for first, second in combinations(pairs, 2):
+                bits = self.cands[first]
+                if self.cands[second] == bits:
+                    if self.eliminate((cell for cell in unit if cell not in (first, second)), bits):
+                        return True
+        return False
+
+    def hidden_pair(self) -> bool:
+        for unit in UNITS:
+            places = {}
+            for number in range(1, 10):
+                cells = tuple(cell for cell in unit if self.cands[cell] & (1 << number))
+                if len(cells) == 2:
+                    places.setdefault(cells, []).append(number)
+            for cells, numbers in places.items():
+                if len(numbers) == 2:
+                    bits = (1 << numbers[0]) | (1 << numbers[1])
+                    if self.eliminate(iter(cells), ALL_NUMBERS & ~bits):
+                        return True
+        return False
+
+    def x_wing(self) -> bool:
+        for number in range(1, 10):
+            bit = 1 << number
+            for lines, cross_lines, position_of in ((ROWS, COLS, COL_OF), (COLS, ROWS, ROW_OF)):
+                # the lines where the number has exactly two places, by those two positions
+                by_positions = {}
+                for line in lines:
+                    cells = [cell for cell in line if self.cands[cell] & bit]
+                    if len(cells) == 2:
+                        by_positions.setdefault((position_of[cells[0]], position_of[cells[1]]), []).append(line)
+                for positions, matching in by_positions.items():
+                    if len(matching) == 2:
+                        wing = set(matching[0]) | set(matching[1])
+                        for position in positions:
+                            cross_line = cross_lines[position]
+                            if self.eliminate((cell for cell in cross_line if cell not in wing), bit):
+                                return True
+        return False
+
+
+def rate(grid: List[List[str]]) -> Rating:
+    """Returns the rating of the puzzle in the `grid`."""
+    candidates = _Candidates(grid)
+    techniques = (
+        candidates.naked_single,
+        candidates.hidden_single,
+        candidates.locked_candidates,
+        candidates.naked_pair,
+        candidates.hidden_pair,
+        candidates.x_wing,
+    )
+    hardest = 0
+    steps = 0
+
+    while not candidates.is_solved():
+        if candidates.is_broken():
+            raise SudokuError('This puzzle has no solution.')
+        for level, technique in enumerate(techniques):
+            if technique():
+                hardest = max(hardest, level)
+                steps += 1
+                break
+        else:  # the techniques ran out, so the rest needs guessing
+            result = solve(grid)
+            if result.solution is None:
+                raise SudokuError('This puzzle has no solution.')
+            return Rating(DIFFICULTY_OF_TECHNIQUE['search'], 'search', steps, result.nodes)
+
+    technique = TECHNIQUES[hardest]
+    return Rating(DIFFICULTY_OF_TECHNIQUE[technique], technique, steps, 0)
+
+
+# the byte that `rate_quizzes` gives a quiz that can't be rated
+UNRATED = 255
+
+
+class RatingReport(NamedTuple):
+    """The outcome of rating a dataset."""
+
+    counts: List[int]  # the number of puzzles of each difficulty
+    unrated: List[int]  # the numbers (in the order of the puzzle store) of the puzzles that have no solution
+
+
+def _difficulty_level(quiz: str) -> int:
+    try:
+        return DIFFICULTIES.index(rate(build_grid(quiz)).difficulty)
+    except SudokuError:
+        return UNRATED
+
+
+def rate_quizzes(quizzes: List[str]) -> bytes:
+    """Returns the difficulty (its index in `DIFFICULTIES`) of each of the `quizzes`, one byte per quiz.
+    Quizzes that have no solution get `UNRATED`.
+    """
+    return bytes(_difficulty_level(quiz) for quiz in quizzes)
+
+
+INDEX_MAGIC = b'SDKRATE1'
+# magic, number of puzzles, then the start and length of the posting list of each difficulty
+INDEX_HEADER = struct.Struct('<8sQ' + 'QQ' * len(DIFFICULTIES))
+
+
+def rating_index_path_for(csv_path: Union[str, Path]) -> Path:
+    """Returns the location of the rating index that belongs to the `csv_path` dataset."""
+    return Path(csv_path).with_suffix('.ratings')
+
+
+def build_rating_index(
+    csv_path: Union[str, Path],
+    workers: Optional[int] = None,
+    chunk_size: int = 2_000,
+    cache: Optional['ResultCache'] = None,
+) -> RatingReport:
+    """Rates every puzzle of the dataset on `workers` processes, and writes the rating index next to it.
+    Returns the number of puzzles of each difficulty, and the puzzles that were left out because they have no
+    solution. Difficulties found in the `cache` are used as they are, and the ones worked out are added to it.
+
+    The index holds one posting list of puzzle numbers (in the order of the puzzle store) per difficulty.
+    """
+    # every chunk in flight, with the difficulties that were cached (None for the ones the workers work out)
+    chunks: Deque[Tuple[List[str], List[Optional[int]]]] = deque()
+
+    def remember(chunk: List[str]) -> List[str]:
+        cached: List[Optional[int]] = [None] * len(chunk)
+        if cache is not None:
+            for position, quiz in enumerate(chunk):
+                facts = cache.get(quiz)
+                if facts is not None and facts.difficulty is not None:
+                    cached[position] = DIFFICULTIES.index(facts.difficulty) if facts.difficulty else UNRATED
+        chunks.append((chunk, cached))
+        return [quiz for quiz, level in zip(chunk, cached) if level is None]
+
+    with open_store(csv_path) as store:
+        count = len(store)
+
+        quizzes = (store[index][0] for index in range(count))
+        postings = [array('I') for _ in DIFFICULTIES]
+        unrated: List[int] = []
+        start = 0
+        for rated in map_chunks(rate_quizzes, (remember(chunk) for chunk in chunked(quizzes, chunk_size)), workers):
+            chunk, cached = chunks.popleft()
+            if cache is not None:
+                from utils.result_cache import PuzzleFacts
+
+                new_quizzes = (quiz for quiz, level in zip(chunk, cached) if level is None)
+                for quiz, level in zip(new_quizzes, rated):
+                    cache.put(quiz, PuzzleFacts(difficulty=DIFFICULTIES[level] if level != UNRATED else ''))
+            new_levels = iter(rated)
+            ratings = [level if level is not None else next(new_levels) for level in cached]
+            for offset, difficulty in enumerate(ratings):
+                if difficulty == UNRATED:
+                    unrated.append(start + offset)
+                else:
+                    postings[difficulty].append(start + offset)
+            start += len(ratings)
+
+    index_path = rating_index_path_for(csv_path)
+    tmp_path = index_path.with_name(f'{index_path.name}.{os.getpid()}.tmp')
+    header_fields: List[int] = []
+    position = INDEX_HEADER.size
+    for posting in postings:
+        header_fields += [position, len(posting)]
+        position += 4 * len(posting)
+
+    with open(tmp_path, 'wb') as index_file:
+        index_file.write(INDEX_HEADER.pack(INDEX_MAGIC, count, *header_fields))
+        for posting in postings:
+            if sys.byteorder == 'big':  # the index is little-endian
+                posting.byteswap()
+            index_file.write(posting.tobytes())
+    os.replace(tmp_path, index_path)
+
+    return RatingReport([len(posting) for posting in postings], unrated)
+
+
+class RatingIndex:
+    """Memory-mapped access to a rating index built by `build_rating_index`."""
+
+    def __init__(self, index_path: Union[str, Path]) -> None:
+        with open(index_path, 'rb') as index_file:
+            self._map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        fields = INDEX_HEADER.unpack_from(self._map)
+        if fields[0] != INDEX_MAGIC:
+            self._map.close()
+            raise SudokuError(f'{index_path} is not a rating index.')
+        self.count = fields[1]
+        self._postings = {
+            difficulty: (fields[2 + 2 * level], fields[3 + 2 * level]) for level, difficulty in enumerate(DIFFICULTIES)
+        }
+
+    def puzzle_count(self, difficulty: str) -> int:
+        """Returns the number of puzzles of the `difficulty`."""
+        return self._postings[difficulty][1]
+
+    def random_puzzle_number(self, difficulty: str, rng: Optional[random.Random] = None) -> int:
+        """Returns the number of a random puzzle of the `difficulty`, in the order of the puzzle store."""
+        if difficulty not in self._postings:
+            raise SudokuError(f"Unknown difficulty. Choose one of: {', '.join(DIFFICULTIES)}.")
+        start, length = self._postings[difficulty]
+        if not length:
+            raise SudokuError(f'There are no {difficulty} puzzles in this dataset.')
+        return struct.unpack_from('<I', self._map, start + 4 * (rng or random).randrange(length))[0]
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> 'RatingIndex':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def open_rating_index(csv_path: Union[str, Path]) -> RatingIndex:
+    """Opens the rating index of the `csv_path` dataset, rating the dataset first if it hasn't been rated
+    since the puzzle store was last built.
+    """
+    index_path = rating_index_path_for(csv_path)
+    open_store(csv_path).close()  # makes sure the puzzle store is up to date
+    if not index_path.exists() or index_path.stat().st_mtime < store_path_for(csv_path).stat().st_mtime:
+        build_rating_index(csv_path)
+    return RatingIndex(index_path)
@@ -0,0 +1,100 @@
+"""Incremental drawing of the game UI on the terminal"""
+
+import os
+import sys
+from functools import lru_cache
+from typing import List, Optional, TextIO
+
+from rich.console import Console
+
+CLEAR_SCREEN = '\x1b[2J\x1b[H'
+CLEAR_TO_END_OF_LINE = '\x1b[K'
+CLEAR_TO_END_OF_SCREEN = '\x1b[J'
+# the lines the game's prompt takes up below a frame
+PROMPT_LINES = 2
+
+STD_OUTPUT_HANDLE = -11
+ENABLE_VIRTUAL_TERMINAL_PROCESSING = 0x0004
+
+
+@lru_cache(maxsize=None)
+def enable_escape_codes() -> bool:
+    """Returns True if the terminal acts on escape codes, turning that on first for a Windows console."""
+    if os.name != 'nt':
+        return True
+    import ctypes
+
+    kernel32 = ctypes.windll.kernel32  # type: ignore[attr-defined]
+    handle = kernel32.GetStdHandle(STD_OUTPUT_HANDLE)
+    mode = ctypes.c_uint32()
+    if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+        return False
+    if mode.value & ENABLE_VIRTUAL_TERMINAL_PROCESSING:
+        return True
+    return bool(kernel32.SetConsoleMode(handle, mode.value | ENABLE_VIRTUAL_TERMINAL_PROCESSING))
+
+
+def move_cursor(line: int) -> str:
+    """Returns the escape code that moves the cursor to the start of the (0-based) `line` of the screen."""
+    return f'\x1b[{line + 1};1H'
+
+
+class TerminalRenderer:
+    """Draws frames at the top of the terminal, rewriting only the lines that changed since the previous frame.
+
+    The first frame clears the screen. After every frame, the cursor is left on the line below it,
+    with the rest of the screen cleared, ready for the next prompt. A frame that doesn't fit on the screen
+    together with the `prompt_lines` below it would scroll the screen, leaving the lines out of place for the
+    next frame, so it is drawn in full on a cleared screen instead. On a console that escape codes can't be
+    turned on for, every frame is drawn in full on a screen cleared with `cls`.
+    """
+
+    def __init__(
+        self, stream: Optional[TextIO] = None, console: Optional[Console] = None, prompt_lines: int = PROMPT_LINES
+    ) -> None:
+        self._stream = stream or sys.stdout
+        self._console = console or Console()
+        self._prompt_lines = prompt_lines
+        self._lines: Optional[List[str]] = None
+        self._escape_codes = stream is not None or enable_escape_codes()
+
+    def render(self, renderable) -> List[str]:
+        """Returns the lines (with styling escape codes) that the `renderable` is printed as."""
+        with self._console.capture() as capture:
+            self._console.print(renderable)
+        return capture.get().rstrip('\n').split('\n')
+
+    def draw(self, renderable) -> None:
+        """Draws the `renderable` over the previous frame."""
+        lines = self.render(renderable)
+        if not self._escape_codes:
+            os.system('cls')
+            self._stream.write('\n'.join(lines) + '\n')
+            self._stream.flush()
+            return
+        if len(lines) + self._prompt_lines > self._console.size.height:
+            self._stream.write(CLEAR_SCREEN + '\n'.join(lines) + '\n')
+            self._stream.flush()
+            self._lines = None  # the screen has scrolled, so the next frame is drawn in full too
+            return
+        previous = self._lines
+        output = []
+
+        if previous is None:
+            output.append(CLEAR_SCREEN)
+            output.append('\n'.join(lines))
+        else:
+            for index, line in enumerate(lines):
+                if index >= len(previous) or previous[index] != line:
+                    output.append(f'{move_cursor(index)}{line}{CLEAR_TO_END_OF_LINE}')
+
+        # park the cursor below the frame, wiping the old prompt and anything left of a taller frame
+        output.append(f'{move_cursor(len(lines))}{CLEAR_TO_END_OF_SCREEN}')
+
+        self._stream.write(''.join(output))
+        self._stream.flush()
+        self._lines = lines
+
+    def reset(self) -> None:
+        """Forgets the previous frame, so that the next one is drawn on a cleared screen."""
+        self._lines = None
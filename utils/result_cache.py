@@ -0,0 +1,308 @@
+"""A two-tier cache of what has been worked out about puzzles: their solution, how many solutions they have, their
+difficulty and the candidates of their unfilled cells.
+
+Results are keyed by a 64-bit hash of the quiz. The first tier is a bounded LRU in the process. The second is an
+append-only file of fixed-size records that any number of processes can read while one of them appends, with a
+sorted index of the keys beside it. A reader finds a key through the index, and through the records appended since
+the index was written, which it scans once. The last record of a key wins, so a result is updated by appending it
+again.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from hashlib import blake2b
+from pathlib import Path
+from typing import BinaryIO, Dict, NamedTuple, Optional, Tuple, Union
+
+from utils.rating import DIFFICULTIES
+from utils.sudoku_utils import SudokuError
+
+GRID_LENGTH = 81
+KEY_SIZE = 8  # bytes
+
+STORE_MAGIC = b'SDKCACHE'
+STORE_HEADER = struct.Struct('<8sI')  # magic, record size
+# key, flags of the fields that are known, solution, number of solutions, difficulty, search nodes, candidates
+RECORD = struct.Struct(f'<QB{GRID_LENGTH}sBBI{GRID_LENGTH}H')
+HAS_SOLUTION, HAS_SOLUTION_COUNT, HAS_DIFFICULTY, HAS_NODES, HAS_CANDIDATES = 1, 2, 4, 8, 16
+
+INDEX_MAGIC = b'SDKCIDX1'
+INDEX_HEADER = struct.Struct('<8sQQ')  # magic, number of records covered, number of keys
+
+# how many of the most recently used results the first tier keeps by default
+DEFAULT_CAPACITY = 4096
+
+
+class PuzzleFacts(NamedTuple):
+    """What is known about a quiz. A field is None until it has been worked out."""
+
+    solution: Optional[str] = None  # 81 digits, or an empty string if there is no solution
+    solution_count: Optional[int] = None  # 0, 1, or 2 for two or more
+    difficulty: Optional[str] = None  # one of `DIFFICULTIES`, or an empty string if there is no solution
+    nodes: Optional[int] = None  # the search nodes the solver took
+    candidates: Optional[Tuple[int, ...]] = None  # the candidate bitmask of each unfilled cell, 0 for given cells
+
+    def merge(self, newer: 'PuzzleFacts') -> 'PuzzleFacts':
+        """Returns these facts, updated with every field that is known in the `newer` facts."""
+        return PuzzleFacts(*(new if new is not None else old for old, new in zip(self, newer)))
+
+
+class CacheStats(NamedTuple):
+    hits: int  # found in the first tier
+    disk_hits: int  # found in the second tier
+    misses: int
+    evictions: int  # dropped from the first tier to make room
+
+
+def quiz_key(quiz: str) -> int:
+    """Returns the 64-bit cache key of the 81-digit `quiz`."""
+    return int.from_bytes(blake2b(quiz.encode('ascii'), digest_size=KEY_SIZE).digest(), 'little')
+
+
+def _pack(key: int, facts: PuzzleFacts) -> bytes:
+    flags = (
+        (HAS_SOLUTION if facts.solution is not None else 0)
+        | (HAS_SOLUTION_COUNT if facts.solution_count is not None else 0)
+        | (HAS_DIFFICULTY if facts.difficulty is not None else 0)
+        | (HAS_NODES if facts.nodes is not None else 0)
+        | (HAS_CANDIDATES if facts.candidates is not None else 0)
+    )
+    if facts.difficulty:
+        difficulty = DIFFICULTIES.index(facts.difficulty)
+    else:
+        difficulty = len(DIFFICULTIES)  # no solution, so no difficulty
+    return RECORD.pack(
+        key,
+        flags,
+        (facts.solution or '').encode('ascii'),
+        facts.solution_count or 0,
+        difficulty,
+        facts.nodes or 0,
+        *(facts.candidates or (0,) * GRID_LENGTH),
+    )
+
+
+def _unpack(record: bytes) -> PuzzleFacts:
+    _, flags, solution, solution_count, difficulty, nodes, *candidates = RECORD.unpack(record)
+    if flags & HAS_DIFFICULTY:
+        difficulty_name: Optional[str] = DIFFICULTIES[difficulty] if difficulty < len(DIFFICULTIES) else ''
+    else:
+        difficulty_name = None
+    return PuzzleFacts(
+        solution=solution.rstrip(b'\0').decode('ascii') if flags & HAS_SOLUTION else None,
+        solution_count=solution_count if flags & HAS_SOLUTION_COUNT else None,
+        difficulty=difficulty_name,
+        nodes=nodes if flags & HAS_NODES else None,
+        candidates=tuple(candidates) if flags & HAS_CANDIDATES else None,
+    )
+
+
+def index_path_for(store_path: Union[str, Path]) -> Path:
+    store_path = Path(store_path)
+    return store_path.with_name(f'{store_path.name}.idx')
+
+
+def _write_array(index_file: BinaryIO, values: array) -> None:
+    if sys.byteorder == 'big':  # the index is little-endian
+        values.byteswap()
+    index_file.write(values.tobytes())
+
+
+def _swapped(view: memoryview) -> array:
+    """Returns a byte-swapped copy of the `view`, releasing it."""
+    values = array(view.format, view)
+    values.byteswap()
+    view.release()
+    return values
+
+
+class ResultStore:
+    """The on-disk tier: an append-only file of results, and the sorted index of its keys."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self._create()
+
+        self._reader = open(self.path, 'rb')
+        magic, record_size = STORE_HEADER.unpack(self._reader.read(STORE_HEADER.size))
+        if magic != STORE_MAGIC or record_size != RECORD.size:
+            self._reader.close()
+            raise SudokuError(f'{self.path} is not a result store.')
+        # appends go to the end of the file, whoever else has appended since
+        self._appender = open(self.path, 'ab', buffering=0)
+
+        self._index_map: Optional[mmap.mmap] = None
+        self._index_keys: Union[memoryview, array, Tuple[int, ...]] = ()
+        self._index_records: Union[memoryview, array, Tuple[int, ...]] = ()
+        self._scanned = 0  # the records that are either in the index or in `_tail`
+        self._tail: Dict[int, int] = {}  # the record number of each key appended after the index was written
+        self._open_index()
+
+    def _create(self) -> None:
+        """Makes sure the store file exists and starts with its header, whoever else is opening it at the time."""
+        header = STORE_HEADER.pack(STORE_MAGIC, RECORD.size)
+        if not self.path.exists():
+            # the header is written before the file takes its name, so no one sees the file without it
+            tmp_path = self.path.with_name(f'{self.path.name}.{os.getpid()}.tmp')
+            tmp_path.write_bytes(header)
+            try:
+                os.link(tmp_path, self.path)  # unlike a rename, this never replaces a store someone else made
+            except FileExistsError:
+                pass
+            finally:
+                os.remove(tmp_path)
+            return
+
+        with open(self.path, 'r+b') as store_file:
+            if os.fstat(store_file.fileno()).st_size == 0:
+                # an empty file only needs its header, and everyone writes the same bytes to the same place
+                store_file.seek(0)
+                store_file.write(header)
+
+    def _open_index(self) -> None:
+        index_path = index_path_for(self.path)
+        try:
+            with open(index_path, 'rb') as index_file:
+                index_map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):  # no index yet, or an empty file
+            return
+        magic, covered, count = INDEX_HEADER.unpack_from(index_map)
+        if magic != INDEX_MAGIC:
+            index_map.close()
+            return
+        view = memoryview(index_map)
+        keys_end = INDEX_HEADER.size + 8 * count
+        self._index_map = index_map
+        self._index_keys = view[INDEX_HEADER.size : keys_end].cast('Q')
+        self._index_records = view[keys_end : keys_end + 8 * count].cast('Q')
+        if sys.byteorder == 'big':  # the index is little-endian, so it is read into swapped copies
+            self._index_keys, self._index_records = _swapped(self._index_keys), _swapped(self._index_records)
+        self._scanned = covered
+
+    def _scan_new_records(self) -> None:
+        """Takes in the keys of the records appended since the last scan."""
+        size = os.fstat(self._reader.fileno()).st_size
+        count = (size - STORE_HEADER.size) // RECORD.size  # a record still being appended isn't counted
+        if count <= self._scanned:
+            return
+        self._reader.seek(STORE_HEADER.size + self._scanned * RECORD.size)
+        data = self._reader.read((count - self._scanned) * RECORD.size)
+        for offset in range(0, len(data), RECORD.size):
+            self._tail[int.from_bytes(data[offset : offset + KEY_SIZE], 'little')] = self._scanned
+            self._scanned += 1
+
+    def _record_number(self, key: int) -> Optional[int]:
+        if key in self._tail:
+            return self._tail[key]
+        position = bisect_left(self._index_keys, key)
+        if position < len(self._index_keys) and self._index_keys[position] == key:
+            return self._index_records[position]
+        return None
+
+    def get(self, key: int) -> Optional[PuzzleFacts]:
+        """Returns the latest facts stored for the `key`, or None if there are none."""
+        self._scan_new_records()  # a newer record of the key may have been appended
+        record_number = self._record_number(key)
+        if record_number is None:
+            return None
+        self._reader.seek(STORE_HEADER.size + record_number * RECORD.size)
+        return _unpack(self._reader.read(RECORD.size))
+
+    def put(self, key: int, facts: PuzzleFacts) -> None:
+        """Appends the `facts` of the `key`, in a single write so that readers never see half a record."""
+        self._appender.write(_pack(key, facts))
+
+    def write_index(self) -> int:
+        """Rewrites the index to cover every record appended so far, and returns the number of keys in it."""
+        self._scan_new_records()
+        records = {key: record for key, record in zip(self._index_keys, self._index_records)}
+        records.update(self._tail)
+        keys = sorted(records)
+
+        index_path = index_path_for(self.path)
+        tmp_path = index_path.with_name(f'{index_path.name}.{os.getpid()}.tmp')
+        with open(tmp_path, 'wb') as index_file:
+            index_file.write(INDEX_HEADER.pack(INDEX_MAGIC, self._scanned, len(keys)))
+            _write_array(index_file, array('Q', keys))
+            _write_array(index_file, array('Q', (records[key] for key in keys)))
+        os.replace(tmp_path, index_path)
+
+        self._close_index()
+        self._tail = {}
+        self._open_index()
+        return len(keys)
+
+    def _close_index(self) -> None:
+        if self._index_map is not None:
+            # the views have to be released before the map can be closed
+            for view in (self._index_keys, self._index_records):
+                if isinstance(view, memoryview):
+                    view.release()
+            self._index_keys = self._index_records = ()
+            self._index_map.close()
+            self._index_map = None
+
+    def close(self) -> None:
+        self._close_index()
+        self._reader.close()
+        self._appender.close()
+
+    def __enter__(self) -> 'ResultStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ResultCache:
+    """The two tiers of cached puzzle facts: a bounded LRU in front of an optional `ResultStore`."""
+
+    def __init__(self, store: Optional[ResultStore] = None, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.store = store
+        self.capacity = capacity
+        self._recent: 'OrderedDict[int, PuzzleFacts]' = OrderedDict()
+        self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def _remember(self, key: int, facts: PuzzleFacts) -> None:
+        self._recent[key] = facts
+        self._recent.move_to_end(key)
+        if len(self._recent) > self.capacity:
+            self._recent.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, quiz: str) -> Optional[PuzzleFacts]:
+        """Returns what is known about the `quiz`, or None if nothing is."""
+        key = quiz_key(quiz)
+        facts = self._recent.get(key)
+        if facts is not None:
+            self._recent.move_to_end(key)
+            self.hits += 1
+            return facts
+        if self.store is not None:
+            facts = self.store.get(key)
+            if facts is not None:
+                self.disk_hits += 1
+                self._remember(key, facts)
+                return facts
+        self.misses += 1
+        return None
+
+    def put(self, quiz: str, facts: PuzzleFacts) -> PuzzleFacts:
+        """Adds the `facts` to what is known about the `quiz` in both tiers, and returns everything known."""
+        key = quiz_key(quiz)
+        known = self._recent.get(key)
+        if known is None and self.store is not None:
+            known = self.store.get(key)
+        merged = known.merge(facts) if known is not None else facts
+        self._remember(key, merged)
+        if merged != known and self.store is not None:
+            self.store.put(key, merged)
+        return merged
+
+    def stats(self) -> CacheStats:
+        return CacheStats(self.hits, self.disk_hits, self.misses, self.evictions)
@@ -0,0 +1,161 @@
+"""A bitmask backtracking solver for Sudoku grids.
+
+Every cell keeps a bitmask of its candidate numbers (bit `n` for the number `n`). Placing a number removes it from
+the candidates of the cell's peers, and naked singles (a cell with one candidate left) and hidden singles
+(a number with one possible cell left in a row, column or sub-grid) are placed straight away.
+When nothing more can be deduced, the solver branches on the unfilled cell with the fewest candidates.
+Grids of any N² X N² size are solved, using the index tables of their size.
+"""
+
+from typing import List, NamedTuple, Optional, Tuple
+
+from utils.geometry import Geometry, geometry_of
+
+
+class SolveResult(NamedTuple):
+    """The outcome of solving a grid.
+
+    `solution` is None when the grid has no solution. `nodes` is the number of guesses the search made.
+    """
+
+    solution: Optional[List[List[str]]]
+    nodes: int
+
+
+def _place(values: List[int], cands: List[int], pending: List[Tuple[int, int]], geo: Geometry) -> bool:
+    """Places the `pending` (cell, number bit) pairs, along with every single that follows from them.
+
+    Returns False if this leads to a contradiction.
+    """
+    peers, units, bit_count, all_numbers = geo.peers, geo.units, geo.bit_count, geo.all_numbers
+    while pending:
+        while pending:
+            cell, bit = pending.pop()
+            if values[cell]:
+                if values[cell] != bit:
+                    return False
+                continue
+            if not cands[cell] & bit:
+                return False
+            values[cell] = bit
+            cands[cell] = bit
+
+            for peer in peers[cell]:
+                peer_cands = cands[peer]
+                if peer_cands & bit:
+                    if values[peer]:
+                        return False
+                    peer_cands &= ~bit
+                    cands[peer] = peer_cands
+                    if not peer_cands:
+                        return False
+                    if bit_count[peer_cands] == 1:  # naked single
+                        pending.append((peer, peer_cands))
+
+        # look for hidden singles once no naked singles are left
+        for unit in units:
+            once = twice = placed = 0
+            for cell in unit:
+                if values[cell]:
+                    placed |= values[cell]
+                else:
+                    twice |= once & cands[cell]
+                    once |= cands[cell]
+            if (once | placed) != all_numbers:
+                return False  # some number can no longer go anywhere in this unit
+
+            hidden = once & ~twice & ~placed
+            while hidden:
+                bit = hidden & -hidden
+                hidden ^= bit
+                for cell in unit:
+                    if cands[cell] & bit and not values[cell]:
+                        pending.append((cell, bit))
+                        break
+            if pending:
+                break
+
+    return True
+
+
+def _search(values: List[int], cands: List[int], solutions: List[List[int]], limit: int, geo: Geometry) -> int:
+    """Searches for up to `limit` solutions, appending them to `solutions`, and returns the number of guesses made."""
+    bit_count = geo.bit_count
+    best_cell, best_count = -1, geo.size + 1
+    for cell in range(geo.cell_count):
+        if not values[cell]:
+            count = bit_count[cands[cell]]
+            if count < best_count:
+                best_cell, best_count = cell, count
+                if count == 2:
+                    break
+
+    if best_cell < 0:  # every cell is filled
+        solutions.append(values)
+        return 0
+
+    nodes = 0
+    options = cands[best_cell]
+    while options:
+        bit = options & -options
+        options ^= bit
+        nodes += 1
+
+        next_values, next_cands = values[:], cands[:]
+        if _place(next_values, next_cands, [(best_cell, bit)], geo):
+            nodes += _search(next_values, next_cands, solutions, limit, geo)
+            if len(solutions) >= limit:
+                break
+
+    return nodes
+
+
+def _initial_state(grid: List[List[str]], geo: Geometry) -> Optional[Tuple[List[int], List[int]]]:
+    """Returns the values and candidates of a grid, or None if its given numbers already contradict each other."""
+    size = geo.size
+    values = [0] * geo.cell_count
+    cands = [geo.all_numbers] * geo.cell_count
+    givens = [
+        (row * size + col, 1 << int(grid[row][col]))
+        for row in range(size)
+        for col in range(size)
+        if grid[row][col] != ' '
+    ]
+
+    if not _place(values, cands, givens, geo):
+        return None
+    return (values, cands)
+
+
+def _to_grid(values: List[int], geo: Geometry) -> List[List[str]]:
+    numbers = [str(geo.number_of_bit[bit]) for bit in values]
+    return [numbers[row * geo.size : (row + 1) * geo.size] for row in range(geo.size)]
+
+
+def solve(grid: List[List[str]]) -> SolveResult:
+    """Solves the `grid`, where unfilled cells hold a single space, and returns the solution as a new grid,
+    along with the number of search nodes it took.
+    """
+    geo = geometry_of(grid)
+    state = _initial_state(grid, geo)
+    if state is None:
+        return SolveResult(None, 0)
+
+    solutions: List[List[int]] = []
+    nodes = _search(state[0], state[1], solutions, 1, geo)
+    return SolveResult(_to_grid(solutions[0], geo) if solutions else None, nodes)
+
+
+def count_solutions(grid: List[List[str]], limit: int = 2) -> int:
+    """Returns the number of solutions of the `grid`, counting no further than `limit`.
+
+    With the default `limit` of 2, this tells apart grids with no solution, one solution, or more than one.
+    """
+    geo = geometry_of(grid)
+    state = _initial_state(grid, geo)
+    if state is None:
+        return 0
+
+    solutions: List[List[int]] = []
+    _search(state[0], state[1], solutions, limit, geo)
+    return len(solutions)
@@ -1,6 +1,7 @@
 """General utility functions for the Sudoku grid"""
 
-from typing import Tuple, List
+from typing import Tuple, List, Set
+from utils.solver import solve
 
 LEGAL_COORDINATE_LENGTH = 3
 VALID_COLS = {1, 2, 3, 4, 5, 6, 7, 8, 9}
@@ -66,10 +67,19 @@ def translate_move(coordinate_move: str) -> Tuple[Tuple[int, int], int]:
 def build_puzzle_solution_pair(line: Tuple) -> Tuple[List[List[str]], List[List[str]]]:
     """Builds and returns a pair of the Sudoku puzzle and its solution, as a result of parsing the comma-separated `line`
     representations of the puzzle and the solution respectively.
+
+    If the `line` has no solution representation, the puzzle is solved to get one.
     """
     puzzle_repr, solution_repr = line
     puzzle = build_grid(puzzle_repr)
-    solution = build_grid(solution_repr)
+
+    if solution_repr:
+        solution = build_grid(solution_repr)
+    else:
+        solved = solve(puzzle).solution
+        if solved is None:
+            raise SudokuError('This puzzle has no solution.')
+        solution = solved
 
     return (puzzle, solution)
 
@@ -89,13 +99,13 @@ def build_grid(line: str) -> List[List[str]]:
     return grid
 
 
-def get_unfilled_cells(grid: List[List[str]]) -> List[Tuple[int, int]]:
+def get_unfilled_cells(grid: List[List[str]]) -> Set[Tuple[int, int]]:
     """Returns a collection of all the locations of unfilled cells in the grid"""
-    unfilled_cells = []
+    unfilled_cells = set()
 
     for row_index, row in enumerate(grid):
         for cell_index, cell in enumerate(row):
             if cell == ' ':
-                unfilled_cells.append((row_index, cell_index))
+                unfilled_cells.add((row_index, cell_index))
 
     return unfilled_cells
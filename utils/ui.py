@@ -2,22 +2,101 @@
 
 from rich.table import Table, box
 from rich import print as rprint
-from typing import List
+from typing import List, Optional, Tuple
+from functools import lru_cache
 from textwrap import dedent
 import os
+import sys
 
+from utils.renderer import CLEAR_SCREEN, enable_escape_codes
 
-GAME_KEYS = {'undo': 'u', 'hint': 'h'}
+
+GAME_KEYS = {'undo': 'u', 'redo': 'r', 'hint': 'h', 'new game': 'n'}
+
+# how many rendered grids `get_sudoku_grid` remembers
+GRID_CACHE_SIZE = 256
+
+# the static texts are dedented once, when the module is loaded
+COORDINATE_EXPLANATION = dedent(
+    """You place numbers by typing: 
+1) The number you want to place,
+2) Where in the grid to place.
+
+9A3 places 9 in location A3 of the grid.
+Entering 9a3 or 93a or 93A does the same thing.
+
+Incorrect numbers, or locations are rejected."""
+)
+
+SUDOKU_GRID_TEMPLATE = dedent(
+    """    1   2   3   4   5   6   7   8   9
+  ╔━━━┯━━━┯━━━╦━━━┯━━━┯━━━╦━━━┯━━━┯━━━╗
+A ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ A
+  ┠───┼───┼───╂───┼───┼───╂───┼───┼───┨
+B ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ B
+  ┠───┼───┼───╂───┼───┼───╂───┼───┼───┨
+C ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ C
+  ┣━━━┿━━━┿━━━╬━━━┿━━━┿━━━╬━━━┿━━━┿━━━┫
+D ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ D
+  ┠───┼───┼───╂───┼───┼───╂───┼───┼───┨
+E ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ E
+  ┠───┼───┼───╂───┼───┼───╂───┼───┼───┨
+F ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ F
+  ┣━━━┿━━━┿━━━╬━━━┿━━━┿━━━╬━━━┿━━━┿━━━┫
+G ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ G
+  ┠───┼───┼───╂───┼───┼───╂───┼───┼───┨
+H ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ H
+  ┠───┼───┼───╂───┼───┼───╂───┼───┼───┨
+I ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ I
+  ╚━━━┷━━━┷━━━╩━━━┷━━━┷━━━╩━━━┷━━━┷━━━╝
+    1   2   3   4   5   6   7   8   9"""
+)
+
+BANNER = dedent(
+    """    
+    ███████╗██╗   ██╗██████╗  ██████╗ ██╗  ██╗██╗   ██╗
+    ██╔════╝██║   ██║██╔══██╗██╔═══██╗██║ ██╔╝██║   ██║
+    ███████╗██║   ██║██║  ██║██║   ██║█████╔╝ ██║   ██║
+    ╚════██║██║   ██║██║  ██║██║   ██║██╔═██╗ ██║   ██║
+    ███████║╚██████╔╝██████╔╝╚██████╔╝██║  ██╗╚██████╔╝
+    ╚══════╝ ╚═════╝ ╚═════╝  ╚═════╝ ╚═╝  ╚═╝ ╚═════╝
+    """
+)
+
+INSTRUCTIONS_TEXT = dedent(
+    """
+    The game consists of a large 9 X 9 grid of cells,
+    with smaller 3 X 3 sub-grids.
+
+    You win if you fill in the cells with numbers 1 to 9,
+    such that:
+
+    + No number is repeated in a sub-grid
+    + No number is repeated in its own row
+    + No number repeats in its own column
+    """
+)
 
 
 def clear_screen() -> None:
     """Clears the terminal screen"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    if not enable_escape_codes():  # an older Windows console
+        os.system('cls')
+        return
+    sys.stdout.write(CLEAR_SCREEN)
+    sys.stdout.flush()
 
 
-def get_sudoku_and_keys(grid: List[List[str]]) -> Table:
-    """Returns the sudoku grid and the list of possible game keys to enter, side-by-side."""
-    return split_left_right(get_sudoku_grid(grid), get_game_keys(), outer_edge=False)
+def get_sudoku_and_keys(grid: List[List[str]], buffer: Optional['GridBuffer'] = None) -> Table:
+    """Returns the sudoku grid and the list of possible game keys to enter, side-by-side.
+    Given the `buffer` that the grid was last drawn from, only the cells that changed since are rewritten.
+    """
+    if buffer is not None:
+        buffer.update(grid)
+        sudoku_grid = buffer.render()
+    else:
+        sudoku_grid = get_sudoku_grid(grid)
+    return split_left_right(sudoku_grid, get_game_keys(), outer_edge=False)
 
 
 def get_info(message: str = "") -> Table:
@@ -59,77 +138,62 @@ def split_up_down(top_element, bottom_element, outer_edge=True) -> Table:
 
 
 def explain_coordinate_system() -> str:
-    explanation = dedent(
-        """You place numbers by typing: 
-1) The number you want to place,
-2) Where in the grid to place.
+    return COORDINATE_EXPLANATION
 
-9A3 places 9 in location A3 of the grid.
-Entering 9a3 or 93a or 93A does the same thing.
 
-Incorrect numbers, or locations are rejected."""
-    )
-
-    return explanation
+@lru_cache(maxsize=GRID_CACHE_SIZE)
+def _render_sudoku_grid(cells: Tuple[str, ...]) -> str:
+    return SUDOKU_GRID_TEMPLATE.format(*cells)
 
 
 def get_sudoku_grid(grid: List[List[str]]) -> str:
-    """Returns the sudoku grid, as a standard sudoku"""
+    """Returns the sudoku grid, as a standard sudoku.
 
-    sudoku_grid = dedent(
-        """    1   2   3   4   5   6   7   8   9
-  ╔━━━┯━━━┯━━━╦━━━┯━━━┯━━━╦━━━┯━━━┯━━━╗
-A ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ A
-  ┠───┼───┼───╂───┼───┼───╂───┼───┼───┨
-B ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ B
-  ┠───┼───┼───╂───┼───┼───╂───┼───┼───┨
-C ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ C
-  ┣━━━┿━━━┿━━━╬━━━┿━━━┿━━━╬━━━┿━━━┿━━━┫
-D ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ D
-  ┠───┼───┼───╂───┼───┼───╂───┼───┼───┨
-E ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ E
-  ┠───┼───┼───╂───┼───┼───╂───┼───┼───┨
-F ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ F
-  ┣━━━┿━━━┿━━━╬━━━┿━━━┿━━━╬━━━┿━━━┿━━━┫
-G ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ G
-  ┠───┼───┼───╂───┼───┼───╂───┼───┼───┨
-H ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ H
-  ┠───┼───┼───╂───┼───┼───╂───┼───┼───┨
-I ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ {} │ {} │ {} ┃ I
-  ╚━━━┷━━━┷━━━╩━━━┷━━━┷━━━╩━━━┷━━━┷━━━╝
-    1   2   3   4   5   6   7   8   9"""
-    ).format(*[cell for row in grid for cell in row])
+    The most recently rendered grids are cached, keyed by the contents of their cells.
+    """
+    return _render_sudoku_grid(tuple(cell for row in grid for cell in row))
 
-    return sudoku_grid
 
+class GridBuffer:
+    """A rendered sudoku grid that is updated one cell at a time.
 
-def show_game_instructions() -> None:
-    """Prints the game's instructions"""
-    banner = dedent(
-        """    
-    ███████╗██╗   ██╗██████╗  ██████╗ ██╗  ██╗██╗   ██╗
-    ██╔════╝██║   ██║██╔══██╗██╔═══██╗██║ ██╔╝██║   ██║
-    ███████╗██║   ██║██║  ██║██║   ██║█████╔╝ ██║   ██║
-    ╚════██║██║   ██║██║  ██║██║   ██║██╔═██╗ ██║   ██║
-    ███████║╚██████╔╝██████╔╝╚██████╔╝██║  ██╗╚██████╔╝
-    ╚══════╝ ╚═════╝ ╚═════╝  ╚═════╝ ╚═╝  ╚═╝ ╚═════╝
+    The text between the cells of the grid template is laid out once, so patching a cell only replaces
+    that cell's slot, and the pieces are only joined again when a cell has changed.
     """
-    )
-    instructions_text = dedent(
-        """
-    The game consists of a large 9 X 9 grid of cells,
-    with smaller 3 X 3 sub-grids.
 
-    You win if you fill in the cells with numbers 1 to 9,
-    such that:
+    def __init__(self, grid: List[List[str]]) -> None:
+        pieces = SUDOKU_GRID_TEMPLATE.split('{}')
+        self._buffer = [piece for pair in zip(pieces, [' '] * len(pieces)) for piece in pair][:-1]
+        self._text: Optional[str] = None
+        self.update(grid)
+
+    def patch(self, loc: Tuple[int, int], cell: str) -> None:
+        """Writes `cell` into the `loc` location of the grid."""
+        row, col = loc
+        self._buffer[2 * (row * 9 + col) + 1] = cell
+        self._text = None
+
+    def update(self, grid: List[List[str]]) -> int:
+        """Patches every cell that differs from the `grid`, and returns how many did."""
+        patched = 0
+        for row_index, row in enumerate(grid):
+            for col_index, cell in enumerate(row):
+                if self._buffer[2 * (row_index * 9 + col_index) + 1] != cell:
+                    self.patch((row_index, col_index), cell)
+                    patched += 1
+        return patched
+
+    def render(self) -> str:
+        """Returns the grid, as a standard sudoku"""
+        if self._text is None:
+            self._text = ''.join(self._buffer)
+        return self._text
 
-    + No number is repeated in a sub-grid
-    + No number is repeated in its own row
-    + No number repeats in its own column
-    """
-    )
+
+def show_game_instructions() -> None:
+    """Prints the game's instructions"""
     instructions = Table(show_header=False, show_lines=False)
     instructions.add_column()
-    instructions.add_row(instructions_text)
-    print(banner)
+    instructions.add_row(INSTRUCTIONS_TEXT)
+    print(BANNER)
     rprint(instructions)
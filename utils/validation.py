@@ -0,0 +1,80 @@
+"""Checks that every quiz and solution pair in a puzzle dataset is consistent"""
+
+import time
+from operator import itemgetter
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from utils.dataset import NumberedLine, chunked, iter_lines
+from utils.parallel import map_chunks
+from utils.geometry import UNITS
+
+GRID_LENGTH = 81
+DIGITS = frozenset('123456789')
+UNIT_GETTERS = tuple(itemgetter(*unit) for unit in UNITS)
+
+
+class ValidationReport(NamedTuple):
+    """The outcome of validating a dataset."""
+
+    checked: int
+    invalid: List[Tuple[int, str]]  # the line number and the reason, for every invalid row
+    seconds: float
+
+    @property
+    def puzzles_per_second(self) -> float:
+        return self.checked / self.seconds if self.seconds else 0.0
+
+
+def check_pair(quiz: str, solution: str) -> Optional[str]:
+    """Returns the reason why `solution` isn't a valid solution of `quiz`, or None if it is."""
+    if len(quiz) != GRID_LENGTH or not quiz.isdecimal():
+        return 'the quiz is not 81 digits'
+    if len(solution) != GRID_LENGTH or not set(solution) <= DIGITS:
+        return 'the solution is not 81 digits from 1 to 9'
+
+    for getter in UNIT_GETTERS:
+        if len(set(getter(solution))) != 9:
+            return 'a number repeats in a row, column or sub-grid of the solution'
+
+    for given, number in zip(quiz, solution):
+        if given != '0' and given != number:
+            return 'the solution disagrees with a number given in the quiz'
+
+    return None
+
+
+def check_lines(lines: List[NumberedLine]) -> List[Tuple[int, str]]:
+    """Returns the line number and the reason for every invalid `quizzes,solutions` line in `lines`."""
+    invalid = []
+
+    for line_number, line in lines:
+        quiz, comma, solution = line.partition(',')
+        reason = check_pair(quiz, solution) if comma else 'the line has no solution'
+        if reason is not None:
+            invalid.append((line_number, reason))
+
+    return invalid
+
+
+def validate_dataset(
+    filename: Union[str, Path], workers: Optional[int] = None, chunk_size: int = 10_000
+) -> ValidationReport:
+    """Validates every line of the dataset, spreading the chunks across `workers` processes.
+
+    Memory stays bounded by the chunk size however large the dataset is.
+    """
+    start = time.perf_counter()
+    checked = 0
+    invalid: List[Tuple[int, str]] = []
+
+    def counted(chunks: Iterator[List[NumberedLine]]) -> Iterator[List[NumberedLine]]:
+        nonlocal checked
+        for chunk in chunks:
+            checked += len(chunk)
+            yield chunk
+
+    for chunk_invalid in map_chunks(check_lines, counted(chunked(iter_lines(filename), chunk_size)), workers):
+        invalid.extend(chunk_invalid)
+
+    return ValidationReport(checked, invalid, time.perf_counter() - start)